@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+FreeRide Bench
+Standardized throughput benchmark: a fixed prompt set against the top free
+models, measuring TTFT, output tokens/sec, total latency and failures.
+Samples also go into the watcher's probe history, so they feed the
+"performance" term of the ranking.
+"""
+
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from main import model_performance_score
+from watcher import (
+    load_state,
+    probe_model,
+    record_probe_result,
+    percentile
+)
+
+
+# Constants
+BENCH_RESULTS_FILE = Path.home() / ".openclaw" / ".freeride-bench.json"
+BENCH_MODELS = 5               # Top free models benchmarked by default
+BENCH_CONCURRENCY = 4          # Requests in flight at once
+BENCH_ROUNDS = 1               # Passes over the prompt set per model
+BENCH_MAX_TOKENS = 128         # Completion budget per request
+BENCH_LIMIT_WAIT_SECONDS = 60  # Longest a request waits for the model's rate limit
+BENCH_HISTORY_RUNS = 20        # Runs kept in BENCH_RESULTS_FILE
+
+# Fixed prompts, so runs are comparable across models and over time
+BENCH_PROMPTS = [
+    ("short", "Reply with one word: what colour is a clear daytime sky?"),
+    ("explain", "Explain in three sentences why the sky is blue."),
+    ("code", "Write a Python function that returns the n-th Fibonacci number iteratively."),
+    ("reason", "A train leaves at 14:05 and arrives at 16:50. How long is the trip? Show your steps."),
+]
+
+
+def summarize_results(results: list) -> dict:
+    """Percentiles and failure rate over one model's benchmark results."""
+    ok = [r for r in results if r.get("ok")]
+    ttfts = sorted(r["ttft_ms"] for r in ok if r.get("ttft_ms") is not None)
+    tps = sorted(r["tps"] for r in ok if r.get("tps") is not None)
+    totals = sorted(r["total_ms"] for r in ok if r.get("total_ms") is not None)
+    errors = {}
+    for r in results:
+        if not r.get("ok"):
+            errors[r.get("err") or "error"] = errors.get(r.get("err") or "error", 0) + 1
+
+    def rounded(value):
+        return round(value, 1) if value is not None else None
+
+    return {
+        "requests": len(results),
+        "failures": len(results) - len(ok),
+        "failure_rate": round((len(results) - len(ok)) / len(results), 3) if results else 0.0,
+        "ttft_p50": rounded(percentile(ttfts, 50)),
+        "ttft_p95": rounded(percentile(ttfts, 95)),
+        "tps_p50": rounded(percentile(tps, 50)),
+        "latency_p50": rounded(percentile(totals, 50)),
+        "latency_p90": rounded(percentile(totals, 90)),
+        "latency_p99": rounded(percentile(totals, 99)),
+        "tokens_p50": percentile(sorted(r["tokens"] for r in ok if r.get("tokens")), 50),
+        "errors": errors,
+        # Scored as of the latest sample, so no sample has a negative age
+        "score": round(model_performance_score(results, max((r["t"] for r in results), default=0)), 4)
+    }
+
+
+def run_benchmark(
+    api_key: str,
+    model_ids: list,
+    concurrency: int = BENCH_CONCURRENCY,
+    rounds: int = BENCH_ROUNDS,
+    max_tokens: int = BENCH_MAX_TOKENS,
+    progress=None
+) -> dict:
+    """
+    Run every prompt `rounds` times against each model, at most
+    `concurrency` requests at once. Requests are interleaved across
+    models so no single model's rate limit holds up the rest.
+
+    Returns a run record: {"t", "at", "max_tokens", "rounds", "prompts",
+    "models": {model_id: summary}}. Every sample is also appended to the
+    watcher state's probe history (and breakers), like a health probe.
+    """
+    tasks = [
+        (model_id, name, prompt)
+        for _ in range(rounds)
+        for name, prompt in BENCH_PROMPTS
+        for model_id in model_ids
+    ]
+    results = {model_id: [] for model_id in model_ids}
+    state = load_state()
+
+    def one(model_id: str, prompt: str) -> dict:
+        return probe_model(
+            api_key, model_id,
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=max_tokens,
+            tps_window=None,
+            limit_wait=BENCH_LIMIT_WAIT_SECONDS,
+            budgeted=False
+        )
+
+    started = datetime.now()
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+            futures = {pool.submit(one, model_id, prompt): (model_id, name)
+                       for model_id, name, prompt in tasks}
+            for future in as_completed(futures):
+                model_id, name = futures[future]
+                result = future.result()
+                result["prompt"] = name
+                results[model_id].append(result)
+                record_probe_result(state, model_id, result)
+                if progress:
+                    progress(model_id, name, result)
+    finally:
+        state.close()
+
+    return {
+        "t": started.timestamp(),
+        "at": started.isoformat(timespec="seconds"),
+        "max_tokens": max_tokens,
+        "rounds": rounds,
+        "prompts": [name for name, _ in BENCH_PROMPTS],
+        "models": {model_id: summarize_results(r) for model_id, r in results.items()}
+    }
+
+
+def load_bench_results() -> list:
+    """Saved benchmark runs, oldest first."""
+    try:
+        runs = json.loads(BENCH_RESULTS_FILE.read_text())
+    except (OSError, json.JSONDecodeError):
+        return []
+    return runs if isinstance(runs, list) else []
+
+
+def save_bench_run(run: dict):
+    """Append a run, keeping the last BENCH_HISTORY_RUNS."""
+    runs = (load_bench_results() + [run])[-BENCH_HISTORY_RUNS:]
+    BENCH_RESULTS_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = BENCH_RESULTS_FILE.with_name(f"{BENCH_RESULTS_FILE.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(json.dumps(runs, indent=2))
+    os.replace(tmp_path, BENCH_RESULTS_FILE)
+
+
+def best_model(run: dict) -> Optional[str]:
+    """The model with the best measured score in a run, if any succeeded."""
+    candidates = [(s["score"], m) for m, s in run["models"].items() if s["failures"] < s["requests"]]
+    return max(candidates)[1] if candidates else None
+
+
+def print_bench_table(run: dict):
+    """Comparison table of one run, best measured score first."""
+    def fmt(value, suffix: str = "") -> str:
+        return f"{value:.0f}{suffix}" if value is not None else "-"
+
+    print(f"\nBenchmark {run['at']}  ({len(run['prompts'])} prompts x {run['rounds']} round(s), "
+          f"max_tokens {run['max_tokens']})\n")
+    print(f"{'#':<3} {'Model ID':<45} {'Fail':>5} {'TTFT p50':>9} {'p95':>7} "
+          f"{'tok/s':>6} {'Lat p50':>8} {'p90':>7} {'p99':>7} {'Score':>6}")
+    print("-" * 110)
+
+    ranked = sorted(run["models"].items(), key=lambda item: item[1]["score"], reverse=True)
+    for i, (model_id, s) in enumerate(ranked, 1):
+        print(f"{i:<3} {model_id:<45} {s['failure_rate']:>5.0%} {fmt(s['ttft_p50'], 'ms'):>9} "
+              f"{fmt(s['ttft_p95'], 'ms'):>7} {fmt(s['tps_p50']):>6} {fmt(s['latency_p50'], 'ms'):>8} "
+              f"{fmt(s['latency_p90'], 'ms'):>7} {fmt(s['latency_p99'], 'ms'):>7} {s['score']:>6.3f}")
+        if s["errors"]:
+            print(f"    errors: {', '.join(f'{err} x{count}' for err, count in sorted(s['errors'].items()))}")
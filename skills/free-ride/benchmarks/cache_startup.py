@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+FreeRide cache startup benchmark
+Compares loading the legacy full-JSON model cache against the compact
+columnar cache, and times `freeride list` cold starts against each.
+
+Usage:
+    python benchmarks/cache_startup.py
+    python benchmarks/cache_startup.py --baseline /path/to/old/main.py
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+SKILL_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(SKILL_DIR))
+
+
+def synthetic_catalog(count: int) -> list:
+    """Build ranked models shaped like OpenRouter's /models entries."""
+    now = time.time()
+    models = []
+    for i in range(count):
+        models.append({
+            "id": f"provider-{i % 12}/model-{i}:free",
+            "name": f"Model {i}",
+            "description": "A capable open model. " * 40,
+            "context_length": 8192 * (1 + i % 32),
+            "created": now - 86400 * i,
+            "architecture": {
+                "modality": "text->text",
+                "input_modalities": ["text"],
+                "output_modalities": ["text"],
+                "tokenizer": "Other",
+                "instruct_type": None
+            },
+            "pricing": {"prompt": "0", "completion": "0", "request": "0", "image": "0",
+                        "web_search": "0", "internal_reasoning": "0"},
+            "top_provider": {"context_length": 8192 * (1 + i % 32), "max_completion_tokens": 4096,
+                             "is_moderated": False},
+            "supported_parameters": ["max_tokens", "temperature", "top_p", "tools",
+                                     "tool_choice", "stop", "seed"][:1 + i % 7],
+            "_score": 1.0 - i / count
+        })
+    return models
+
+
+def write_legacy_cache(home: Path, models: list):
+    path = home / ".openclaw" / ".freeride-cache.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"cached_at": datetime.now().isoformat(), "models": models}, indent=2))
+    return path
+
+
+def load_legacy_cache(path: Path) -> list:
+    cache = json.loads(path.read_text())
+    datetime.fromisoformat(cache.get("cached_at", ""))
+    return cache.get("models", [])
+
+
+def time_call(fn, repeat: int) -> list:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def time_cli(targets: dict, repeat: int) -> dict:
+    """Time `freeride list` for each label -> (main.py, HOME), interleaving the runs
+    so machine noise hits every target alike."""
+    # As the installed `freeride` entry point runs it: an import of main, so
+    # its bytecode is cached rather than recompiled on every run
+    cmd = [sys.executable, "-c", "import main, sys; sys.exit(main.main())", "list", "--limit", "15"]
+
+    def run(main_py: Path, home: Path):
+        env = dict(os.environ, HOME=str(home), OPENROUTER_API_KEY="sk-or-benchmark")
+        subprocess.run(cmd, env=env, cwd=main_py.parent, stdout=subprocess.DEVNULL, check=True)
+
+    for main_py, home in targets.values():
+        run(main_py, home)  # Warm the .pyc and the page cache
+    samples = {label: [] for label in targets}
+    for _ in range(repeat):
+        for label, (main_py, home) in targets.items():
+            start = time.perf_counter()
+            run(main_py, home)
+            samples[label].append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def report(label: str, samples: list):
+    print(f"  {label:<34} median {statistics.median(samples):8.2f} ms   "
+          f"min {min(samples):8.2f} ms")
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description="FreeRide cache startup benchmark")
+    parser.add_argument("--models", type=int, default=60, help="Free models in the catalog (default: 60)")
+    parser.add_argument("--repeat", type=int, default=20, help="Repetitions per measurement (default: 20)")
+    parser.add_argument("--baseline", help="main.py from before the compact cache, for the legacy CLI run")
+    args = parser.parse_args()
+
+    models = synthetic_catalog(args.models)
+
+    with tempfile.TemporaryDirectory() as legacy_home, tempfile.TemporaryDirectory() as compact_home:
+        legacy_home, compact_home = Path(legacy_home), Path(compact_home)
+        legacy_path = write_legacy_cache(legacy_home, models)
+
+        # FreeRide binds its cache, profile and watcher state paths at import
+        # time: keep them away from the user's real ~/.openclaw
+        os.environ["HOME"] = str(compact_home)
+        import main
+        main.save_models_cache(models)
+
+        print(f"Catalog: {args.models} free models")
+        print(f"  legacy cache size:  {legacy_path.stat().st_size:>10,} bytes")
+        print(f"  compact cache size: {main.CACHE_FILE.stat().st_size:>10,} bytes")
+
+        print("\nCache load (in-process):")
+        report("legacy JSON", time_call(lambda: load_legacy_cache(legacy_path), args.repeat))
+        report("compact columns", time_call(main.get_cached_models, args.repeat))
+
+        print("\n`freeride list` cold start (mostly interpreter and `requests` import):")
+        targets = {"after (compact cache)": (SKILL_DIR / "main.py", compact_home)}
+        if args.baseline:
+            targets = {"before (legacy cache)": (Path(args.baseline).resolve(), legacy_home), **targets}
+        for label, samples in time_cli(targets, args.repeat).items():
+            report(label, samples)
+
+
+if __name__ == "__main__":
+    main_bench()
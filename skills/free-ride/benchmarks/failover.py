@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+FreeRide failover benchmark
+Runs FreeRide against the local OpenRouter simulator and measures, per
+failure scenario, how long the watcher takes to recover, how many probe
+requests a rotation costs, how long the proxy takes to answer when the
+primary fails, and how long the `list`, `auto` and `fallbacks` commands
+take with a cold and a warm cache. Nothing touches the real API or the
+real ~/.openclaw.
+
+Usage:
+    python benchmarks/failover.py
+    python benchmarks/failover.py --repeat 5 --catalog-latency-ms 300
+"""
+
+import argparse
+import io
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+
+SKILL_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(SKILL_DIR))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from simulator import Simulator, synthetic_catalog  # noqa: E402
+from statestore import journal_path_for, probe_store_path_for  # noqa: E402
+
+# Scenarios: behaviour of the ranked models (0 = current primary) when the check runs
+SCENARIOS = {
+    "429 + Retry-After": {0: {"status": 429, "retry_after": 30}},
+    "503": {0: {"status": 503}},
+    "hang": {0: {"hang_s": 5}},
+    "cascade (3x 429)": {i: {"status": 429, "retry_after": 30} for i in range(3)},
+    "slow successor": {0: {"status": 429}, 1: {"ttft_ms": 1500}},
+}
+
+
+def configure_primary(main, model_id: str):
+    def apply(config):
+        main.ensure_config_structure(config)["agents"]["defaults"]["model"]["primary"] = \
+            main.format_model_for_openclaw(model_id)
+    main.update_openclaw_config(apply)
+
+
+def fresh_state(watcher, ratelimit):
+    """Empty watcher state and rate limiter, as on a new install."""
+    # Losing probes of the previous scenario still record their outcome
+    for thread in threading.enumerate():
+        if thread.name.startswith("freeride-probe"):
+            thread.join()
+    for path in (watcher.STATE_FILE, journal_path_for(watcher.STATE_FILE), probe_store_path_for(watcher.STATE_FILE)):
+        path.unlink(missing_ok=True)
+    ratelimit._limiter = None
+    return watcher.load_state()
+
+
+def run_rotation(sim, main, watcher, ratelimit, ranked: list, behaviours: dict, warm_standby: bool) -> dict:
+    sim.reset()
+    state = fresh_state(watcher, ratelimit)
+    configure_primary(main, ranked[0])
+    if warm_standby:
+        with redirect_stdout(io.StringIO()):
+            standby = watcher.refresh_standby("sk-or-benchmark", state, ranked[0])
+        # As the daemon leaves it: verified during an earlier check, not just now
+        standby["verified_at"] -= watcher.CHECK_INTERVAL_SECONDS
+        state.append({"op": "set", "key": "standby", "value": standby})
+
+    sim.set_behaviours({ranked[rank]: behaviour for rank, behaviour in behaviours.items()})
+    before = sum(sim.snapshot()["chat"].values())
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        watcher.check_and_rotate("sk-or-benchmark", state)
+    elapsed = (time.perf_counter() - start) * 1000
+    probes = sum(sim.snapshot()["chat"].values()) - before
+
+    new_primary = watcher.get_current_base()
+    healthy = new_primary not in [ranked[rank] for rank, b in behaviours.items() if "status" in b or "hang_s" in b]
+    state.close()
+    return {"ms": elapsed, "probes": probes, "model": new_primary, "healthy": healthy}
+
+
+def run_proxy(sim, main, watcher, ratelimit, proxy, ranked: list, behaviours: dict, hedge: bool) -> float:
+    sim.reset()
+    fresh_state(watcher, ratelimit).close()
+    configure_primary(main, ranked[0])
+    sim.set_behaviours({ranked[rank]: behaviour for rank, behaviour in behaviours.items()})
+
+    server = proxy.FreeRideProxy("sk-or-benchmark", hedge=hedge, hedge_after_ms=500 if hedge else None)
+    body = {"model": "freeride/auto", "messages": [{"role": "user", "content": "Hi"}], "stream": True}
+    start = time.perf_counter()
+    winner, _, _ = server.forward(body)
+    elapsed = (time.perf_counter() - start) * 1000
+    if winner:
+        winner.close()
+    server.state.close()
+    return elapsed if winner else float("nan")
+
+
+def time_cli(home: Path, base_url: str, command: list, repeat: int, cold: bool) -> list:
+    env = dict(os.environ, HOME=str(home), OPENROUTER_API_KEY="sk-or-benchmark",
+               FREERIDE_OPENROUTER_BASE_URL=base_url)
+    samples = []
+    for _ in range(repeat):
+        if cold:
+            for name in (".freeride-cache.bin", ".freeride-catalog.json"):
+                (home / ".openclaw" / name).unlink(missing_ok=True)
+        start = time.perf_counter()
+        subprocess.run([sys.executable, str(SKILL_DIR / "main.py")] + command,
+                       env=env, stdout=subprocess.DEVNULL, check=True)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def median(values: list) -> float:
+    return statistics.median(values) if values else float("nan")
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description="FreeRide failover benchmark (offline)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (default: 3)")
+    parser.add_argument("--models", type=int, default=40, help="Free models in the simulated catalog")
+    parser.add_argument("--catalog-latency-ms", type=float, default=250,
+                        help="Simulated /models latency (default: 250)")
+    parser.add_argument("--probe-timeout", type=float, default=2.0,
+                        help="Probe read timeout in seconds, so hangs resolve quickly (default: 2)")
+    parser.add_argument("--skip-cli", action="store_true", help="Skip the CLI latency runs")
+    args = parser.parse_args()
+
+    home = Path(tempfile.mkdtemp(prefix="freeride-bench-"))
+    sim = Simulator(catalog=synthetic_catalog(free=args.models), catalog_latency_ms=args.catalog_latency_ms)
+    base_url = sim.start()
+
+    # FreeRide reads these at import time
+    os.environ["HOME"] = str(home)
+    os.environ["FREERIDE_OPENROUTER_BASE_URL"] = base_url
+    os.environ["OPENROUTER_API_KEY"] = "sk-or-benchmark"
+    import main
+    import watcher
+    import ratelimit
+    import proxy
+    watcher.PROBE_TIMEOUT = (args.probe_timeout, args.probe_timeout)
+
+    try:
+        ranked = [m["id"] for m in main.get_free_models("sk-or-benchmark")
+                  if "openrouter/free" not in m["id"]]
+        print(f"Simulator: {base_url} ({args.models} free models, "
+              f"catalog latency {args.catalog_latency_ms:.0f}ms)")
+
+        print("\nWatcher rotation (check_and_rotate after the primary starts failing):")
+        print(f"  {'scenario':<20} {'standby':<8} {'recovery':>10} {'probes':>7}  new primary")
+        for name, behaviours in SCENARIOS.items():
+            for warm in (False, True):
+                runs = [run_rotation(sim, main, watcher, ratelimit, ranked, behaviours, warm)
+                        for _ in range(args.repeat)]
+                last = runs[-1]
+                flag = "" if all(r["healthy"] for r in runs) else "  (unhealthy!)"
+                print(f"  {name:<20} {'warm' if warm else 'cold':<8} "
+                      f"{median([r['ms'] for r in runs]):>8.0f}ms "
+                      f"{median([r['probes'] for r in runs]):>7.0f}  {last['model']}{flag}")
+
+        print("\nProxy (first answer for a streaming request; hedged after 500ms):")
+        print(f"  {'scenario':<20} {'sequential':>11} {'hedged':>9}")
+        for name, behaviours in dict({"healthy primary": {}}, **SCENARIOS).items():
+            columns = [
+                median([run_proxy(sim, main, watcher, ratelimit, proxy, ranked, behaviours, hedge)
+                        for _ in range(args.repeat)])
+                for hedge in (False, True)
+            ]
+            print(f"  {name:<20} {columns[0]:>9.0f}ms {columns[1]:>7.0f}ms")
+
+        if not args.skip_cli:
+            print("\nCLI latency:")
+            print(f"  {'command':<24} {'cold cache':>11} {'warm cache':>11}")
+            for command in (["list"], ["auto"], ["fallbacks"]):
+                cold = time_cli(home, base_url, command, args.repeat, cold=True)
+                warm = time_cli(home, base_url, command, args.repeat, cold=False)
+                print(f"  {' '.join(command):<24} {median(cold):>9.0f}ms {median(warm):>9.0f}ms")
+    finally:
+        sim.stop()
+        shutil.rmtree(home, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main_bench()
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+FreeRide OpenRouter simulator
+A local stand-in for the parts of the OpenRouter API FreeRide uses:
+GET /api/v1/models (with ETag revalidation) and POST
+/api/v1/chat/completions (JSON or SSE streaming). Each model can be
+scripted with latencies, 429s with Retry-After, 503s and hangs.
+
+Usage:
+    python benchmarks/simulator.py --port 8899 [--scenario scenario.json]
+    FREERIDE_OPENROUTER_BASE_URL=http://127.0.0.1:8899/api/v1 freeride list
+
+Scenario file:
+    {
+      "catalog": {"free": 40, "paid": 20},
+      "catalog_latency_ms": 300,
+      "default": {"ttft_ms": 150, "tokens": 20, "gap_ms": 10},
+      "models": {"#0": {"status": 429, "retry_after": 30}, "provider-1/model-1:free": {"hang_s": 20}}
+    }
+"#N" refers to the N-th free model in catalog order. Behaviours can be
+changed at runtime with POST /_sim/behaviour {"<model>": {...}} and
+request counts read from GET /_sim/stats.
+
+Behaviour keys:
+    ttft_ms        delay before the first token (default 150)
+    tokens, gap_ms tokens streamed and the delay between them
+    status         HTTP status to answer with instead of 200
+    retry_after    Retry-After seconds sent with an error status
+    fail_requests  only the first N requests get `status`
+    fail_for_s     only requests in the first N seconds get `status`
+    hang_s         wait this long before sending any headers
+"""
+
+import argparse
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+DEFAULT_BEHAVIOUR = {"ttft_ms": 150, "tokens": 20, "gap_ms": 10}
+
+
+def synthetic_catalog(free: int = 40, paid: int = 20) -> list:
+    """OpenRouter-shaped /models entries: `free` zero-priced models plus `paid` others."""
+    now = time.time()
+    models = []
+    for i in range(free):
+        models.append({
+            "id": f"provider-{i % 7}/model-{i}:free",
+            "name": f"Model {i} (free)",
+            "description": "Simulated free model.",
+            "context_length": 8192 * (1 + (i * 5) % 32),
+            "created": now - 86400 * 3 * i,
+            "pricing": {"prompt": "0", "completion": "0"},
+            "architecture": {"input_modalities": ["text", "image"] if i % 4 == 0 else ["text"]},
+            "supported_parameters": ["max_tokens", "temperature", "top_p", "tools",
+                                     "tool_choice", "stop", "seed"][:1 + i % 7]
+        })
+    for i in range(paid):
+        models.append({
+            "id": f"paid-{i % 3}/model-{i}",
+            "name": f"Paid model {i}",
+            "context_length": 128000,
+            "created": now - 86400 * i,
+            "pricing": {"prompt": "0.000001", "completion": "0.000002"}
+        })
+    return models
+
+
+class Simulator:
+    """In-process simulator; start() returns the base URL to use as
+    FREERIDE_OPENROUTER_BASE_URL."""
+
+    def __init__(self, catalog: list = None, behaviours: dict = None, default: dict = None,
+                 catalog_latency_ms: float = 0):
+        self.catalog = catalog if catalog is not None else synthetic_catalog()
+        self.catalog_latency_ms = catalog_latency_ms
+        self.default = dict(DEFAULT_BEHAVIOUR, **(default or {}))
+        self.behaviours = {}
+        self.stats = Counter()
+        self.chat_requests = Counter()
+        self._lock = threading.Lock()
+        self._server = None
+        self.set_behaviours(behaviours or {})
+
+    def _resolve(self, model_id: str) -> str:
+        if model_id.startswith("#"):
+            free = [m["id"] for m in self.catalog if m.get("pricing", {}).get("prompt") == "0"]
+            return free[int(model_id[1:])]
+        return model_id
+
+    def set_behaviours(self, behaviours: dict):
+        """Replace the behaviour of the given models (None restores the default)."""
+        with self._lock:
+            now = time.monotonic()
+            for model_id, behaviour in behaviours.items():
+                if model_id == "default":
+                    self.default = dict(DEFAULT_BEHAVIOUR, **(behaviour or {}))
+                    continue
+                model_id = self._resolve(model_id)
+                if behaviour is None:
+                    self.behaviours.pop(model_id, None)
+                else:
+                    self.behaviours[model_id] = dict(behaviour, _since=now, _served=0)
+
+    def set_behaviour(self, model_id: str, **behaviour):
+        self.set_behaviours({model_id: behaviour or None})
+
+    def reset(self):
+        """Forget scripted behaviours and request counts."""
+        with self._lock:
+            self.behaviours.clear()
+            self.stats.clear()
+            self.chat_requests.clear()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"requests": dict(self.stats), "chat": dict(self.chat_requests)}
+
+    def _plan(self, model_id: str) -> dict:
+        """Behaviour for one request, with failure windows applied."""
+        with self._lock:
+            self.chat_requests[model_id] += 1
+            behaviour = self.behaviours.get(model_id)
+            if behaviour is None:
+                return dict(self.default)
+            served = behaviour["_served"]
+            behaviour["_served"] += 1
+            plan = dict(self.default, **behaviour)
+
+        failing = True
+        if "fail_requests" in plan and served >= plan["fail_requests"]:
+            failing = False
+        if "fail_for_s" in plan and time.monotonic() - plan["_since"] >= plan["fail_for_s"]:
+            failing = False
+        if not failing:
+            plan.pop("status", None)
+            plan.pop("hang_s", None)
+        return plan
+
+    def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        simulator = self
+
+        class Handler(_SimulatorHandler):
+            sim = simulator
+
+        self._server = _SimulatorServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="freeride-simulator", daemon=True).start()
+        return f"http://{host}:{self._server.server_address[1]}/api/v1"
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+class _SimulatorServer(ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        pass  # Clients hanging up mid-request (timeouts, cancelled hedges) are expected
+
+
+class _SimulatorHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    sim = None  # Bound to a Simulator by Simulator.start()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload, headers: dict = None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            return json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return {}
+
+    def do_GET(self):
+        path = self.path.split("?")[0].rstrip("/")
+        if path == "/api/v1/models":
+            with self.sim._lock:
+                self.sim.stats["models"] += 1
+            time.sleep(self.sim.catalog_latency_ms / 1000)
+            etag = f'"sim-{len(self.sim.catalog)}"'
+            if self.headers.get("If-None-Match") == etag:
+                with self.sim._lock:
+                    self.sim.stats["models_not_modified"] += 1
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self._send_json(200, {"data": self.sim.catalog}, {"ETag": etag})
+        elif path == "/_sim/stats":
+            self._send_json(200, self.sim.snapshot())
+        else:
+            self._send_json(404, {"error": {"code": 404, "message": "Not found"}})
+
+    def do_POST(self):
+        path = self.path.split("?")[0].rstrip("/")
+        if path == "/_sim/behaviour":
+            self.sim.set_behaviours(self._read_json())
+            self._send_json(200, {"ok": True})
+            return
+        if path == "/_sim/reset":
+            self._read_json()
+            self.sim.reset()
+            self._send_json(200, {"ok": True})
+            return
+        if path != "/api/v1/chat/completions":
+            self._send_json(404, {"error": {"code": 404, "message": "Not found"}})
+            return
+
+        request = self._read_json()
+        model_id = request.get("model", "")
+        plan = self.sim._plan(model_id)
+        with self.sim._lock:
+            self.sim.stats["chat"] += 1
+
+        if plan.get("hang_s"):
+            time.sleep(plan["hang_s"])
+
+        status = plan.get("status", 200)
+        if status != 200:
+            headers = {}
+            if plan.get("retry_after") is not None:
+                headers["Retry-After"] = str(plan["retry_after"])
+            message = "Rate limit exceeded" if status == 429 else "Provider unavailable"
+            self._send_json(status, {"error": {"code": status, "message": message}}, headers)
+            return
+
+        tokens = min(plan.get("tokens", 20), request.get("max_tokens") or 1_000_000)
+        if not request.get("stream"):
+            time.sleep(plan.get("ttft_ms", 0) / 1000 + tokens * plan.get("gap_ms", 0) / 1000)
+            self._send_json(200, {
+                "id": "gen-sim", "object": "chat.completion", "model": model_id,
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": " ".join(["tok"] * tokens)}}],
+                "usage": {"prompt_tokens": 1, "completion_tokens": tokens, "total_tokens": tokens + 1}
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            self._chunk(b": OPENROUTER PROCESSING\n\n")
+            time.sleep(plan.get("ttft_ms", 0) / 1000)
+            for i in range(tokens):
+                event = {"id": "gen-sim", "model": model_id,
+                         "choices": [{"index": 0, "delta": {"content": "tok "}}]}
+                self._chunk(b"data: " + json.dumps(event).encode() + b"\n\n")
+                time.sleep(plan.get("gap_ms", 0) / 1000)
+            self._chunk(b"data: [DONE]\n\n")
+            self._chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Client closed the stream early, as probes do
+
+    def _chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local OpenRouter simulator for FreeRide")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8899)
+    parser.add_argument("--scenario", help="JSON scenario file (catalog size and model behaviours)")
+    args = parser.parse_args()
+
+    scenario = {}
+    if args.scenario:
+        with open(args.scenario) as f:
+            scenario = json.load(f)
+
+    sim = Simulator(
+        catalog=synthetic_catalog(**scenario.get("catalog", {})),
+        behaviours=scenario.get("models", {}),
+        default=scenario.get("default"),
+        catalog_latency_ms=scenario.get("catalog_latency_ms", 0)
+    )
+    base_url = sim.start(args.host, args.port)
+    print(f"OpenRouter simulator on {base_url}")
+    print(f"  export FREERIDE_OPENROUTER_BASE_URL={base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        sim.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+FreeRide log tailer
+Follows appended lines in OpenClaw's log files, waking on inotify where
+available and falling back to polling elsewhere.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import sys
+import time
+from datetime import date
+from pathlib import Path
+from typing import Callable, List
+
+
+# Where OpenClaw writes gateway/agent logs by default
+OPENCLAW_LOG_DIR = Path.home() / ".openclaw" / "logs"
+OPENCLAW_TMP_LOG_DIR = Path("/tmp/openclaw")
+POLL_INTERVAL_SECONDS = 0.5
+
+
+def default_log_paths() -> List[Path]:
+    """Gateway service logs plus today's rolling OpenClaw log."""
+    return [
+        OPENCLAW_LOG_DIR / "gateway.log",
+        OPENCLAW_LOG_DIR / "gateway.err.log",
+        OPENCLAW_TMP_LOG_DIR / f"openclaw-{date.today():%Y-%m-%d}.log",
+    ]
+
+
+class _Inotify:
+    """Minimal inotify binding: one fd, directory watches, wake-ups only."""
+
+    IN_MODIFY = 0x00000002
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._libc = libc
+        self.fd = fd
+        self._watched = set()
+
+    def watch(self, directory: Path):
+        if directory in self._watched or not directory.is_dir():
+            return
+        mask = self.IN_MODIFY | self.IN_CREATE | self.IN_MOVED_TO
+        if self._libc.inotify_add_watch(self.fd, os.fsencode(str(directory)), mask) >= 0:
+            self._watched.add(directory)
+
+    def wait(self, timeout: float) -> bool:
+        """Block until something changed in a watched directory or timeout."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return False
+        try:
+            while os.read(self.fd, 4096):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self):
+        os.close(self.fd)
+
+
+class LogTailer:
+    """Yield lines appended to a set of log files.
+
+    Files that exist when the tailer starts are followed from their end, so
+    old history is not replayed; files that appear later (log rotation, a
+    new day's log) are read from the start. Truncation and inode changes
+    are detected on every read.
+    """
+
+    def __init__(
+        self,
+        paths: Callable[[], List[Path]] = default_log_paths,
+        poll_interval: float = POLL_INTERVAL_SECONDS
+    ):
+        self._paths = paths
+        self.poll_interval = poll_interval
+        self._positions = {}  # path -> (inode, offset)
+        self._partial = {}    # path -> bytes of an unfinished last line
+
+        for path in self._paths():
+            try:
+                st = path.stat()
+                self._positions[path] = (st.st_ino, st.st_size)
+            except OSError:
+                pass
+
+        self._inotify = None
+        if sys.platform.startswith("linux"):
+            try:
+                self._inotify = _Inotify()
+            except (OSError, AttributeError):
+                self._inotify = None
+        self._watch_dirs()
+
+    @property
+    def mode(self) -> str:
+        return "inotify" if self._inotify else "polling"
+
+    def _watch_dirs(self):
+        if self._inotify:
+            for path in self._paths():
+                self._inotify.watch(path.parent)
+
+    def wait(self, timeout: float):
+        """Sleep until the logs may have changed (or timeout)."""
+        if self._inotify:
+            self._watch_dirs()
+            self._inotify.wait(timeout)
+        else:
+            time.sleep(min(timeout, self.poll_interval))
+
+    def read_lines(self) -> List[str]:
+        """Return complete lines appended since the last call."""
+        lines = []
+        for path in self._paths():
+            lines.extend(self._read_path(path))
+        return lines
+
+    def _read_path(self, path: Path) -> List[str]:
+        try:
+            st = path.stat()
+        except OSError:
+            return []
+
+        inode, offset = self._positions.get(path, (st.st_ino, 0))
+        if inode != st.st_ino or st.st_size < offset:
+            # Rotated or truncated: start over on the new file
+            offset = 0
+            self._partial.pop(path, None)
+        if st.st_size == offset:
+            self._positions[path] = (st.st_ino, offset)
+            return []
+
+        try:
+            with open(path, "rb") as f:
+                f.seek(offset)
+                data = f.read()
+        except OSError:
+            return []
+
+        self._positions[path] = (st.st_ino, offset + len(data))
+        data = self._partial.pop(path, b"") + data
+        *complete, rest = data.split(b"\n")
+        if rest:
+            self._partial[path] = rest
+        return [line.decode("utf-8", "replace") for line in complete if line]
+
+    def close(self):
+        if self._inotify:
+            self._inotify.close()
+            self._inotify = None
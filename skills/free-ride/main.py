@@ -6,13 +6,20 @@ for unlimited free AI access.
 """
 
 import argparse
+import copy
+import heapq
 import json
+import math
 import os
+import stat
 import sys
+import threading
 import time
+from array import array
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Callable, Optional
 
 try:
     import requests
@@ -20,27 +27,83 @@ except ImportError:
     print("Error: requests library required. Install with: pip install requests")
     sys.exit(1)
 
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, rename is still atomic
+    fcntl = None
+
+from statestore import (
+    PERFORMANCE_HALF_LIFE_HOURS,
+    fold_probe_sample,
+    probe_decay,
+    probe_stamp,
+    read_probe_aggregates,
+    read_probe_samples
+)
+
 
 # Constants
-OPENROUTER_API_URL = "https://openrouter.ai/api/v1/models"
+# Point at a local stand-in (e.g. benchmarks/simulator.py) to run offline
+OPENROUTER_BASE_URL = os.environ.get("FREERIDE_OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1").rstrip("/")
+OPENROUTER_API_URL = f"{OPENROUTER_BASE_URL}/models"
 OPENCLAW_CONFIG_PATH = Path.home() / ".openclaw" / "openclaw.json"
-CACHE_FILE = Path.home() / ".openclaw" / ".freeride-cache.json"
+CACHE_FILE = Path.home() / ".openclaw" / ".freeride-cache.bin"
+CATALOG_FILE = Path.home() / ".openclaw" / ".freeride-catalog.json"
+WATCHER_STATE_FILE = Path.home() / ".openclaw" / ".freeride-watcher-state.json"
 CACHE_DURATION_HOURS = 6
+# Hard limit on how old a cached ranking may be when served stale-while-revalidate
+CACHE_MAX_STALENESS_HOURS = float(os.environ.get("FREERIDE_MAX_STALENESS_HOURS", 24))
+REFRESH_LOCK_FILE = Path.home() / ".openclaw" / ".freeride-refresh.lock"
+
+# Compact cache layout: magic line, one JSON header line, then binary columns
+CACHE_MAGIC = b"FRCACHE\n"
+CACHE_FORMAT_VERSION = 3
 
 # Free model ranking criteria (higher is better)
 RANKING_WEIGHTS = {
-    "context_length": 0.4,      # Prefer longer context
-    "capabilities": 0.3,        # Prefer more capabilities
-    "recency": 0.2,            # Prefer newer models
-    "provider_trust": 0.1       # Prefer trusted providers
+    "context_length": 0.32,     # Prefer longer context
+    "capabilities": 0.24,       # Prefer more capabilities
+    "recency": 0.16,            # Prefer newer models
+    "provider_trust": 0.08,     # Prefer trusted providers
+    "performance": 0.2          # Prefer models that measured fast for us
 }
 
+# Measured-performance term, built from freeride-watcher probe history
+PERFORMANCE_PRIOR = 0.5              # Neutral score for models without data
+PERFORMANCE_PRIOR_WEIGHT = 2.0       # How many fresh samples the prior is worth
+PERFORMANCE_REFERENCE_TTFT_MS = 1000 # TTFT that scores 0.5
+PERFORMANCE_REFERENCE_TPS = 50       # Tokens/sec that scores 0.5
+
 # Trusted providers (in order of preference)
 TRUSTED_PROVIDERS = [
     "google", "meta-llama", "mistralai", "deepseek",
     "nvidia", "qwen", "microsoft", "allenai", "arcee-ai"
 ]
 
+# User-editable ranking profile: {"weights": {...}, "trusted_providers": [...]}
+RANKING_PROFILE_FILE = Path.home() / ".openclaw" / "freeride-ranking.json"
+
+# Capability index: context tiers and input modalities indexed next to supported_parameters
+CONTEXT_TIERS = {
+    "context:32k": 32_000,
+    "context:128k": 128_000,
+    "context:256k": 256_000,
+    "context:1m": 1_000_000,
+}
+MODALITIES = ["text", "image", "audio", "file", "video"]  # Bit order of the cached modality mask
+MODALITY_CAPABILITIES = {"image": "vision", "audio": "audio", "file": "files", "video": "video"}
+FAST_TTFT_MS = 1000          # Median TTFT a model needs to count as "fast"
+FAST_MIN_SUCCESS_RATE = 0.8  # ...and the share of its recent probes that must succeed
+FAST_WINDOW_HOURS = 24       # Probe samples considered for "fast"
+
+# Task profiles for `freeride auto --profile`: required capabilities, then
+# preferred ones (dropped if no model has them all)
+TASK_PROFILES = {
+    "tools": {"require": ["tools"], "prefer": ["tool_choice"]},
+    "long-context": {"require": ["context:128k"], "prefer": ["context:256k"]},
+    "fast": {"require": [], "prefer": ["fast"]},
+}
+
 
 def get_api_key() -> Optional[str]:
     """Get OpenRouter API key from environment or OpenClaw config."""
@@ -49,32 +112,49 @@ def get_api_key() -> Optional[str]:
     if api_key:
         return api_key
 
-    # Try OpenClaw config
-    if OPENCLAW_CONFIG_PATH.exists():
-        try:
-            config = json.loads(OPENCLAW_CONFIG_PATH.read_text())
-            # Check env section
-            api_key = config.get("env", {}).get("OPENROUTER_API_KEY")
-            if api_key:
-                return api_key
-        except (json.JSONDecodeError, KeyError):
-            pass
+    # Try OpenClaw config (env section)
+    api_key = get_config_store().peek().get("env", {}).get("OPENROUTER_API_KEY")
+    if api_key:
+        return api_key
 
     return None
 
 
-def fetch_all_models(api_key: str) -> list:
-    """Fetch all models from OpenRouter API."""
+def fetch_models_conditional(api_key: str, validators: Optional[dict] = None) -> tuple:
+    """Fetch all models from OpenRouter API, revalidating against cached validators.
+
+    Sends If-None-Match / If-Modified-Since when validators from a previous
+    fetch are given. Returns (models, validators); models is None when the
+    server answered 304 Not Modified and the cached catalog is still current.
+    Raises requests.RequestException on failure.
+    """
     headers = {
         "Authorization": f"Bearer {api_key}",
         "Content-Type": "application/json"
     }
+    if validators:
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+
+    response = requests.get(OPENROUTER_API_URL, headers=headers, timeout=30)
+    if response.status_code == 304:
+        return None, validators
+    response.raise_for_status()
+    data = response.json()
+    new_validators = {
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified")
+    }
+    return data.get("data", []), new_validators
+
 
+def fetch_all_models(api_key: str) -> list:
+    """Fetch all models from OpenRouter API."""
     try:
-        response = requests.get(OPENROUTER_API_URL, headers=headers, timeout=30)
-        response.raise_for_status()
-        data = response.json()
-        return data.get("data", [])
+        models, _ = fetch_models_conditional(api_key)
+        return models
     except requests.RequestException as e:
         print(f"Error fetching models: {e}")
         return []
@@ -104,107 +184,851 @@ def filter_free_models(models: list) -> list:
     return free_models
 
 
-def calculate_model_score(model: dict) -> float:
+# ============== Ranking Engine ==============
+
+def load_ranking_profile() -> dict:
+    """Load ranking weights and provider order, with the user's profile over the defaults."""
+    profile = {
+        "weights": dict(RANKING_WEIGHTS),
+        "trusted_providers": list(TRUSTED_PROVIDERS)
+    }
+
+    if RANKING_PROFILE_FILE.exists():
+        try:
+            user_profile = json.loads(RANKING_PROFILE_FILE.read_text())
+            for name, weight in user_profile.get("weights", {}).items():
+                if isinstance(weight, bool) or not isinstance(weight, (int, float)):
+                    print(f"Warning: ignoring non-numeric ranking weight {name!r}: {weight!r}")
+                    continue
+                profile["weights"][name] = weight
+            if "trusted_providers" in user_profile:
+                profile["trusted_providers"] = list(user_profile["trusted_providers"])
+        except (json.JSONDecodeError, AttributeError, TypeError):
+            print(f"Warning: ignoring invalid ranking profile {RANKING_PROFILE_FILE}")
+
+    return profile
+
+
+def ranking_profile_fingerprint(profile: dict) -> str:
+    """Stable identifier for a profile, stored with cached scores."""
+    return json.dumps(profile, sort_keys=True, separators=(",", ":"))
+
+
+def _column(values: list) -> list:
+    """Build a float column."""
+    return [float(v) for v in values]
+
+
+def _affine(values: list, scale: float, offset: float = 0.0) -> list:
+    """Elementwise values * scale + offset."""
+    return [v * scale + offset for v in values]
+
+
+def _clip(values: list, low: float, high: float = math.inf) -> list:
+    """Elementwise clamp to [low, high]."""
+    return [min(max(v, low), high) for v in values]
+
+
+def load_performance_history() -> dict:
+    """Probe data per model, as recorded by freeride-watcher.
+
+    {model: {"aggregate": decayed sums for scoring, "recent": samples from
+    the last FAST_WINDOW_HOURS}}; reads one row per model plus a day of
+    samples, however long the history is.
+    """
+    history = {
+        model_id: {"aggregate": aggregate, "recent": []}
+        for model_id, aggregate in read_probe_aggregates(WATCHER_STATE_FILE).items()
+    }
+    recent = read_probe_samples(WATCHER_STATE_FILE, since=time.time() - FAST_WINDOW_HOURS * 3600)
+    for model_id, samples in recent.items():
+        history.setdefault(model_id, {"aggregate": None, "recent": []})["recent"] = samples
+    return history
+
+
+def performance_history_stamp() -> Optional[int]:
+    """Changes whenever the watcher records new probe results (and only then)."""
+    return probe_stamp(WATCHER_STATE_FILE) or None
+
+
+def model_performance_score(samples: list, now: float) -> float:
+    """Score 0-1 from TTFT, throughput and error rate, with exponential time decay."""
+    aggregate = None
+    for sample in samples or []:
+        aggregate = fold_probe_sample(aggregate, {**sample, "t": sample.get("t", now)})
+    return aggregate_performance_score(aggregate, now)
+
+
+def aggregate_performance_score(aggregate: Optional[dict], now: float) -> float:
+    """Score 0-1 from a model's decayed probe aggregate (see fold_probe_sample).
+
+    Each sample's weight halves every PERFORMANCE_HALF_LIFE_HOURS, and the
+    result is shrunk towards PERFORMANCE_PRIOR, so models with little or
+    no recent data stay close to neutral.
+    """
+    if not aggregate or not aggregate["weight"]:
+        return PERFORMANCE_PRIOR
+
+    total_weight = aggregate["weight"] * probe_decay(now - aggregate["t"])
+    speed = PERFORMANCE_PRIOR
+    if aggregate["ttft_weight"]:
+        ttft = aggregate["ttft"] / aggregate["ttft_weight"]
+        speed = PERFORMANCE_REFERENCE_TTFT_MS / (PERFORMANCE_REFERENCE_TTFT_MS + ttft)
+        if aggregate["tps_weight"]:
+            tps = aggregate["tps"] / aggregate["tps_weight"]
+            speed = 0.6 * speed + 0.4 * tps / (tps + PERFORMANCE_REFERENCE_TPS)
+
+    measured = (aggregate["ok"] / aggregate["weight"]) * speed
+    return ((total_weight * measured + PERFORMANCE_PRIOR_WEIGHT * PERFORMANCE_PRIOR)
+            / (total_weight + PERFORMANCE_PRIOR_WEIGHT))
+
+
+class ModelTable:
+    """Column-oriented view of a model catalog, built once per ranking pass."""
+
+    def __init__(self, models: list, profile: dict, performance_history: dict = None):
+        trusted = profile["trusted_providers"]
+        trust_by_provider = {
+            provider: 1 - (i / len(trusted)) for i, provider in enumerate(trusted)
+        }
+
+        self.models = models
+        self.ids = [m.get("id", "") for m in models]
+        self.context_length = _column([m.get("context_length") or 0 for m in models])
+        self.capability_count = _column([len(m.get("supported_parameters") or []) for m in models])
+        self.created = _column([m.get("created") or 0 for m in models])
+        self.provider_trust = _column([
+            trust_by_provider.get(model_id.split("/")[0] if "/" in model_id else "", 0.0)
+            for model_id in self.ids
+        ])
+        self._performance_history = performance_history
+
+    @property
+    def performance_history(self) -> dict:
+        """Watcher probe history, read only if a term asks for it."""
+        if self._performance_history is None:
+            self._performance_history = load_performance_history()
+        return self._performance_history
+
+    def __len__(self) -> int:
+        return len(self.models)
+
+
+def _term_context_length(table: ModelTable, now: float):
+    # Normalized to 0-1, max 1M tokens
+    return _clip(_affine(table.context_length, 1 / 1_000_000), 0.0, 1.0)
+
+
+def _term_capabilities(table: ModelTable, now: float):
+    # Normalized to max 10 capabilities
+    return _clip(_affine(table.capability_count, 1 / 10), 0.0, 1.0)
+
+
+def _term_recency(table: ModelTable, now: float):
+    # Linear decay over a year; models without a creation date score 0
+    days_old = _affine(table.created, -1 / 86400, now / 86400)
+    return _clip(_affine(days_old, -1 / 365, 1.0), 0.0)
+
+
+def _term_provider_trust(table: ModelTable, now: float):
+    return table.provider_trust
+
+
+def _term_performance(table: ModelTable, now: float):
+    # Probe history is keyed by the ":free" API id the watcher probes
+    history = table.performance_history
+    return _column([
+        aggregate_performance_score(
+            (history.get(model_id) or history.get(format_model_for_openclaw(model_id, False)) or {}).get("aggregate"),
+            now
+        )
+        for model_id in table.ids
+    ])
+
+
+# Scoring terms by weight name. Each maps a ModelTable to one value per model.
+SCORING_TERMS = {
+    "context_length": _term_context_length,
+    "capabilities": _term_capabilities,
+    "recency": _term_recency,
+    "provider_trust": _term_provider_trust,
+    "performance": _term_performance,
+}
+
+
+def register_scoring_term(name: str, term):
+    """Add a custom scoring term; weight it via the ranking profile's "weights"."""
+    SCORING_TERMS[name] = term
+
+
+def score_model_table(table: ModelTable, weights: dict, now: float = None):
+    """Compute the weighted score of every model in the table in one pass."""
+    if now is None:
+        now = time.time()
+
+    scores = _column([0.0] * len(table))
+    for name, weight in weights.items():
+        term = SCORING_TERMS.get(name)
+        if not term or not weight:
+            continue
+        values = term(table, now)
+        scores = [s + weight * v for s, v in zip(scores, values)]
+
+    return scores
+
+
+def select_top_k(scores, k: Optional[int] = None) -> list:
+    """Indices of the k highest scores, best first; ties keep catalog order."""
+    n = len(scores)
+    if k is None or k > n:
+        k = n
+    if k <= 0:
+        return []
+
+    return heapq.nlargest(k, range(n), key=lambda i: (scores[i], -i))
+
+
+def calculate_model_score(model: dict, profile: dict = None) -> float:
     """Calculate a ranking score for a model based on multiple criteria."""
-    score = 0.0
-
-    # Context length score (normalized to 0-1, max 1M tokens)
-    context_length = model.get("context_length", 0)
-    context_score = min(context_length / 1_000_000, 1.0)
-    score += context_score * RANKING_WEIGHTS["context_length"]
-
-    # Capabilities score
-    capabilities = model.get("supported_parameters", [])
-    capability_count = len(capabilities) if capabilities else 0
-    capability_score = min(capability_count / 10, 1.0)  # Normalize to max 10 capabilities
-    score += capability_score * RANKING_WEIGHTS["capabilities"]
-
-    # Recency score (based on creation date)
-    created = model.get("created", 0)
-    if created:
-        days_old = (time.time() - created) / 86400
-        recency_score = max(0, 1 - (days_old / 365))  # Newer models score higher
-        score += recency_score * RANKING_WEIGHTS["recency"]
-
-    # Provider trust score
-    model_id = model.get("id", "")
-    provider = model_id.split("/")[0] if "/" in model_id else ""
-    if provider in TRUSTED_PROVIDERS:
-        trust_index = TRUSTED_PROVIDERS.index(provider)
-        trust_score = 1 - (trust_index / len(TRUSTED_PROVIDERS))
-        score += trust_score * RANKING_WEIGHTS["provider_trust"]
-
-    return score
-
-
-def rank_free_models(models: list) -> list:
-    """Rank free models by quality score."""
-    scored_models = []
-    for model in models:
-        score = calculate_model_score(model)
-        scored_models.append({**model, "_score": score})
+    if profile is None:
+        profile = load_ranking_profile()
+    table = ModelTable([model], profile)
+    return float(score_model_table(table, profile["weights"])[0])
+
+
+def rank_free_models(
+    models: list,
+    top_k: Optional[int] = None,
+    profile: dict = None,
+    performance_history: dict = None
+) -> list:
+    """Rank free models by quality score, keeping only the top_k when given."""
+    if profile is None:
+        profile = load_ranking_profile()
+
+    table = ModelTable(models, profile, performance_history)
+    scores = score_model_table(table, profile["weights"])
+    return [
+        {**models[i], "_score": float(scores[i])}
+        for i in select_top_k(scores, top_k)
+    ]
+
+
+# ============== Capability Index ==============
+
+def model_modalities(model: dict) -> list:
+    """Input modalities of a catalog entry ("text+image->text" or input_modalities)."""
+    architecture = model.get("architecture") or {}
+    modalities = architecture.get("input_modalities")
+    if modalities is None:
+        modality = architecture.get("modality") or "text->text"
+        modalities = modality.split("->")[0].split("+")
+    return [m for m in modalities if m]
+
+
+def model_capabilities(model: dict) -> set:
+    """Capability names a model satisfies, excluding the measured "fast"."""
+    capabilities = set(model.get("supported_parameters") or [])
+    context = model.get("context_length") or 0
+    capabilities.update(name for name, tokens in CONTEXT_TIERS.items() if context >= tokens)
+    capabilities.update(
+        MODALITY_CAPABILITIES[m] for m in model_modalities(model) if m in MODALITY_CAPABILITIES
+    )
+    return capabilities
+
+
+def is_measured_fast(samples: list, now: float) -> bool:
+    """Recent probes mostly succeed with a median TTFT under FAST_TTFT_MS."""
+    recent = [s for s in samples or [] if now - s.get("t", 0) <= FAST_WINDOW_HOURS * 3600]
+    ttfts = sorted(s["ttft_ms"] for s in recent if s.get("ok") and s.get("ttft_ms") is not None)
+    if not ttfts:
+        return False
+    success_rate = sum(1 for s in recent if s.get("ok")) / len(recent)
+    return success_rate >= FAST_MIN_SUCCESS_RATE and ttfts[(len(ttfts) - 1) // 2] <= FAST_TTFT_MS
+
 
-    # Sort by score descending
-    scored_models.sort(key=lambda x: x["_score"], reverse=True)
-    return scored_models
+class CapabilityIndex:
+    """One bitset per capability over the ranked model list (bit i = i-th best model).
 
+    Built once per catalog refresh or re-rank and stored in the models
+    cache. A query ANDs one bitset per requirement and takes the lowest
+    set bit, so picking the best model for a requirement set does not
+    depend on the catalog size; masks are memoized per requirement set.
+    """
+
+    def __init__(self, ids: list, bitsets: dict):
+        self.ids = ids
+        self.bitsets = bitsets
+        self._all = (1 << len(ids)) - 1
+        self._masks = {}
+
+    @classmethod
+    def from_models(cls, models: list, performance_history: dict = None) -> "CapabilityIndex":
+        """Index ranked models (best first); "fast" comes from the watcher's probe history."""
+        if performance_history is None:
+            performance_history = load_performance_history()
+        now = time.time()
+        bitsets = {}
+        ids = []
+        for i, model in enumerate(models):
+            model_id = model.get("id", "")
+            ids.append(model_id)
+            capabilities = model_capabilities(model)
+            probes = (performance_history.get(model_id)
+                      or performance_history.get(format_model_for_openclaw(model_id, False)) or {})
+            if is_measured_fast(probes.get("recent"), now):
+                capabilities.add("fast")
+            for capability in capabilities:
+                bitsets[capability] = bitsets.get(capability, 0) | (1 << i)
+        return cls(ids, bitsets)
+
+    def to_header(self) -> dict:
+        return {name: format(bits, "x") for name, bits in self.bitsets.items()}
+
+    @classmethod
+    def from_header(cls, ids: list, header: dict) -> "CapabilityIndex":
+        return cls(ids, {name: int(bits, 16) for name, bits in header.items()})
+
+    def mask(self, requirements) -> int:
+        """Bitset of the models that have every required capability."""
+        key = frozenset(requirements)
+        mask = self._masks.get(key)
+        if mask is None:
+            mask = self._all
+            for capability in key:
+                mask &= self.bitsets.get(capability, 0)
+            self._masks[key] = mask
+        return mask
+
+    def best(self, requirements, exclude: int = 0) -> Optional[str]:
+        """Best-ranked model with every required capability, or None."""
+        mask = self.mask(requirements) & ~exclude
+        if not mask:
+            return None
+        return self.ids[(mask & -mask).bit_length() - 1]
+
+    def matching(self, requirements, limit: Optional[int] = None) -> list:
+        """Models with every required capability, best first."""
+        mask = self.mask(requirements)
+        matches = []
+        while mask and (limit is None or len(matches) < limit):
+            low = mask & -mask
+            matches.append(self.ids[low.bit_length() - 1])
+            mask ^= low
+        return matches
+
+    def count(self, requirements) -> int:
+        return bin(self.mask(requirements)).count("1")
+
+
+def profile_candidates(index: CapabilityIndex, profile: dict) -> list:
+    """Models for a task profile: those with every preferred capability first,
+    then the rest of those with the required ones, each best first."""
+    required = list(profile.get("require", []))
+    preferred = index.matching(required + list(profile.get("prefer", [])))
+    seen = set(preferred)
+    return preferred + [m for m in index.matching(required) if m not in seen]
+
+
+def get_capability_index(models: list = None) -> Optional[CapabilityIndex]:
+    """The cached capability index, or one built from models when the cache has none."""
+    raw = _read_models_cache()
+    if raw:
+        header, payload = raw
+        if header.get("capabilities") is not None:
+            typecode, offset, nbytes = header["columns"]["id"]
+            ids = bytes(payload[offset:offset + nbytes]).decode("utf-8").split("\n") if header["count"] else []
+            if models is None or ids == [m.get("id", "") for m in models]:
+                return CapabilityIndex.from_header(ids, header["capabilities"])
+    if models is None:
+        return None
+    return CapabilityIndex.from_models(models)
 
-def get_cached_models() -> Optional[list]:
-    """Get cached model list if still valid."""
+
+def best_model_for(requirements, api_key: Optional[str] = None) -> Optional[str]:
+    """Best free model with every capability in requirements (e.g. {"tools", "context:128k"})."""
+    index = get_capability_index()
+    if index is None and api_key:
+        index = get_capability_index(get_free_models(api_key, stale_ok=True))
+    return index.best(requirements) if index else None
+
+
+# ============== Models Cache ==============
+
+def _encode_models_cache(models: list) -> tuple:
+    """Project ranked models onto the fields FreeRide uses and pack them as columns.
+
+    Returns (columns, payload) where columns maps a column name to
+    [typecode, offset, nbytes] within payload.
+    """
+    vocab = {}
+    param_offsets = array("I", [0])
+    param_indices = array("H")
+    ids = []
+    context_lengths = array("q")
+    created = array("d")
+    prompt_prices = array("d")
+    scores = array("d")
+    modalities = array("B")
+
+    for model in models:
+        ids.append(model.get("id", ""))
+        context_lengths.append(int(model.get("context_length") or 0))
+        created.append(float(model.get("created") or 0))
+        try:
+            prompt_prices.append(float((model.get("pricing") or {}).get("prompt")))
+        except (TypeError, ValueError):
+            prompt_prices.append(math.nan)
+        scores.append(float(model.get("_score", 0.0)))
+        modalities.append(sum(1 << MODALITIES.index(m) for m in set(model_modalities(model)) if m in MODALITIES))
+        for param in model.get("supported_parameters") or []:
+            param_indices.append(vocab.setdefault(param, len(vocab)))
+        param_offsets.append(len(param_indices))
+
+    blobs = [
+        ("id", "s", "\n".join(ids).encode("utf-8")),
+        ("context_length", "q", context_lengths.tobytes()),
+        ("created", "d", created.tobytes()),
+        ("prompt_price", "d", prompt_prices.tobytes()),
+        ("_score", "d", scores.tobytes()),
+        ("modalities", "B", modalities.tobytes()),
+        ("param_offsets", "I", param_offsets.tobytes()),
+        ("param_indices", "H", param_indices.tobytes()),
+    ]
+
+    columns = {}
+    payload = bytearray()
+    for name, typecode, blob in blobs:
+        columns[name] = [typecode, len(payload), len(blob)]
+        payload += blob
+        payload += b"\0" * (-len(payload) % 8)
+
+    columns["param_vocab"] = list(vocab)
+    return columns, bytes(payload)
+
+
+def _decode_models_cache(header: dict, payload: memoryview) -> list:
+    """Rebuild projected model dicts from the binary columns."""
+    columns = header["columns"]
+    count = header["count"]
+
+    def column(name):
+        typecode, offset, nbytes = columns[name]
+        values = array(typecode)
+        values.frombytes(payload[offset:offset + nbytes])
+        return values
+
+    typecode, offset, nbytes = columns["id"]
+    ids = bytes(payload[offset:offset + nbytes]).decode("utf-8").split("\n") if count else []
+    context_lengths = column("context_length")
+    created = column("created")
+    prompt_prices = column("prompt_price")
+    scores = column("_score")
+    modalities = column("modalities")
+    param_offsets = column("param_offsets")
+    param_indices = column("param_indices")
+    vocab = columns["param_vocab"]
+
+    models = []
+    for i in range(count):
+        price = prompt_prices[i]
+        params = param_indices[param_offsets[i]:param_offsets[i + 1]]
+        models.append({
+            "id": ids[i],
+            "context_length": context_lengths[i],
+            "supported_parameters": [vocab[p] for p in params],
+            "created": created[i],
+            "pricing": {} if math.isnan(price) else {"prompt": f"{price:g}"},
+            "architecture": {"input_modalities": [m for b, m in enumerate(MODALITIES) if modalities[i] >> b & 1]},
+            "_score": scores[i],
+        })
+    return models
+
+
+def _read_models_cache() -> Optional[tuple]:
+    """Read the cache file into (header, payload) without decoding any models."""
     if not CACHE_FILE.exists():
         return None
 
     try:
-        cache = json.loads(CACHE_FILE.read_text())
-        cached_at = datetime.fromisoformat(cache.get("cached_at", ""))
-        if datetime.now() - cached_at < timedelta(hours=CACHE_DURATION_HOURS):
-            return cache.get("models", [])
-    except (json.JSONDecodeError, ValueError):
-        pass
+        with open(CACHE_FILE, "rb") as f:
+            if f.readline() != CACHE_MAGIC:
+                return None
+            header = json.loads(f.readline())
+            payload = memoryview(f.read())
+        if header.get("version") != CACHE_FORMAT_VERSION or header.get("byteorder") != sys.byteorder:
+            return None
+        header["cached_at_dt"] = datetime.fromisoformat(header.get("cached_at", ""))
+        return header, payload
+    except (OSError, json.JSONDecodeError, ValueError):
+        return None
+
+
+def _write_models_cache(header: dict, payload: bytes):
+    """Atomically replace the cache file so readers never see a partial write."""
+    CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    header = {k: v for k, v in header.items() if k != "cached_at_dt"}
+    # Per-writer temp file: proxy threads, the standby thread and refreshers may all write at once
+    tmp_path = CACHE_FILE.with_name(f".{CACHE_FILE.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(CACHE_MAGIC)
+        f.write(json.dumps(header, separators=(",", ":")).encode("utf-8") + b"\n")
+        f.write(payload)
+    os.replace(tmp_path, CACHE_FILE)
+
+
+def load_models_cache() -> Optional[dict]:
+    """Load the cache regardless of its age."""
+    raw = _read_models_cache()
+    if not raw:
+        return None
+
+    header, payload = raw
+    return {
+        "cached_at": header["cached_at"],
+        "validators": header.get("validators", {}),
+        "ranking_profile": header.get("ranking_profile"),
+        "performance_stamp": header.get("performance_stamp"),
+        "models": _decode_models_cache(header, payload)
+    }
+
+
+def _rerank_if_inputs_changed(header: dict, models: list) -> list:
+    """Re-score cached models locally when the ranking profile or probe history changed."""
+    profile = load_ranking_profile()
+    if (header.get("ranking_profile") == ranking_profile_fingerprint(profile)
+            and header.get("performance_stamp") == performance_history_stamp()):
+        return models
+
+    history = load_performance_history()
+    models = rank_free_models(models, profile=profile, performance_history=history)
+    save_models_cache(models, header.get("validators"), profile=profile, cached_at=header["cached_at"],
+                      performance_history=history)
+    return models
+
+
+def get_cached_models(max_age_hours: float = CACHE_DURATION_HOURS) -> Optional[list]:
+    """Get cached model list if it is younger than max_age_hours."""
+    raw = _read_models_cache()
+    if not raw:
+        return None
+
+    header, payload = raw
+    if datetime.now() - header["cached_at_dt"] < timedelta(hours=max_age_hours):
+        return _rerank_if_inputs_changed(header, _decode_models_cache(header, payload))
 
     return None
 
 
-def save_models_cache(models: list):
-    """Save models to cache file."""
-    CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
-    cache = {
-        "cached_at": datetime.now().isoformat(),
-        "models": models
+def save_models_cache(
+    models: list,
+    validators: Optional[dict] = None,
+    profile: dict = None,
+    cached_at: Optional[str] = None,
+    performance_history: dict = None
+):
+    """Save the ranked models to the compact cache, along with the catalog's HTTP validators.
+
+    Pass the performance_history the models were ranked with, so the
+    capability index doesn't read the probe store a second time.
+    """
+    if profile is None:
+        profile = load_ranking_profile()
+    columns, payload = _encode_models_cache(models)
+    header = {
+        "version": CACHE_FORMAT_VERSION,
+        "byteorder": sys.byteorder,
+        "cached_at": cached_at or datetime.now().isoformat(),
+        "validators": validators or {},
+        "ranking_profile": ranking_profile_fingerprint(profile),
+        "performance_stamp": performance_history_stamp(),
+        "count": len(models),
+        "columns": columns,
+        "capabilities": CapabilityIndex.from_models(models, performance_history).to_header()
     }
-    CACHE_FILE.write_text(json.dumps(cache, indent=2))
+    _write_models_cache(header, payload)
+
+
+def restamp_models_cache(validators: Optional[dict] = None) -> bool:
+    """Mark the cached ranking as fresh again without decoding or re-encoding it."""
+    raw = _read_models_cache()
+    if not raw:
+        return False
 
+    header, payload = raw
+    header["cached_at"] = datetime.now().isoformat()
+    if validators is not None:
+        header["validators"] = validators
+    _write_models_cache(header, bytes(payload))
+    return True
+
+
+def save_raw_catalog(models: list):
+    """Keep the full, unprojected catalog for anything that needs descriptions etc."""
+    CATALOG_FILE.parent.mkdir(parents=True, exist_ok=True)
+    CATALOG_FILE.write_text(json.dumps(models, separators=(",", ":")))
+
+
+def load_raw_catalog() -> list:
+    """Lazily read the full catalog written by the last successful fetch."""
+    if not CATALOG_FILE.exists():
+        return []
+
+    try:
+        return json.loads(CATALOG_FILE.read_text())
+    except json.JSONDecodeError:
+        return []
+
+
+def _acquire_refresh_lock():
+    """Take the cross-process refresh lock without waiting.
+
+    Returns the open lock file (pass it to _release_refresh_lock), or None
+    if another refresh holds it. The kernel drops an flock when its holder
+    exits, so a crashed refresh never leaves a stale lock to break.
+    """
+    REFRESH_LOCK_FILE.parent.mkdir(parents=True, exist_ok=True)
+    lock_file = open(REFRESH_LOCK_FILE, "a")
+    if fcntl is not None:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return None
+    return lock_file
 
-def get_free_models(api_key: str, force_refresh: bool = False) -> list:
-    """Get ranked free models (from cache or API)."""
+
+def _release_refresh_lock(lock_file):
+    # The file stays: unlinking it would let a waiter lock an orphaned inode
+    if fcntl is not None:
+        fcntl.flock(lock_file, fcntl.LOCK_UN)
+    lock_file.close()
+
+
+def _refresh_in_progress() -> bool:
+    lock_file = _acquire_refresh_lock()
+    if lock_file is None:
+        return True
+    _release_refresh_lock(lock_file)
+    return False
+
+
+def _background_refresh(api_key: str):
+    """Revalidate the cache unless another process is already doing it."""
+    lock_file = _acquire_refresh_lock()
+    if lock_file is None:
+        return
+    try:
+        get_free_models(api_key, force_refresh=True)
+    finally:
+        _release_refresh_lock(lock_file)
+
+
+def refresh_models_in_background(api_key: str, detached: bool = True):
+    """Refresh the model cache without blocking the caller.
+
+    One-shot CLI runs hand the refresh to a detached `freeride refresh --background`
+    process so it outlives them; long-running callers (detached=False) use a thread.
+    """
+    if _refresh_in_progress():
+        return
+
+    if not detached:
+        threading.Thread(
+            target=_background_refresh, args=(api_key,), name="freeride-refresh", daemon=True
+        ).start()
+        return
+
+    import subprocess  # Only this path needs it; keeps cached commands' startup lean
+    try:
+        subprocess.Popen(
+            [sys.executable, str(Path(__file__).resolve()), "refresh", "--background"],
+            env=dict(os.environ, OPENROUTER_API_KEY=api_key),
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+            close_fds=True
+        )
+    except OSError as e:
+        print(f"Warning: could not start background refresh: {e}")
+
+
+def get_free_models(
+    api_key: str,
+    force_refresh: bool = False,
+    stale_ok: bool = False,
+    detached: bool = True
+) -> list:
+    """Get ranked free models (from cache or API).
+
+    A stale or force-refreshed cache is revalidated with a conditional
+    request; on 304 the cached ranking is re-stamped as-is.
+
+    With stale_ok, a stale cache younger than CACHE_MAX_STALENESS_HOURS is
+    returned immediately and revalidated in the background (see
+    refresh_models_in_background for `detached`).
+    """
     if not force_refresh:
         cached = get_cached_models()
         if cached:
             return cached
 
-    all_models = fetch_all_models(api_key)
+        if stale_ok:
+            stale = get_cached_models(max_age_hours=CACHE_MAX_STALENESS_HOURS)
+            if stale:
+                refresh_models_in_background(api_key, detached=detached)
+                return stale
+
+    cache = load_models_cache()
+    validators = None
+    if cache and cache.get("models"):
+        validators = cache.get("validators")
+
+    try:
+        all_models, validators = fetch_models_conditional(api_key, validators)
+    except requests.RequestException as e:
+        # Keep serving whatever we had rather than caching an empty list
+        print(f"Error fetching models: {e}")
+        return cache["models"] if cache else []
+
+    if all_models is None:
+        restamp_models_cache(validators)
+        header = {"cached_at": datetime.now().isoformat(), "validators": validators,
+                  "ranking_profile": cache["ranking_profile"],
+                  "performance_stamp": cache["performance_stamp"]}
+        return _rerank_if_inputs_changed(header, cache["models"])
+
+    save_raw_catalog(all_models)
+    profile = load_ranking_profile()
     free_models = filter_free_models(all_models)
-    ranked_models = rank_free_models(free_models)
+    history = load_performance_history()
+    ranked_models = rank_free_models(free_models, profile=profile, performance_history=history)
 
-    save_models_cache(ranked_models)
+    save_models_cache(ranked_models, validators, profile=profile, performance_history=history)
     return ranked_models
 
 
+class ConfigStore:
+    """Cached, lock-protected access to a JSON config file.
+
+    The parsed config is reused for as long as the file's mtime, size and
+    inode are unchanged. Writes go to a temp file that is renamed over the
+    original while holding an advisory lock, and are skipped entirely when
+    the content would not change (so OpenClaw doesn't reload on no-ops).
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.lock_path = path.with_name(f".{path.name}.lock")
+        self._stamp = None
+        self._config = {}
+
+    def _current_stamp(self) -> Optional[tuple]:
+        try:
+            st = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def peek(self) -> dict:
+        """Return the cached parsed config. Callers must not mutate it."""
+        stamp = self._current_stamp()
+        if stamp is None:
+            self._stamp, self._config = None, {}
+        elif stamp != self._stamp:
+            try:
+                config = json.loads(self.path.read_text())
+            except (OSError, json.JSONDecodeError):
+                config = {}
+            self._stamp, self._config = stamp, config
+        return self._config
+
+    def load(self) -> dict:
+        """Return a private copy of the config that is safe to modify."""
+        return copy.deepcopy(self.peek())
+
+    @contextmanager
+    def _locked(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.lock_path, "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _write(self, config: dict) -> bool:
+        # Caller holds the lock
+        if self._current_stamp() is not None and self.peek() == config:
+            return False
+
+        tmp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, "w") as f:
+            f.write(json.dumps(config, indent=2))
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            os.chmod(tmp_path, stat.S_IMODE(self.path.stat().st_mode))
+        except FileNotFoundError:
+            pass
+        os.replace(tmp_path, self.path)
+
+        self._stamp = self._current_stamp()
+        self._config = copy.deepcopy(config)
+        return True
+
+    def save(self, config: dict) -> bool:
+        """Atomically write the config. Returns False when nothing changed.
+
+        This overwrites whatever is on disk; use update() to modify the
+        config without losing a concurrent writer's changes.
+        """
+        with self._locked():
+            return self._write(config)
+
+    def update(self, apply: Callable[[dict], None]) -> bool:
+        """Read, modify and write the config under a single lock.
+
+        apply() mutates a fresh copy of the on-disk config in place. Keep it
+        quick: other writers wait on the lock. Returns False when nothing
+        changed.
+        """
+        with self._locked():
+            config = self.load()
+            apply(config)
+            return self._write(config)
+
+
+_config_stores = {}
+
+
+def get_config_store() -> ConfigStore:
+    """Shared ConfigStore for OPENCLAW_CONFIG_PATH."""
+    store = _config_stores.get(OPENCLAW_CONFIG_PATH)
+    if store is None:
+        store = _config_stores[OPENCLAW_CONFIG_PATH] = ConfigStore(OPENCLAW_CONFIG_PATH)
+    return store
+
+
 def load_openclaw_config() -> dict:
     """Load OpenClaw configuration."""
-    if not OPENCLAW_CONFIG_PATH.exists():
-        return {}
+    return get_config_store().load()
 
-    try:
-        return json.loads(OPENCLAW_CONFIG_PATH.read_text())
-    except json.JSONDecodeError:
-        return {}
 
+def save_openclaw_config(config: dict) -> bool:
+    """Save OpenClaw configuration. Returns False if it was already up to date."""
+    return get_config_store().save(config)
 
-def save_openclaw_config(config: dict):
-    """Save OpenClaw configuration."""
-    OPENCLAW_CONFIG_PATH.parent.mkdir(parents=True, exist_ok=True)
-    OPENCLAW_CONFIG_PATH.write_text(json.dumps(config, indent=2))
+
+def update_openclaw_config(apply: Callable[[dict], None]) -> bool:
+    """Modify OpenClaw configuration in place under the config lock.
+
+    Returns False if it was already up to date.
+    """
+    return get_config_store().update(apply)
 
 
 def format_model_for_openclaw(model_id: str, with_provider_prefix: bool = True) -> str:
@@ -242,14 +1066,14 @@ def format_model_for_openclaw(model_id: str, with_provider_prefix: bool = True)
 def get_current_model(config: dict = None) -> Optional[str]:
     """Get currently configured model in OpenClaw."""
     if config is None:
-        config = load_openclaw_config()
+        config = get_config_store().peek()
     return config.get("agents", {}).get("defaults", {}).get("model", {}).get("primary")
 
 
 def get_current_fallbacks(config: dict = None) -> list:
     """Get currently configured fallback models."""
     if config is None:
-        config = load_openclaw_config()
+        config = get_config_store().peek()
     return config.get("agents", {}).get("defaults", {}).get("model", {}).get("fallbacks", [])
 
 
@@ -288,7 +1112,8 @@ def update_model_config(
     as_primary: bool = True,
     add_fallbacks: bool = True,
     fallback_count: int = 5,
-    setup_auth: bool = False
+    setup_auth: bool = False,
+    candidates: Optional[list] = None
 ) -> bool:
     """Update OpenClaw config with the specified model.
 
@@ -298,77 +1123,82 @@ def update_model_config(
         add_fallbacks: If True, also configure fallback models
         fallback_count: Number of fallback models to add
         setup_auth: If True, also set up OpenRouter auth profile
+        candidates: Ranked model IDs to take fallbacks from (default: all free models)
     """
-    config = load_openclaw_config()
-    config = ensure_config_structure(config)
-
-    if setup_auth:
-        config = setup_openrouter_auth(config)
+    # Fetch candidates before taking the config lock
+    free_models = None
+    api_key = get_api_key() if add_fallbacks else None
+    if api_key:
+        if candidates is not None:
+            free_models = [{"id": model_id} for model_id in candidates]
+        else:
+            free_models = get_free_models(api_key, stale_ok=True)
 
     formatted_primary = format_model_for_openclaw(model_id, with_provider_prefix=True)
     formatted_for_list = format_model_for_openclaw(model_id, with_provider_prefix=False)
 
-    if as_primary:
-        # Set as primary model
-        config["agents"]["defaults"]["model"]["primary"] = formatted_primary
-        # Add to models allowlist
-        config["agents"]["defaults"]["models"][formatted_for_list] = {}
-
-    # Handle fallbacks
-    if add_fallbacks:
-        api_key = get_api_key()
-        if api_key:
-            free_models = get_free_models(api_key)
-
-            # Get existing fallbacks
-            existing_fallbacks = config["agents"]["defaults"]["model"].get("fallbacks", [])
-
-            # Build new fallbacks list
-            new_fallbacks = []
-
-            # Always add openrouter/free as first fallback (smart router)
-            # Skip if it's being set as primary
-            free_router = "openrouter/free"
-            free_router_primary = format_model_for_openclaw("openrouter/free", with_provider_prefix=True)
-            if formatted_primary != free_router_primary and formatted_for_list != free_router:
-                new_fallbacks.append(free_router)
-                config["agents"]["defaults"]["models"][free_router] = {}
-
-            for m in free_models:
-                # Reserve one slot for openrouter/free
-                if len(new_fallbacks) >= fallback_count:
-                    break
-
-                m_formatted = format_model_for_openclaw(m["id"], with_provider_prefix=False)
-                m_formatted_primary = format_model_for_openclaw(m["id"], with_provider_prefix=True)
-
-                # Skip openrouter/free (already added as first)
-                if "openrouter/free" in m["id"]:
-                    continue
+    def apply(config: dict):
+        ensure_config_structure(config)
 
-                # Skip if it's the new primary
-                if as_primary and (m_formatted == formatted_for_list or m_formatted_primary == formatted_primary):
-                    continue
+        if setup_auth:
+            setup_openrouter_auth(config)
 
-                # Skip if it's the current primary (when adding to fallbacks only)
-                current_primary = config["agents"]["defaults"]["model"].get("primary", "")
-                if not as_primary and m_formatted_primary == current_primary:
-                    continue
+        if as_primary:
+            # Set as primary model
+            config["agents"]["defaults"]["model"]["primary"] = formatted_primary
+            # Add to models allowlist
+            config["agents"]["defaults"]["models"][formatted_for_list] = {}
 
-                new_fallbacks.append(m_formatted)
-                config["agents"]["defaults"]["models"][m_formatted] = {}
+        # Handle fallbacks
+        if free_models is None:
+            return
 
-            # If not setting as primary, prepend new model to fallbacks (after openrouter/free)
-            if not as_primary:
-                if formatted_for_list not in new_fallbacks:
-                    # Insert after openrouter/free if present
-                    insert_pos = 1 if free_router in new_fallbacks else 0
-                    new_fallbacks.insert(insert_pos, formatted_for_list)
-                config["agents"]["defaults"]["models"][formatted_for_list] = {}
+        # Build new fallbacks list
+        new_fallbacks = []
 
-            config["agents"]["defaults"]["model"]["fallbacks"] = new_fallbacks
+        # Always add openrouter/free as first fallback (smart router)
+        # Skip if it's being set as primary
+        free_router = "openrouter/free"
+        free_router_primary = format_model_for_openclaw("openrouter/free", with_provider_prefix=True)
+        if formatted_primary != free_router_primary and formatted_for_list != free_router:
+            new_fallbacks.append(free_router)
+            config["agents"]["defaults"]["models"][free_router] = {}
 
-    save_openclaw_config(config)
+        for m in free_models:
+            # Reserve one slot for openrouter/free
+            if len(new_fallbacks) >= fallback_count:
+                break
+
+            m_formatted = format_model_for_openclaw(m["id"], with_provider_prefix=False)
+            m_formatted_primary = format_model_for_openclaw(m["id"], with_provider_prefix=True)
+
+            # Skip openrouter/free (already added as first)
+            if "openrouter/free" in m["id"]:
+                continue
+
+            # Skip if it's the new primary
+            if as_primary and (m_formatted == formatted_for_list or m_formatted_primary == formatted_primary):
+                continue
+
+            # Skip if it's the current primary (when adding to fallbacks only)
+            current_primary = config["agents"]["defaults"]["model"].get("primary", "")
+            if not as_primary and m_formatted_primary == current_primary:
+                continue
+
+            new_fallbacks.append(m_formatted)
+            config["agents"]["defaults"]["models"][m_formatted] = {}
+
+        # If not setting as primary, prepend new model to fallbacks (after openrouter/free)
+        if not as_primary:
+            if formatted_for_list not in new_fallbacks:
+                # Insert after openrouter/free if present
+                insert_pos = 1 if free_router in new_fallbacks else 0
+                new_fallbacks.insert(insert_pos, formatted_for_list)
+            config["agents"]["defaults"]["models"][formatted_for_list] = {}
+
+        config["agents"]["defaults"]["model"]["fallbacks"] = new_fallbacks
+
+    update_openclaw_config(apply)
     return True
 
 
@@ -384,7 +1214,7 @@ def cmd_list(args):
         sys.exit(1)
 
     print("Fetching free models from OpenRouter...")
-    models = get_free_models(api_key, force_refresh=args.refresh)
+    models = get_free_models(api_key, force_refresh=args.refresh, stale_ok=True)
 
     if not models:
         print("No free models available.")
@@ -445,7 +1275,7 @@ def cmd_switch(args):
     as_fallback = args.fallback_only
 
     # Validate model exists and is free
-    models = get_free_models(api_key)
+    models = get_free_models(api_key, stale_ok=True)
     model_ids = [m["id"] for m in models]
 
     # Check for exact match or partial match
@@ -475,7 +1305,7 @@ def cmd_switch(args):
         add_fallbacks=not args.no_fallbacks,
         setup_auth=args.setup_auth
     ):
-        config = load_openclaw_config()
+        config = get_config_store().peek()
 
         if as_fallback:
             print("Success! Added to fallbacks.")
@@ -505,16 +1335,34 @@ def cmd_auto(args):
         print("Error: OPENROUTER_API_KEY not set")
         sys.exit(1)
 
-    config = load_openclaw_config()
-    current_primary = get_current_model(config)
+    current_primary = get_current_model()
 
     print("Finding best free model...")
-    models = get_free_models(api_key, force_refresh=True)
+    models = get_free_models(api_key, force_refresh=args.refresh, stale_ok=True)
 
     if not models:
         print("Error: No free models available.")
         sys.exit(1)
 
+    candidates = None
+    if args.profile:
+        # Only models that can do the job, so a profile never costs a failed call
+        profile = TASK_PROFILES[args.profile]
+        index = get_capability_index(models)
+        candidates = [m for m in profile_candidates(index, profile) if "openrouter/free" not in m]
+        required = profile.get("require", [])
+        if not candidates:
+            print(f"Error: No free model matches profile '{args.profile}' ({', '.join(required)}).")
+            sys.exit(1)
+        preferred = index.count(required + profile.get("prefer", []))
+        print(f"Profile '{args.profile}': {len(candidates)} models with "
+              f"{', '.join(required) or 'no hard requirements'}, "
+              f"{preferred} also with {', '.join(profile.get('prefer', []))}")
+        if not preferred and "fast" in profile.get("prefer", []):
+            print("No model has measured fast yet; run `freeride bench` to measure speed.")
+        by_id = {m["id"]: m for m in models}
+        models = [by_id[model_id] for model_id in candidates]
+
     # Find best SPECIFIC model (skip openrouter/free router)
     # openrouter/free is a router, not a specific model - use it as fallback only
     best_model = None
@@ -549,9 +1397,10 @@ def cmd_auto(args):
         as_primary=not as_fallback,
         add_fallbacks=True,
         fallback_count=args.fallback_count,
-        setup_auth=args.setup_auth
+        setup_auth=args.setup_auth,
+        candidates=candidates
     ):
-        config = load_openclaw_config()
+        config = get_config_store().peek()
 
         if as_fallback:
             print("\nFallbacks configured!")
@@ -576,7 +1425,7 @@ def cmd_auto(args):
 def cmd_status(args):
     """Show current configuration status."""
     api_key = get_api_key()
-    config = load_openclaw_config()
+    config = get_config_store().peek()
     current = get_current_model(config)
     fallbacks = get_current_fallbacks(config)
 
@@ -611,11 +1460,11 @@ def cmd_status(args):
 
     # Cache status
     if CACHE_FILE.exists():
+        raw = _read_models_cache()
         try:
-            cache = json.loads(CACHE_FILE.read_text())
-            cached_at = datetime.fromisoformat(cache.get("cached_at", ""))
-            models_count = len(cache.get("models", []))
-            age = datetime.now() - cached_at
+            header, _ = raw
+            models_count = header["count"]
+            age = datetime.now() - header["cached_at_dt"]
             hours = age.seconds // 3600
             mins = (age.seconds % 3600) // 60
             print(f"\nModel Cache: {models_count} models (updated {hours}h {mins}m ago)")
@@ -636,6 +1485,10 @@ def cmd_refresh(args):
         print("Error: OPENROUTER_API_KEY not set")
         sys.exit(1)
 
+    if args.background:
+        _background_refresh(api_key)
+        return
+
     print("Refreshing free models cache...")
     models = get_free_models(api_key, force_refresh=True)
     print(f"Cached {len(models)} free models.")
@@ -659,36 +1512,42 @@ def cmd_fallbacks(args):
     print(f"Current primary: {current or 'None'}")
     print(f"Setting up {args.count} fallback models...")
 
-    models = get_free_models(api_key)
-    config = ensure_config_structure(config)
+    models = get_free_models(api_key, stale_ok=True)
 
     # Get fallbacks excluding current model
     fallbacks = []
 
-    # Always add openrouter/free as first fallback (smart router)
-    free_router = "openrouter/free"
-    free_router_primary = format_model_for_openclaw("openrouter/free", with_provider_prefix=True)
-    if not current or current != free_router_primary:
-        fallbacks.append(free_router)
-        config["agents"]["defaults"]["models"][free_router] = {}
-
-    for m in models:
-        formatted = format_model_for_openclaw(m["id"], with_provider_prefix=False)
-        formatted_primary = format_model_for_openclaw(m["id"], with_provider_prefix=True)
+    def apply(config: dict):
+        ensure_config_structure(config)
+        # Re-read under the lock in case the primary changed meanwhile
+        current = get_current_model(config)
+        fallbacks.clear()
+
+        # Always add openrouter/free as first fallback (smart router)
+        free_router = "openrouter/free"
+        free_router_primary = format_model_for_openclaw("openrouter/free", with_provider_prefix=True)
+        if not current or current != free_router_primary:
+            fallbacks.append(free_router)
+            config["agents"]["defaults"]["models"][free_router] = {}
+
+        for m in models:
+            formatted = format_model_for_openclaw(m["id"], with_provider_prefix=False)
+            formatted_primary = format_model_for_openclaw(m["id"], with_provider_prefix=True)
+
+            if current and (formatted_primary == current):
+                continue
+            # Skip openrouter/free (already added as first)
+            if "openrouter/free" in m["id"]:
+                continue
+            if len(fallbacks) >= args.count:
+                break
 
-        if current and (formatted_primary == current):
-            continue
-        # Skip openrouter/free (already added as first)
-        if "openrouter/free" in m["id"]:
-            continue
-        if len(fallbacks) >= args.count:
-            break
+            fallbacks.append(formatted)
+            config["agents"]["defaults"]["models"][formatted] = {}
 
-        fallbacks.append(formatted)
-        config["agents"]["defaults"]["models"][formatted] = {}
+        config["agents"]["defaults"]["model"]["fallbacks"] = list(fallbacks)
 
-    config["agents"]["defaults"]["model"]["fallbacks"] = fallbacks
-    save_openclaw_config(config)
+    update_openclaw_config(apply)
 
     print(f"\nConfigured {len(fallbacks)} fallback models:")
     for i, fb in enumerate(fallbacks, 1):
@@ -698,6 +1557,63 @@ def cmd_fallbacks(args):
     print("Restart OpenClaw for changes to take effect.")
 
 
+def cmd_proxy(args):
+    """Run the local failover proxy."""
+    from proxy import serve
+
+    serve(host=args.host, port=args.port, hedge=args.hedge or args.hedge_after_ms is not None,
+          hedge_after_ms=args.hedge_after_ms, verbose=args.verbose, cache=not args.no_cache,
+          cache_ttl_hours=args.cache_ttl, cache_max_mb=args.cache_max_mb)
+
+
+def cmd_bench(args):
+    """Benchmark the top free models and compare them."""
+    from bench import run_benchmark, save_bench_run, load_bench_results, print_bench_table, best_model
+
+    if args.show:
+        runs = load_bench_results()
+        if not runs:
+            print("No benchmark results yet. Run: freeride bench")
+            return
+        print_bench_table(runs[-1])
+        return
+
+    api_key = get_api_key()
+    if not api_key:
+        print("Error: OPENROUTER_API_KEY not set")
+        sys.exit(1)
+
+    if args.models:
+        model_ids = [format_model_for_openclaw(m.strip(), with_provider_prefix=False)
+                     for m in args.models.split(",") if m.strip()]
+    else:
+        models = get_free_models(api_key, stale_ok=True)
+        model_ids = [m["id"] for m in models if "openrouter/free" not in m["id"]][:args.top]
+
+    if not model_ids:
+        print("No free models to benchmark.")
+        return
+
+    print(f"Benchmarking {len(model_ids)} models "
+          f"(concurrency {args.concurrency}, {args.rounds} round(s), max_tokens {args.max_tokens})...")
+
+    def progress(model_id, prompt, result):
+        if args.verbose:
+            outcome = f"{result['total_ms']:.0f}ms" if result["ok"] else result["err"]
+            print(f"  {model_id:<45} {prompt:<8} {outcome}")
+
+    run = run_benchmark(api_key, model_ids, concurrency=args.concurrency, rounds=args.rounds,
+                        max_tokens=args.max_tokens, progress=progress)
+    save_bench_run(run)
+    print_bench_table(run)
+
+    best = best_model(run)
+    if best:
+        print(f"\nFastest measured: {best}")
+        print(f"  freeride switch {best}      Make it the primary")
+    print("\nResults are saved and feed the ranking's performance score.")
+
+
 def main():
     parser = argparse.ArgumentParser(
         prog="freeride",
@@ -730,18 +1646,60 @@ def main():
                             help="Add to fallbacks only, don't change primary")
     auto_parser.add_argument("--setup-auth", action="store_true",
                             help="Also set up OpenRouter auth profile")
+    auto_parser.add_argument("--refresh", "-r", action="store_true",
+                            help="Block on a catalog refresh instead of using the cache")
+    auto_parser.add_argument("--profile", "-p", choices=sorted(TASK_PROFILES),
+                            help="Pick primary and fallbacks from models suited to a task")
 
     # status command
     subparsers.add_parser("status", help="Show current configuration")
 
     # refresh command
-    subparsers.add_parser("refresh", help="Refresh model cache")
+    refresh_parser = subparsers.add_parser("refresh", help="Refresh model cache")
+    refresh_parser.add_argument("--background", action="store_true",
+                               help=argparse.SUPPRESS)
 
     # fallbacks command
     fallbacks_parser = subparsers.add_parser("fallbacks", help="Configure fallback models")
     fallbacks_parser.add_argument("--count", "-c", type=int, default=5,
                                  help="Number of fallback models (default: 5)")
 
+    # proxy command
+    proxy_parser = subparsers.add_parser("proxy", help="Run a local OpenAI-compatible failover proxy")
+    proxy_parser.add_argument("--host", default="127.0.0.1",
+                             help="Address to listen on (default: 127.0.0.1)")
+    proxy_parser.add_argument("--port", "-p", type=int, default=8765,
+                             help="Port to listen on (default: 8765)")
+    proxy_parser.add_argument("--hedge", action="store_true",
+                             help="Race the next model once the primary passes its p95 TTFT")
+    proxy_parser.add_argument("--hedge-after-ms", type=float, metavar="MS",
+                             help="Hedge after a fixed delay instead of the measured p95")
+    proxy_parser.add_argument("--verbose", "-v", action="store_true",
+                             help="Log every request")
+    proxy_parser.add_argument("--no-cache", action="store_true",
+                             help="Don't cache temperature-0 responses")
+    proxy_parser.add_argument("--cache-ttl", type=float, default=24, metavar="HOURS",
+                             help="Response cache lifetime (default: 24)")
+    proxy_parser.add_argument("--cache-max-mb", type=float, default=64, metavar="MB",
+                             help="Response cache size limit (default: 64)")
+
+    # bench command
+    bench_parser = subparsers.add_parser("bench", help="Benchmark the top free models")
+    bench_parser.add_argument("--top", "-n", type=int, default=5,
+                             help="Number of top-ranked models to benchmark (default: 5)")
+    bench_parser.add_argument("--models", "-m",
+                             help="Comma-separated model IDs to benchmark instead of the top N")
+    bench_parser.add_argument("--concurrency", "-c", type=int, default=4,
+                             help="Requests in flight at once (default: 4)")
+    bench_parser.add_argument("--rounds", type=int, default=1,
+                             help="Passes over the prompt set per model (default: 1)")
+    bench_parser.add_argument("--max-tokens", type=int, default=128,
+                             help="Completion budget per request (default: 128)")
+    bench_parser.add_argument("--show", action="store_true",
+                             help="Print the last saved results instead of running")
+    bench_parser.add_argument("--verbose", "-v", action="store_true",
+                             help="Print every request as it finishes")
+
     args = parser.parse_args()
 
     if args.command == "list":
@@ -756,6 +1714,10 @@ def main():
         cmd_refresh(args)
     elif args.command == "fallbacks":
         cmd_fallbacks(args)
+    elif args.command == "proxy":
+        cmd_proxy(args)
+    elif args.command == "bench":
+        cmd_bench(args)
     else:
         parser.print_help()
         sys.exit(1)
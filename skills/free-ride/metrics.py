@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+FreeRide metrics
+Prometheus-format counters, gauges and histograms for the watcher, served
+on a local /metrics endpoint or written as a node_exporter textfile, plus
+an optional structured JSONL event log.
+"""
+
+import json
+import os
+import re
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+
+# Constants
+METRICS_HOST = "127.0.0.1"
+METRICS_PORT = 9465
+
+# name: (type, help, histogram buckets)
+WATCHER_METRICS = {
+    "freeride_probes_total": ("counter", "Health probes by model and result.", None),
+    "freeride_probe_ttft_seconds": ("histogram", "Time to first token of successful probes.",
+                                    (0.25, 0.5, 1, 2, 4, 8, 16, 32)),
+    "freeride_rotations_total": ("counter", "Primary model rotations by reason.", None),
+    "freeride_config_writes_total": ("counter", "OpenClaw config saves (written, or unchanged and skipped).", None),
+    "freeride_breaker_trips_total": ("counter", "Circuit breakers opened, by error.", None),
+    "freeride_check_duration_seconds": ("histogram", "Duration of a check-and-rotate cycle.",
+                                        (0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60, 120)),
+    "freeride_degraded_seconds_total": ("counter", "Time the primary was failing without a healthy replacement.", None),
+    "freeride_models_in_cooldown": ("gauge", "Models whose circuit breaker is open.", None),
+    "freeride_breakers": ("gauge", "Circuit breakers by state.", None),
+    "freeride_primary_healthy": ("gauge", "1 if the last check found the primary healthy.", None),
+    "freeride_check_interval_seconds": ("gauge", "Current adaptive check interval.", None),
+    "freeride_last_check_timestamp_seconds": ("gauge", "Unix time of the last completed check.", None),
+    "freeride_probe_budget_used": ("gauge", "Probes per model in the last hour.", None),
+}
+
+_SAMPLE_PATTERN = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(.*)\})? (\S+)$')
+_LABEL_PATTERN = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)="((?:[^"\\]|\\.)*)"')
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _unescape(value: str) -> str:
+    return re.sub(r'\\(.)', lambda m: "\n" if m.group(1) == "n" else m.group(1), value)
+
+
+def _format_labels(labels: tuple, extra: str = "") -> str:
+    parts = [f'{key}="{_escape(value)}"' for key, value in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metrics:
+    """Thread-safe registry of labelled counters, gauges and histograms.
+
+    Collectors registered with add_collector() run before every render, so
+    gauges derived from watcher state are always current.
+    """
+
+    def __init__(self, definitions: dict = WATCHER_METRICS):
+        self.definitions = definitions
+        self._values = {name: {} for name in definitions}   # name -> {labels: value or [buckets, sum, count]}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def _labels(self, labels: dict) -> tuple:
+        return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = self._labels(labels)
+        with self._lock:
+            series = self._values[name]
+            series[key] = series.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels):
+        with self._lock:
+            self._values[name][self._labels(labels)] = value
+
+    def clear(self, name: str):
+        """Drop every series of a gauge (before re-collecting it)."""
+        with self._lock:
+            self._values[name] = {}
+
+    def observe(self, name: str, value: float, **labels):
+        buckets = self.definitions[name][2]
+        key = self._labels(labels)
+        with self._lock:
+            series = self._values[name].get(key)
+            if series is None:
+                series = self._values[name][key] = [[0] * len(buckets), 0.0, 0]
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def add_collector(self, collector):
+        """Register collector(metrics), called before each render."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        for collector in self._collectors:
+            try:
+                collector(self)
+            except Exception:
+                pass  # A broken collector must not take /metrics down
+
+        lines = []
+        with self._lock:
+            for name, (kind, help_text, buckets) in self.definitions.items():
+                series = self._values[name]
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in sorted(series.items()):
+                    if kind != "histogram":
+                        lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+                        continue
+                    counts, total, count = value
+                    cumulative = 0
+                    for bound, bucket_count in zip(buckets, counts):
+                        cumulative += bucket_count
+                        le = 'le="%g"' % bound
+                        lines.append(f"{name}_bucket{_format_labels(labels, le)} {cumulative}")
+                    le = 'le="+Inf"'
+                    lines.append(f"{name}_bucket{_format_labels(labels, le)} {count}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(total)}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def restore(self, text: str):
+        """Carry counters and histograms over from an earlier render (textfile mode),
+        so values keep accumulating across short-lived runs."""
+        histograms = {}
+        with self._lock:
+            for line in text.splitlines():
+                match = _SAMPLE_PATTERN.match(line)
+                if not match:
+                    continue
+                sample, label_text, raw = match.groups()
+                try:
+                    value = float(raw)
+                except ValueError:
+                    continue
+                labels = dict((k, _unescape(v)) for k, v in _LABEL_PATTERN.findall(label_text or ""))
+
+                if self.definitions.get(sample, ("gauge",))[0] == "counter":
+                    self._values[sample][self._labels(labels)] = value
+                    continue
+                for suffix in ("_bucket", "_sum", "_count"):
+                    name = sample[:-len(suffix)]
+                    if sample.endswith(suffix) and self.definitions.get(name, ("",))[0] == "histogram":
+                        bound = labels.pop("le", None)
+                        entry = histograms.setdefault((name, self._labels(labels)), {"buckets": {}})
+                        if suffix == "_bucket":
+                            entry["buckets"][bound] = value
+                        else:
+                            entry[suffix] = value
+                        break
+
+            for (name, key), entry in histograms.items():
+                buckets = self.definitions[name][2]
+                counts, previous = [], 0
+                for bound in buckets:
+                    cumulative = int(entry["buckets"].get(f"{bound:g}", previous))
+                    counts.append(cumulative - previous)
+                    previous = cumulative
+                self._values[name][key] = [counts, entry.get("_sum", 0.0), int(entry.get("_count", 0))]
+
+    def write_textfile(self, path: Path):
+        """Atomically write the metrics for node_exporter's textfile collector."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(self.render())
+        os.replace(tmp_path, path)
+
+
+class EventLog:
+    """Append-only JSONL log: one {"ts", "event", ...} object per line."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a", buffering=1)
+        self._lock = threading.Lock()
+
+    def emit(self, event: str, **fields):
+        record = {"ts": datetime.now().isoformat(timespec="milliseconds"), "event": event, **fields}
+        line = json.dumps(record, separators=(",", ":"), default=str)
+        with self._lock:
+            # Late events from background threads after shutdown are dropped
+            if not self._file.closed:
+                self._file.write(line + "\n")
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split("?")[0].rstrip("/") not in ("/metrics", ""):
+            self.send_error(404)
+            return
+        body = get_metrics().render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def serve_metrics(host: str = METRICS_HOST, port: int = METRICS_PORT) -> ThreadingHTTPServer:
+    """Serve /metrics from a background thread; returns the server (call shutdown() to stop)."""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="freeride-metrics", daemon=True).start()
+    return server
+
+
+_metrics = None
+_event_log = None
+
+
+def get_metrics() -> Metrics:
+    """Process-wide metrics registry."""
+    global _metrics
+    if _metrics is None:
+        _metrics = Metrics()
+    return _metrics
+
+
+def open_event_log(path: Path) -> EventLog:
+    """Start writing events to path (closing any previous log)."""
+    global _event_log
+    if _event_log is not None:
+        _event_log.close()
+    _event_log = EventLog(path)
+    return _event_log
+
+
+def close_event_log():
+    global _event_log
+    if _event_log is not None:
+        _event_log.close()
+        _event_log = None
+
+
+def emit(event: str, **fields):
+    """Write an event to the event log, if one is open."""
+    event_log = _event_log
+    if event_log is not None:
+        event_log.emit(event, **fields)
@@ -0,0 +1,482 @@
+#!/usr/bin/env python3
+"""
+FreeRide Proxy
+Local OpenAI-compatible endpoint in front of OpenRouter. Requests go to the
+current primary and fail over through the ranked free models within the
+same request, so a 429 never reaches OpenClaw.
+"""
+
+import json
+import queue
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+try:
+    import requests
+except ImportError:
+    print("Error: requests library required")
+    sys.exit(1)
+
+from main import (
+    get_api_key,
+    get_free_models,
+    get_current_model,
+    performance_history_stamp
+)
+from ratelimit import get_rate_limiter
+from respcache import (
+    ResponseCache,
+    cache_key,
+    is_cacheable,
+    RESPONSE_CACHE_TTL_HOURS,
+    RESPONSE_CACHE_MAX_MB
+)
+from watcher import (
+    load_state,
+    is_model_rate_limited,
+    mark_model_failed,
+    mark_model_ok,
+    retry_after_seconds,
+    latency_summary,
+    OPENROUTER_CHAT_URL,
+    LATENCY_HISTORY_SIZE
+)
+
+
+# Constants
+PROXY_HOST = "127.0.0.1"
+PROXY_PORT = 8765
+PROXY_MAX_ATTEMPTS = 4                 # Models tried per request (primary included)
+PROXY_DEFAULT_HEDGE_MS = 3000          # Hedge delay for models without probe history
+PROXY_UPSTREAM_TIMEOUT = (10, 120)     # (connect, read) seconds
+PROXY_QUEUE_SECONDS = 10               # Longest a request waits for request budget
+AUTO_MODEL_IDS = {"", "auto", "freeride/auto", "openrouter/auto"}
+RETRYABLE_STATUS = {429, 502, 503, 504}
+
+
+def _error_body(message: str, code: int) -> bytes:
+    return json.dumps({"error": {"message": message, "code": code, "type": "freeride_proxy"}}).encode()
+
+
+class _Attempt(threading.Thread):
+    """One upstream request, run until its first token (or full body) arrives.
+
+    The attempt reports itself on `done` once it knows whether the model
+    is answering. For streams the SSE lines read so far are kept in
+    `buffered` and the rest is relayed from `lines`.
+    """
+
+    def __init__(self, session, api_key: str, model_id: str, body: dict, stream: bool, done: queue.Queue):
+        super().__init__(name=f"freeride-proxy-{model_id}", daemon=True)
+        self.session = session
+        self.api_key = api_key
+        self.model_id = model_id
+        self.body = dict(body, model=model_id)
+        self.stream = stream
+        self.done = done
+        self.cancelled = threading.Event()
+        self._lock = threading.Lock()
+        self._finished = False
+        self.response = None
+        self.status = None
+        self.err = None
+        self.retry_after = None
+        self.buffered = []
+        self.lines = None
+        self.content = b""
+        self.started = time.perf_counter()
+
+    @property
+    def ok(self) -> bool:
+        return self.status == 200 and self.err is None
+
+    @property
+    def retryable(self) -> bool:
+        return self.err is not None or self.status in RETRYABLE_STATUS
+
+    def run(self):
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+            "HTTP-Referer": "https://github.com/Shaivpidadi/FreeRide",
+            "X-Title": "FreeRide Proxy"
+        }
+        try:
+            self.response = self.session.post(
+                OPENROUTER_CHAT_URL, headers=headers, json=self.body,
+                timeout=PROXY_UPSTREAM_TIMEOUT, stream=True
+            )
+            self.status = self.response.status_code
+            if self.status != 200:
+                self.retry_after = retry_after_seconds(self.response.headers)
+                self.content = self.response.content
+            elif self.stream:
+                # Hold the answer back until the first data line, so a model
+                # that accepts the request but never produces a token can
+                # still be hedged against
+                self.lines = self.response.iter_lines(chunk_size=None)
+                for line in self.lines:
+                    self.buffered.append(line)
+                    if line.startswith(b"data:") or self.cancelled.is_set():
+                        break
+                if self.buffered and self.buffered[-1].startswith(b"data:"):
+                    try:
+                        event = json.loads(self.buffered[-1][5:])
+                    except ValueError:
+                        event = None
+                    if isinstance(event, dict) and "error" in event:
+                        # Accepted, then failed before the first token
+                        self.err = "stream_error"
+                        self.content = self.buffered[-1][5:].strip()
+                        self.response.close()
+            else:
+                self.content = self.response.content
+        except requests.Timeout:
+            self.err = "timeout"
+        except requests.RequestException:
+            self.err = "request_error"
+        finally:
+            if self.status is None and self.err is None:
+                self.err = "request_error"
+            with self._lock:
+                self._finished = True
+                if self.cancelled.is_set():
+                    self.close()
+            self.done.put(self)
+
+    def cancel(self):
+        """Abandon this attempt. A read in progress is left to finish and close itself,
+        since closing the response under a blocked reader would wait for that read."""
+        with self._lock:
+            self.cancelled.set()
+            if self._finished:
+                self.close()
+
+    def close(self):
+        if self.response is not None:
+            self.response.close()
+
+
+class _Throttled:
+    """Stand-in failure when every model in the chain is out of request budget."""
+
+    status = 429
+    err = None
+
+    def __init__(self, retry_after: float):
+        self.retry_after = retry_after
+        self.content = _error_body("All free models are at their request budget", 429)
+
+
+class FreeRideProxy:
+    """Failover state shared by all request handlers."""
+
+    def __init__(self, api_key: str, hedge: bool = False, hedge_after_ms: float = None,
+                 max_attempts: int = PROXY_MAX_ATTEMPTS, cache: ResponseCache = None):
+        self.api_key = api_key
+        self.cache = cache
+        self.hedge = hedge
+        self.hedge_after_ms = hedge_after_ms
+        self.max_attempts = max_attempts
+        self.state = load_state()
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=32)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._p95_stamp = None
+        self._p95 = {}
+
+    def ranked_models(self) -> list:
+        # Long-running: revalidate a stale cache on a thread, not a spawned process
+        return [m["id"] for m in get_free_models(self.api_key, stale_ok=True, detached=False)
+                if "openrouter/free" not in m["id"]]
+
+    def failover_chain(self, requested: Optional[str]) -> list:
+        """Models to try for a request: the requested or current primary, then the ranking."""
+        requested = (requested or "").strip()
+        if requested.startswith("openrouter/") and requested not in AUTO_MODEL_IDS:
+            requested = requested[len("openrouter/"):]
+
+        ranked = self.ranked_models()
+        if requested in AUTO_MODEL_IDS or requested not in ranked:
+            current = get_current_model() or ""
+            requested = current[len("openrouter/"):] if current.startswith("openrouter/") else current
+
+        chain = [requested] if requested else []
+        chain += [m for m in ranked if m != requested]
+        # Pick up breakers opened or closed by the watcher and other proxies
+        self.state.refresh()
+        usable = [m for m in chain if not is_model_rate_limited(self.state, m)]
+        # Every breaker open: still try the best models rather than failing outright
+        return (usable or chain)[:self.max_attempts]
+
+    def hedge_delay(self, model_id: str) -> Optional[float]:
+        """Seconds to wait on model_id before hedging, or None if hedging is off."""
+        if not self.hedge:
+            return None
+        if self.hedge_after_ms is not None:
+            return self.hedge_after_ms / 1000
+
+        stamp = performance_history_stamp()
+        if stamp != self._p95_stamp:
+            history = self.state.probes.samples(limit=LATENCY_HISTORY_SIZE)
+            self._p95 = {m: latency_summary(samples)["ttft_p95"] for m, samples in history.items()}
+            self._p95_stamp = stamp
+        p95 = self._p95.get(model_id)
+        return (p95 if p95 is not None else PROXY_DEFAULT_HEDGE_MS) / 1000
+
+    def forward(self, body: dict) -> tuple:
+        """
+        Run a request through the failover chain.
+
+        Returns (winning attempt or None, last failed attempt or None, tried
+        models). Retryable failures (429/5xx, timeouts) move on to the next
+        model; other errors are the client's and are returned as they are.
+
+        Every attempt takes a token from the model's rate limiter. Models
+        at their limit are passed over for the next one in the chain, and
+        if all of them are, the request waits up to PROXY_QUEUE_SECONDS
+        for budget rather than spending a call on a certain 429.
+        """
+        remaining = self.failover_chain(body.get("model"))
+        stream = bool(body.get("stream"))
+        limiter = get_rate_limiter()
+        done = queue.Queue()
+        inflight = []
+        tried = []
+
+        def launch(queue_seconds: float = PROXY_QUEUE_SECONDS) -> bool:
+            deadline = time.monotonic() + queue_seconds
+            while remaining:
+                for model_id in remaining:
+                    if limiter.try_acquire(model_id):
+                        remaining.remove(model_id)
+                        attempt = _Attempt(self.session, self.api_key, model_id, body, stream, done)
+                        inflight.append(attempt)
+                        tried.append(model_id)
+                        attempt.start()
+                        return True
+                wait = min(limiter.wait_time(model_id) for model_id in remaining)
+                if time.monotonic() + wait > deadline:
+                    return False
+                time.sleep(wait)
+            return False
+
+        def hedge_deadline() -> Optional[float]:
+            # Measured from the start of the newest attempt
+            delay = self.hedge_delay(tried[-1])
+            return time.monotonic() + delay if delay is not None else None
+
+        if not launch():
+            if remaining:
+                wait = min(limiter.wait_time(model_id) for model_id in remaining)
+                return None, _Throttled(wait), tried
+            return None, None, tried
+        hedge_at = hedge_deadline()
+        last_failure = None
+
+        while inflight:
+            timeout = None if hedge_at is None else max(0.0, hedge_at - time.monotonic())
+            try:
+                attempt = done.get(timeout=timeout)
+            except queue.Empty:
+                # Newest attempt is slower than its p95: race the next model
+                hedge_at = hedge_deadline() if launch(queue_seconds=0) else None
+                continue
+
+            inflight.remove(attempt)
+            if attempt.ok:
+                for other in inflight:
+                    other.cancel()
+                mark_model_ok(self.state, attempt.model_id)
+                return attempt, last_failure, tried
+
+            last_failure = attempt
+            if not attempt.retryable:
+                for other in inflight:
+                    other.cancel()
+                return None, attempt, tried
+
+            error = attempt.err or ("rate_limit" if attempt.status == 429 else
+                                    "unavailable" if attempt.status == 503 else f"error_{attempt.status}")
+            mark_model_failed(self.state, attempt.model_id, error, attempt.retry_after)
+            if attempt.status == 429:
+                limiter.note_rate_limited(attempt.model_id, attempt.retry_after)
+            if not inflight and launch():
+                hedge_at = hedge_deadline()
+
+        return None, last_failure, tried
+
+
+class ProxyHandler(BaseHTTPRequestHandler):
+    server_version = "FreeRideProxy/1.0"
+
+    @property
+    def proxy(self) -> FreeRideProxy:
+        return self.server.proxy
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status: int, payload: bytes, extra_headers: dict = None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for key, value in (extra_headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_cached(self, body: dict, model_id: str, content: bytes):
+        headers = {"X-FreeRide-Model": model_id, "X-FreeRide-Cache": "HIT"}
+        if not body.get("stream"):
+            self._send_json(200, content, headers)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Content-Length", str(len(content)))
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+    def do_GET(self):
+        path = self.path.split("?")[0].rstrip("/")
+        if path == "/health":
+            self._send_json(200, b'{"status":"ok"}')
+        elif path in ("/v1/models", "/api/v1/models"):
+            now = int(time.time())
+            data = [{"id": "freeride/auto", "object": "model", "created": now, "owned_by": "freeride"}]
+            data += [{"id": m, "object": "model", "created": now, "owned_by": m.split("/")[0]}
+                     for m in self.proxy.ranked_models()]
+            self._send_json(200, json.dumps({"object": "list", "data": data}).encode())
+        else:
+            self._send_json(404, _error_body(f"Unknown path: {self.path}", 404))
+
+    def do_POST(self):
+        path = self.path.split("?")[0].rstrip("/")
+        if path not in ("/v1/chat/completions", "/api/v1/chat/completions"):
+            self._send_json(404, _error_body(f"Unknown path: {self.path}", 404))
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send_json(400, _error_body("Request body must be JSON", 400))
+            return
+        if not isinstance(body, dict):
+            self._send_json(400, _error_body("Request body must be a JSON object", 400))
+            return
+
+        # Exact-match cache for temperature-0 requests. Clients can skip the
+        # lookup (Cache-Control: no-cache / X-FreeRide-Cache: refresh) or
+        # the cache entirely (Cache-Control: no-store / X-FreeRide-Cache: off)
+        cache = self.proxy.cache
+        response_key = None
+        cache_status = None
+        if cache is not None and is_cacheable(body):
+            directive = self.headers.get("X-FreeRide-Cache", "").lower()
+            cache_control = self.headers.get("Cache-Control", "").lower()
+            if directive not in ("off", "bypass") and "no-store" not in cache_control:
+                response_key = cache_key(body)
+                cache_status = "MISS"
+                if directive == "refresh" or "no-cache" in cache_control:
+                    cache_status = "REFRESH"
+                else:
+                    hit = cache.get(response_key)
+                    if hit is not None:
+                        self._send_cached(body, *hit)
+                        return
+
+        winner, failure, tried = self.proxy.forward(body)
+        tried_header = {"X-FreeRide-Tried": ",".join(tried)}
+        if cache_status:
+            tried_header["X-FreeRide-Cache"] = cache_status
+
+        if winner is None:
+            if failure is not None and failure.retry_after:
+                tried_header["Retry-After"] = str(max(1, int(failure.retry_after + 0.5)))
+            if failure is not None and failure.status is not None:
+                self._send_json(failure.status, failure.content or _error_body("Upstream error", failure.status),
+                                tried_header)
+            else:
+                message = f"All models failed ({failure.err})" if failure else "No free models available"
+                self._send_json(502, _error_body(message, 502), tried_header)
+            return
+
+        headers = dict(tried_header, **{"X-FreeRide-Model": winner.model_id})
+        if not winner.stream:
+            if response_key:
+                cache.put(response_key, winner.model_id, winner.content)
+            self._send_json(200, winner.content, headers)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.close_connection = True
+        transcript = list(winner.buffered) if response_key else None
+        try:
+            for line in winner.buffered:
+                self.wfile.write(line + b"\n")
+            self.wfile.flush()
+            for line in winner.lines:
+                self.wfile.write(line + b"\n")
+                if not line:
+                    self.wfile.flush()  # End of an SSE event
+                if transcript is not None:
+                    transcript.append(line)
+            self.wfile.flush()
+            # Only complete streams are worth replaying
+            if transcript is not None and b"data: [DONE]" in transcript[-3:]:
+                cache.put(response_key, winner.model_id, b"\n".join(transcript) + b"\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Client went away
+        except requests.RequestException:
+            pass  # Upstream broke mid-stream; too late to fail over
+        finally:
+            winner.close()
+
+
+def serve(host: str = PROXY_HOST, port: int = PROXY_PORT, hedge: bool = False,
+          hedge_after_ms: float = None, verbose: bool = False, cache: bool = True,
+          cache_ttl_hours: float = RESPONSE_CACHE_TTL_HOURS, cache_max_mb: float = RESPONSE_CACHE_MAX_MB):
+    """Run the proxy until interrupted."""
+    api_key = get_api_key()
+    if not api_key:
+        print("Error: OPENROUTER_API_KEY not set")
+        sys.exit(1)
+
+    server = ThreadingHTTPServer((host, port), ProxyHandler)
+    server.daemon_threads = True
+    response_cache = ResponseCache(ttl_hours=cache_ttl_hours, max_mb=cache_max_mb) if cache else None
+    server.proxy = FreeRideProxy(api_key, hedge=hedge, hedge_after_ms=hedge_after_ms, cache=response_cache)
+    server.verbose = verbose
+
+    print(f"FreeRide proxy listening on http://{host}:{server.server_port}/v1")
+    print(f"Fails over through up to {server.proxy.max_attempts} models per request")
+    if hedge:
+        when = f"{hedge_after_ms:.0f}ms" if hedge_after_ms is not None else "the primary's p95 TTFT"
+        print(f"Hedging to the next model after {when}")
+    if response_cache:
+        print(f"Caching temperature-0 responses for {cache_ttl_hours:g}h (up to {cache_max_mb:g} MB)")
+    print("Point an OpenAI-compatible provider at this URL with model \"freeride/auto\".")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down proxy...")
+    finally:
+        server.server_close()
+        server.proxy.state.close()
+        if response_cache:
+            response_cache.close()
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+FreeRide rate limiter
+Client-side token buckets per model, so FreeRide stays under free-tier
+requests-per-minute caps instead of discovering them through 429s, and
+an hourly budget for the watcher's own health probes.
+"""
+
+import json
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Optional
+
+
+# Limits file: {"default_rpm": 16, "burst": 4, "models": {"provider/model:free": 10},
+#               "probe_budget": {"per_model_per_hour": 12, "total_per_hour": 120}}
+RATE_LIMIT_FILE = Path.home() / ".openclaw" / "freeride-limits.json"
+DEFAULT_RPM = 16             # OpenRouter free models allow 20/min; leave headroom
+DEFAULT_BURST = 4            # Tokens a bucket can hold (burst + rate stays under 20/min)
+MIN_RPM = 1.0
+LEARN_DECREASE = 0.75        # A 429 cuts the limit to at most this share of the old one
+LEARN_RECOVERY_SECONDS = 300 # Without a 429 for this long, the limit grows by 1 rpm
+
+# Watcher probe budget: probes are real completions and use the same free-tier quota
+PROBE_BUDGET_PER_MODEL_PER_HOUR = 12   # One probe per model every 5 minutes on average
+PROBE_BUDGET_TOTAL_PER_HOUR = 120      # Across all models
+PROBE_BUDGET_WINDOW_SECONDS = 3600
+
+
+class TokenBucket:
+    """Classic token bucket: `rpm` tokens per minute, holding at most `burst`."""
+
+    def __init__(self, rpm: float, burst: float):
+        self.rpm = rpm
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0  # Set from Retry-After; no tokens before then
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rpm / 60)
+        self.updated = now
+
+    def wait_time(self, now: float = None) -> float:
+        """Seconds until a token is available (0 if one is available now)."""
+        now = time.monotonic() if now is None else now
+        self._refill(now)
+        wait = 0.0 if self.tokens >= 1 else (1 - self.tokens) * 60 / self.rpm
+        return max(wait, self.blocked_until - now)
+
+    def try_acquire(self, now: float = None) -> bool:
+        now = time.monotonic() if now is None else now
+        if self.wait_time(now) > 0:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class RateLimiter:
+    """Per-model token buckets with limits that adapt to observed 429s.
+
+    Limits come from RATE_LIMIT_FILE (per model, else default_rpm). A 429
+    lowers a model's limit to what was actually sent in the last minute
+    (and at most LEARN_DECREASE of the old limit); it then creeps back by
+    1 rpm per LEARN_RECOVERY_SECONDS without another 429. Learned limits
+    are kept in the attached watcher state so every FreeRide process
+    starts from them.
+    """
+
+    def __init__(self, config: dict = None):
+        config = config or {}
+        self.default_rpm = float(config.get("default_rpm", DEFAULT_RPM))
+        self.burst = float(config.get("burst", DEFAULT_BURST))
+        self.configured = {k: float(v) for k, v in config.get("models", {}).items()}
+        self.learned = {}   # model -> {"rpm": float, "at": epoch of last 429}
+        self._buckets = {}
+        self._sent = {}     # model -> deque of monotonic send times (last 60s)
+        self._state = None
+        self._lock = threading.Lock()
+
+    def attach(self, state: dict):
+        """Load learned limits from, and persist them to, a watcher state."""
+        with self._lock:
+            self._state = state
+            self.learned = dict(state.get("rate_limits", {}))
+            for model_id, bucket in self._buckets.items():
+                bucket.rpm = self.limit_for(model_id)
+
+    def configured_rpm(self, model_id: str) -> float:
+        return self.configured.get(model_id, self.default_rpm)
+
+    def limit_for(self, model_id: str, now: float = None) -> float:
+        """Current requests-per-minute limit for a model."""
+        configured = self.configured_rpm(model_id)
+        learned = self.learned.get(model_id)
+        if not learned:
+            return configured
+        now = time.time() if now is None else now
+        recovered = (now - learned["at"]) // LEARN_RECOVERY_SECONDS
+        return min(configured, learned["rpm"] + max(0, recovered))
+
+    def _bucket(self, model_id: str) -> TokenBucket:
+        bucket = self._buckets.get(model_id)
+        if bucket is None:
+            rpm = self.limit_for(model_id)
+            bucket = self._buckets[model_id] = TokenBucket(rpm, min(self.burst, max(1.0, rpm)))
+        else:
+            bucket.rpm = self.limit_for(model_id)
+        return bucket
+
+    def wait_time(self, model_id: str) -> float:
+        with self._lock:
+            return self._bucket(model_id).wait_time()
+
+    def try_acquire(self, model_id: str) -> bool:
+        """Take a token for a request to model_id if one is available right now."""
+        with self._lock:
+            now = time.monotonic()
+            if not self._bucket(model_id).try_acquire(now):
+                return False
+            sent = self._sent.setdefault(model_id, deque())
+            sent.append(now)
+            while sent and now - sent[0] > 60:
+                sent.popleft()
+            return True
+
+    def acquire(self, model_id: str, timeout: float) -> bool:
+        """Wait up to timeout seconds for a token."""
+        deadline = time.monotonic() + timeout
+        while True:
+            if self.try_acquire(model_id):
+                return True
+            wait = self.wait_time(model_id)
+            if time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    def note_rate_limited(self, model_id: str, retry_after: Optional[float] = None):
+        """Learn from a 429: lower the model's limit and pause its bucket."""
+        with self._lock:
+            now = time.monotonic()
+            sent = self._sent.get(model_id, deque())
+            recent = sum(1 for t in sent if now - t <= 60)
+            current = self.limit_for(model_id)
+            rpm = current * LEARN_DECREASE
+            if recent >= MIN_RPM:
+                rpm = min(rpm, max(MIN_RPM, recent - 1))
+            rpm = max(MIN_RPM, rpm)
+
+            self.learned[model_id] = {"rpm": round(rpm, 2), "at": time.time()}
+            bucket = self._bucket(model_id)
+            bucket.tokens = 0.0
+            if retry_after:
+                bucket.blocked_until = max(bucket.blocked_until, now + retry_after)
+
+            if self._state is not None:
+                self._state.append({"op": "set", "key": "rate_limits", "value": dict(self.learned)})
+
+
+class ProbeBudget:
+    """Sliding one-hour budget for watcher probes, per model and in total.
+
+    Seeded from the probe history of the attached watcher state, so
+    probes made by earlier runs (cron-driven checks, `freeride bench`)
+    count against it as well.
+    """
+
+    def __init__(self, config: dict = None):
+        config = config or {}
+        self.per_model = int(config.get("per_model_per_hour", PROBE_BUDGET_PER_MODEL_PER_HOUR))
+        self.total = int(config.get("total_per_hour", PROBE_BUDGET_TOTAL_PER_HOUR))
+        self._spent = {}   # model -> deque of epoch times of probes in the window
+        self._lock = threading.Lock()
+
+    def attach(self, state: dict):
+        """Count the probes already recorded in a watcher state's probe store."""
+        cutoff = time.time() - PROBE_BUDGET_WINDOW_SECONDS
+        with self._lock:
+            self._spent = {}
+            for model_id, samples in state.probes.samples(since=cutoff).items():
+                recent = [s["t"] for s in samples]
+                if recent:
+                    self._spent[model_id] = deque(recent)
+
+    def _expire(self, now: float):
+        cutoff = now - PROBE_BUDGET_WINDOW_SECONDS
+        for model_id in list(self._spent):
+            spent = self._spent[model_id]
+            while spent and spent[0] <= cutoff:
+                spent.popleft()
+            if not spent:
+                del self._spent[model_id]
+
+    def usage(self, now: float = None) -> dict:
+        """Probes per model in the last hour."""
+        with self._lock:
+            self._expire(time.time() if now is None else now)
+            return {model_id: len(spent) for model_id, spent in self._spent.items()}
+
+    def available(self, model_id: str, now: float = None) -> bool:
+        with self._lock:
+            self._expire(time.time() if now is None else now)
+            return (len(self._spent.get(model_id, ())) < self.per_model
+                    and sum(len(spent) for spent in self._spent.values()) < self.total)
+
+    def spend(self, model_id: str, now: float = None):
+        with self._lock:
+            self._spent.setdefault(model_id, deque()).append(time.time() if now is None else now)
+
+    def wait_time(self, model_id: str, now: float = None) -> float:
+        """Seconds until model_id may be probed again within its own budget."""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._expire(now)
+            spent = self._spent.get(model_id, ())
+            if len(spent) < self.per_model:
+                return 0.0
+            return spent[len(spent) - self.per_model] + PROBE_BUDGET_WINDOW_SECONDS - now
+
+
+def load_rate_limit_config() -> dict:
+    """Load user rate limit overrides, if any."""
+    try:
+        config = json.loads(RATE_LIMIT_FILE.read_text())
+    except (OSError, json.JSONDecodeError):
+        return {}
+    return config if isinstance(config, dict) else {}
+
+
+_limiter = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Process-wide limiter, configured from RATE_LIMIT_FILE."""
+    global _limiter
+    if _limiter is None:
+        _limiter = RateLimiter(load_rate_limit_config())
+    return _limiter
+
+
+_probe_budget = None
+
+
+def get_probe_budget() -> ProbeBudget:
+    """Process-wide probe budget, configured from RATE_LIMIT_FILE's "probe_budget"."""
+    global _probe_budget
+    if _probe_budget is None:
+        _probe_budget = ProbeBudget(load_rate_limit_config().get("probe_budget"))
+    return _probe_budget
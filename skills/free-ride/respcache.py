@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+FreeRide response cache
+Exact-match cache for deterministic (temperature 0) chat completions
+served by the proxy, kept in a size-bounded SQLite LRU with a TTL.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+
+RESPONSE_CACHE_FILE = Path.home() / ".openclaw" / ".freeride-responses.sqlite"
+RESPONSE_CACHE_TTL_HOURS = 24
+RESPONSE_CACHE_MAX_MB = 64
+RESPONSE_CACHE_MAX_ENTRY_BYTES = 1024 * 1024  # Larger responses are not cached
+
+# Request fields that don't change what the model answers
+IGNORED_FIELDS = {"stream_options", "user", "metadata", "provider", "transforms"}
+AUTO_FAMILIES = {"", "auto", "freeride/auto", "openrouter/auto"}
+
+
+def model_family(model_id: Optional[str]) -> str:
+    """Normalize a model id for caching: no provider prefix, no :free variant."""
+    model_id = (model_id or "").strip()
+    if model_id in AUTO_FAMILIES:
+        return "freeride/auto"
+    if model_id.startswith("openrouter/"):
+        model_id = model_id[len("openrouter/"):]
+    return model_id.split(":")[0]
+
+
+def is_cacheable(body: dict) -> bool:
+    """Only deterministic requests: temperature 0 and a single choice."""
+    try:
+        if float(body.get("temperature")) != 0.0:
+            return False
+    except (TypeError, ValueError):
+        return False  # Unset (defaults to 1) or not a number
+    return body.get("n") in (None, 1)
+
+
+def cache_key(body: dict) -> str:
+    """Hash of model family, messages and every parameter that affects the answer."""
+    params = {
+        k: v for k, v in body.items()
+        if k not in IGNORED_FIELDS and k not in ("model", "messages", "stream")
+    }
+    normalized = {
+        "family": model_family(body.get("model")),
+        "messages": body.get("messages", []),
+        "params": params,
+        "stream": bool(body.get("stream"))
+    }
+    encoded = json.dumps(normalized, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+class ResponseCache:
+    """SQLite-backed LRU: entries expire after ttl and the least recently
+    used are evicted once the total size passes max_bytes."""
+
+    def __init__(
+        self,
+        path: Path = RESPONSE_CACHE_FILE,
+        ttl_hours: float = RESPONSE_CACHE_TTL_HOURS,
+        max_mb: float = RESPONSE_CACHE_MAX_MB
+    ):
+        self.path = path
+        self.ttl = ttl_hours * 3600
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, model TEXT, created REAL, accessed REAL,"
+            " size INTEGER, body BLOB)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_created ON responses (created)")
+
+    def get(self, key: str) -> Optional[tuple]:
+        """Return (model, body) for a live entry, refreshing its LRU position."""
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT model, body, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if now - row[2] > self.ttl:
+                self._delete(key)
+                return None
+            self._db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+        return row[0], bytes(row[1])
+
+    def put(self, key: str, model: str, body: bytes) -> bool:
+        """Store a response, evicting least recently used entries past max_bytes."""
+        if len(body) > RESPONSE_CACHE_MAX_ENTRY_BYTES:
+            return False
+        now = time.time()
+        with self._lock, self._transaction():
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, model, created, accessed, size, body)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, now, now, len(body), body)
+            )
+            self._evict(now)
+        return True
+
+    @contextmanager
+    def _transaction(self):
+        # IMMEDIATE so other proxies' writes can't interleave with the size check
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+
+    def _delete(self, key: str):
+        self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def _total_size(self) -> int:
+        return self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def _evict(self, now: float):
+        """Drop expired entries, then LRU ones until under max_bytes. Caller holds a transaction."""
+        self._db.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+
+        # Summed in the transaction: other processes share the file
+        size = self._total_size()
+        while size > self.max_bytes:
+            rows = self._db.execute(
+                "SELECT key, size FROM responses ORDER BY accessed LIMIT 64"
+            ).fetchall()
+            if not rows:
+                break
+            for key, entry_size in rows:
+                self._delete(key)
+                size -= entry_size
+                if size <= self.max_bytes:
+                    break
+
+    def stats(self) -> dict:
+        with self._lock:
+            count = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            return {"entries": count, "bytes": self._total_size()}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
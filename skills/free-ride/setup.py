@@ -6,7 +6,7 @@ setup(
     description="Free AI for OpenClaw - Automatic free model management via OpenRouter",
     author="Shaishav Pidadi",
     url="https://github.com/Shaivpidadi/FreeRide",
-    py_modules=["main", "watcher"],
+    py_modules=["main", "watcher", "logtail", "statestore", "proxy", "ratelimit", "respcache", "bench", "metrics"],
     install_requires=[
         "requests>=2.31.0",
     ],
@@ -0,0 +1,497 @@
+#!/usr/bin/env python3
+"""
+FreeRide state store
+Watcher state kept as a JSON snapshot plus an append-only journal of
+changes, so recording a cooldown or a rotation appends one line instead
+of rewriting the whole file. Probe samples go to a SQLite store next to
+the snapshot, so they are neither rewritten at compaction nor parsed by
+every reader of the state.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks
+    fcntl = None
+
+
+FSYNC_INTERVAL_SECONDS = 5.0        # Journal appends are fsynced at most this often
+COMPACT_JOURNAL_BYTES = 256 * 1024  # Fold the journal into the snapshot past this size
+PROBE_HISTORY_MAX_SAMPLES = 2000    # Probe samples kept per model
+PROBE_HISTORY_MAX_AGE_DAYS = 14     # Older samples are dropped at compaction
+ROTATION_HISTORY_SIZE = 500         # Rotations kept in rotation_history
+PERFORMANCE_HALF_LIFE_HOURS = 24    # Probe aggregates: sample weight halves every day
+
+
+PROBE_STORE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS probes (
+    model TEXT NOT NULL,
+    t REAL NOT NULL,
+    sample TEXT NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_probes_model_t ON probes (model, t);
+CREATE INDEX IF NOT EXISTS idx_probes_t ON probes (t);
+CREATE TABLE IF NOT EXISTS performance (
+    model TEXT PRIMARY KEY,
+    t REAL NOT NULL,
+    aggregate TEXT NOT NULL
+);
+"""
+
+
+def journal_path_for(snapshot_path: Path) -> Path:
+    return snapshot_path.with_suffix(".journal")
+
+
+def lock_path_for(snapshot_path: Path) -> Path:
+    return snapshot_path.with_suffix(".lock")
+
+
+def probe_store_path_for(snapshot_path: Path) -> Path:
+    return snapshot_path.with_suffix(".probes.sqlite")
+
+
+@contextmanager
+def _locked(lock_path: Path, exclusive: bool):
+    """Advisory lock: shared for appends and reads, exclusive for compaction."""
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, "a") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def apply_record(data: dict, record: dict):
+    """Apply one journal record to a state dict.
+
+    Records are:
+      {"op": "set", "key": k, "value": v}        replace a top-level key
+      {"op": "unset", "key": k}                  drop a top-level key
+      {"op": "breaker", "model": m, "breaker": b} set (or, if b is null, close) a breaker
+      {"op": "probe", "model": m, "sample": s}   a probe sample (older versions;
+                                                 moved to the probe store at compaction)
+      {"op": "rotation", "t": .., "from": .., "to": .., "reason": ..}
+    """
+    op = record.get("op")
+    if op == "set":
+        data[record["key"]] = record["value"]
+    elif op == "unset":
+        data.pop(record["key"], None)
+    elif op == "breaker":
+        breakers = data.setdefault("breakers", {})
+        if record.get("breaker"):
+            breakers[record["model"]] = record["breaker"]
+        else:
+            breakers.pop(record["model"], None)
+    elif op == "probe":
+        data.setdefault("latency_history", {}).setdefault(record["model"], []).append(record["sample"])
+    elif op == "rotation":
+        data["rotation_count"] = data.get("rotation_count", 0) + 1
+        data["last_rotation"] = record["t"]
+        data["last_rotation_reason"] = record["reason"]
+        history = data.setdefault("rotation_history", [])
+        history.append({k: record.get(k) for k in ("t", "from", "to", "reason")})
+        del history[:-ROTATION_HISTORY_SIZE]
+
+
+def probe_decay(age_seconds: float) -> float:
+    """Weight of a probe sample age_seconds old (1.0 for samples from the future)."""
+    return 0.5 ** (max(0.0, age_seconds) / 3600 / PERFORMANCE_HALF_LIFE_HOURS)
+
+
+def fold_probe_sample(aggregate: Optional[dict], sample: dict) -> dict:
+    """Add a probe sample to a model's exponentially decayed aggregate.
+
+    Sums are weighted as of aggregate["t"], the newest sample's time: a
+    sample's weight halves every PERFORMANCE_HALF_LIFE_HOURS before it.
+    Newer samples move "t" forward and decay the sums accordingly, so the
+    aggregate stays O(1) however long the history is.
+    """
+    t = sample["t"]
+    if aggregate is None:
+        aggregate = {"t": t, "weight": 0.0, "ok": 0.0,
+                     "ttft": 0.0, "ttft_weight": 0.0, "tps": 0.0, "tps_weight": 0.0}
+    else:
+        aggregate = dict(aggregate)
+    if t > aggregate["t"]:
+        decay = probe_decay(t - aggregate["t"])
+        for key in ("weight", "ok", "ttft", "ttft_weight", "tps", "tps_weight"):
+            aggregate[key] *= decay
+        aggregate["t"] = t
+
+    weight = probe_decay(aggregate["t"] - t)
+    aggregate["weight"] += weight
+    if sample.get("ok"):
+        aggregate["ok"] += weight
+        if sample.get("ttft_ms") is not None:
+            aggregate["ttft"] += weight * sample["ttft_ms"]
+            aggregate["ttft_weight"] += weight
+        if sample.get("tps") is not None:
+            aggregate["tps"] += weight * sample["tps"]
+            aggregate["tps_weight"] += weight
+    return aggregate
+
+
+def _read_state(snapshot_path: Path, default: dict = None) -> dict:
+    """Read a state snapshot and replay its journal; the caller holds the lock."""
+    data = None
+    try:
+        data = json.loads(snapshot_path.read_text())
+    except (OSError, json.JSONDecodeError):
+        pass
+    if not isinstance(data, dict):
+        data = dict(default or {})
+
+    try:
+        with open(journal_path_for(snapshot_path), "rb") as f:
+            for line in f:
+                try:
+                    apply_record(data, json.loads(line))
+                except (ValueError, KeyError, TypeError, AttributeError):
+                    continue  # Torn write at the tail, or a record we don't know
+    except OSError:
+        pass
+    return data
+
+
+def read_state(snapshot_path: Path, default: dict = None) -> dict:
+    """Read a state snapshot and replay its journal.
+
+    Takes the shared lock, so a compaction in progress (new snapshot
+    written, journal not yet truncated) is never seen half-done.
+    """
+    if not snapshot_path.parent.is_dir():
+        return dict(default or {})
+    with _locked(lock_path_for(snapshot_path), exclusive=False):
+        return _read_state(snapshot_path, default)
+
+
+def state_stamp(snapshot_path: Path) -> int:
+    """Changes whenever the snapshot or its journal is written (0 if neither exists)."""
+    stamp = 0
+    for path in (snapshot_path, journal_path_for(snapshot_path)):
+        try:
+            st = path.stat()
+        except OSError:
+            continue
+        stamp = max(stamp, st.st_mtime_ns + st.st_size)
+    return stamp
+
+
+def probe_stamp(snapshot_path: Path) -> int:
+    """Changes whenever a probe sample is recorded (0 before the first one)."""
+    try:
+        st = probe_store_path_for(snapshot_path).stat()
+    except OSError:
+        return 0
+    return st.st_mtime_ns + st.st_size
+
+
+def read_probe_samples(snapshot_path: Path, since: float = None, limit: int = None) -> dict:
+    """Probe samples per model from the store next to a snapshot (see ProbeStore.samples)."""
+    store = ProbeStore(probe_store_path_for(snapshot_path), readonly=True)
+    try:
+        return store.samples(since, limit)
+    finally:
+        store.close()
+
+
+def read_probe_aggregates(snapshot_path: Path) -> dict:
+    """Decayed per-model aggregates from the store next to a snapshot (see fold_probe_sample)."""
+    store = ProbeStore(probe_store_path_for(snapshot_path), readonly=True)
+    try:
+        return store.aggregates()
+    finally:
+        store.close()
+
+
+class ProbeStore:
+    """Probe samples per model, in SQLite.
+
+    Each sample is one committed row, visible to other processes right
+    away, and is folded into its model's decayed aggregate in the same
+    transaction, so ranking reads one row per model rather than the
+    history. Safe to share between threads. Read-only stores never
+    create the database and read as empty until the watcher has written it.
+    """
+
+    def __init__(self, path: Path, readonly: bool = False):
+        self.path = path
+        self.readonly = readonly
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if self.readonly:
+                self._conn = sqlite3.connect(
+                    f"{self.path.resolve().as_uri()}?mode=ro", uri=True, check_same_thread=False
+                )
+            else:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._conn = sqlite3.connect(
+                    str(self.path), timeout=30, isolation_level=None, check_same_thread=False
+                )
+                self._conn.executescript(PROBE_STORE_SCHEMA)
+                if (self._conn.execute("SELECT 1 FROM performance LIMIT 1").fetchone() is None
+                        and self._conn.execute("SELECT 1 FROM probes LIMIT 1").fetchone() is not None):
+                    with self._transaction() as conn:
+                        self._rebuild_aggregates(conn)
+        return self._conn
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _rebuild_aggregates(self, conn: sqlite3.Connection, models: list = None):
+        """Recompute aggregates from the stored samples (all models, or just `models`)."""
+        if models is None:
+            models = [row[0] for row in conn.execute("SELECT DISTINCT model FROM probes")]
+        for model_id in models:
+            aggregate = None
+            for (sample,) in conn.execute("SELECT sample FROM probes WHERE model = ? ORDER BY t", (model_id,)):
+                aggregate = fold_probe_sample(aggregate, json.loads(sample))
+            if aggregate is not None:
+                self._save_aggregate(conn, model_id, aggregate)
+
+    @staticmethod
+    def _save_aggregate(conn: sqlite3.Connection, model_id: str, aggregate: dict):
+        conn.execute(
+            "INSERT OR REPLACE INTO performance (model, t, aggregate) VALUES (?, ?, ?)",
+            (model_id, aggregate["t"], json.dumps(aggregate, separators=(",", ":")))
+        )
+
+    def add(self, model_id: str, sample: dict):
+        """Record one probe sample and fold it into the model's aggregate."""
+        with self._lock, self._transaction() as conn:
+            inserted = conn.execute(
+                "INSERT OR IGNORE INTO probes (model, t, sample) VALUES (?, ?, ?)",
+                (model_id, sample["t"], json.dumps(sample, separators=(",", ":")))
+            ).rowcount
+            if inserted:
+                row = conn.execute("SELECT aggregate FROM performance WHERE model = ?", (model_id,)).fetchone()
+                self._save_aggregate(conn, model_id, fold_probe_sample(json.loads(row[0]) if row else None, sample))
+
+    def import_history(self, history: dict):
+        """Add {model: [sample, ...]} in one transaction; samples already stored are skipped."""
+        rows = [
+            (model_id, sample["t"], json.dumps(sample, separators=(",", ":")))
+            for model_id, samples in history.items()
+            for sample in samples
+            if isinstance(sample, dict) and "t" in sample
+        ]
+        with self._lock, self._transaction() as conn:
+            conn.executemany("INSERT OR IGNORE INTO probes (model, t, sample) VALUES (?, ?, ?)", rows)
+            self._rebuild_aggregates(conn, list(history))
+
+    def samples(self, since: float = None, limit: int = None) -> dict:
+        """{model: [sample, ...]} oldest first: samples since `since`, at most the last `limit` per model."""
+        if limit:
+            query = ("SELECT model, sample FROM ("
+                     " SELECT model, t, sample, ROW_NUMBER() OVER (PARTITION BY model ORDER BY t DESC) AS n"
+                     " FROM probes WHERE t >= ?"
+                     ") WHERE n <= ? ORDER BY model, t")
+            params = (since or 0, limit)
+        else:
+            query = "SELECT model, sample FROM probes WHERE t >= ? ORDER BY model, t"
+            params = (since or 0,)
+        try:
+            with self._lock:
+                rows = self._connection().execute(query, params).fetchall()
+        except sqlite3.Error:
+            return {}  # No probes recorded yet
+        history = {}
+        for model_id, sample in rows:
+            history.setdefault(model_id, []).append(json.loads(sample))
+        return history
+
+    def latest(self, model_id: str) -> Optional[dict]:
+        """The model's most recent probe sample, or None."""
+        try:
+            with self._lock:
+                row = self._connection().execute(
+                    "SELECT sample FROM probes WHERE model = ? ORDER BY t DESC LIMIT 1", (model_id,)
+                ).fetchone()
+        except sqlite3.Error:
+            return None
+        return json.loads(row[0]) if row else None
+
+    def aggregates(self) -> dict:
+        """{model: aggregate} for every model with recorded probes."""
+        try:
+            with self._lock:
+                rows = self._connection().execute("SELECT model, aggregate FROM performance").fetchall()
+        except sqlite3.Error:
+            return {}
+        return {model_id: json.loads(aggregate) for model_id, aggregate in rows}
+
+    def prune(self, now: float):
+        """Drop samples older than PROBE_HISTORY_MAX_AGE_DAYS, and past PROBE_HISTORY_MAX_SAMPLES per model.
+
+        Aggregates already count every sample (with decay); they are only
+        dropped once the model has had no probe for PROBE_HISTORY_MAX_AGE_DAYS.
+        """
+        cutoff = now - PROBE_HISTORY_MAX_AGE_DAYS * 86400
+        with self._lock, self._transaction() as conn:
+            conn.execute("DELETE FROM probes WHERE t < ?", (cutoff,))
+            conn.execute("DELETE FROM performance WHERE t < ?", (cutoff,))
+            conn.execute(
+                "DELETE FROM probes WHERE rowid IN ("
+                " SELECT rowid FROM ("
+                "  SELECT rowid, ROW_NUMBER() OVER (PARTITION BY model ORDER BY t DESC) AS n FROM probes"
+                " ) WHERE n > ?)",
+                (PROBE_HISTORY_MAX_SAMPLES,)
+            )
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class JournaledState(dict):
+    """State dict whose changes are appended to a journal.
+
+    Reads are plain dict reads and never touch the disk. Changes go through
+    append(), which applies a record in memory and writes it to the journal
+    right away (visible to other readers); fsyncs are batched to one per
+    FSYNC_INTERVAL_SECONDS. Once the journal passes COMPACT_JOURNAL_BYTES it
+    is folded into the snapshot under an exclusive lock, rebuilding from
+    disk so records appended by other processes are kept.
+
+    Probe samples are recorded in `probes`, a ProbeStore next to the
+    snapshot; history left in the snapshot by older versions is moved
+    there at the first compaction.
+    """
+
+    def __init__(self, snapshot_path: Path, default: dict = None):
+        self.snapshot_path = snapshot_path
+        self.journal_path = journal_path_for(snapshot_path)
+        self.lock_path = lock_path_for(snapshot_path)
+        self._default = default or {}
+        self._journal = None
+        self._last_sync = time.monotonic()
+        self._dirty = False
+        self._lock = threading.RLock()
+        with self._locked(exclusive=False):
+            self._stamp = state_stamp(snapshot_path)
+            super().__init__(_read_state(snapshot_path, default))
+        self.probes = ProbeStore(probe_store_path_for(snapshot_path))
+        if "latency_history" in self:
+            self.compact()
+
+    def _locked(self, exclusive: bool):
+        return _locked(self.lock_path, exclusive)
+
+    def _journal_file(self):
+        if self._journal is None or self._journal.closed:
+            self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+            self._journal = open(self.journal_path, "ab")
+        return self._journal
+
+    def append(self, record: dict):
+        """Apply a record in memory and journal it."""
+        line = json.dumps(record, separators=(",", ":")).encode() + b"\n"
+        with self._lock:
+            apply_record(self, record)
+            with self._locked(exclusive=False):
+                journal = self._journal_file()
+                journal.write(line)
+                journal.flush()
+                self._dirty = True
+                if time.monotonic() - self._last_sync >= FSYNC_INTERVAL_SECONDS:
+                    self._sync()
+                size = journal.tell()
+            if size >= COMPACT_JOURNAL_BYTES:
+                self.compact()
+
+    def _sync(self):
+        if self._dirty and self._journal is not None and not self._journal.closed:
+            os.fsync(self._journal.fileno())
+        self._dirty = False
+        self._last_sync = time.monotonic()
+
+    def flush(self):
+        """Force pending journal writes to disk."""
+        with self._lock:
+            self._sync()
+
+    def compact(self):
+        """Fold the journal into a fresh snapshot and start an empty journal."""
+        with self._lock, self._locked(exclusive=True):
+            self._sync()
+            data = _read_state(self.snapshot_path, self._default)
+            history = data.pop("latency_history", None)
+            if history:
+                self.probes.import_history(history)
+            self.probes.prune(time.time())
+
+            tmp_path = self.snapshot_path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_path, "w") as f:
+                f.write(json.dumps(data, separators=(",", ":")))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.snapshot_path)
+
+            if self._journal is not None:
+                self._journal.close()
+            with open(self.journal_path, "wb") as f:
+                os.fsync(f.fileno())
+            self._journal = None
+            self._stamp = state_stamp(self.snapshot_path)
+
+            # Pick up other writers' records
+            self._replace(data)
+
+    def refresh(self) -> bool:
+        """Re-read the state if it changed on disk since we last read it; True if it did.
+
+        For long-running readers (the proxy) that need other processes'
+        breaker changes. Costs one stat() when nothing changed. Keys are
+        replaced one by one, so concurrent readers never see an empty dict.
+        """
+        if state_stamp(self.snapshot_path) == self._stamp:
+            return False
+        with self._lock:
+            with self._locked(exclusive=False):
+                self._stamp = state_stamp(self.snapshot_path)
+                data = _read_state(self.snapshot_path, self._default)
+            self._replace(data)
+        return True
+
+    def _replace(self, data: dict):
+        for key in [k for k in self if k not in data]:
+            self.pop(key, None)
+        self.update(data)
+
+    def record_probe(self, model_id: str, sample: dict):
+        """Record a probe sample in the probe store."""
+        self.probes.add(model_id, sample)
+
+    def close(self):
+        with self._lock:
+            self._sync()
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+            self.probes.close()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Concurrent read-modify-write through main.ConfigStore."""
+
+import json
+import multiprocessing
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from main import ConfigStore  # noqa: E402
+
+ROUNDS = 50
+
+
+def bump(path: str, key: str):
+    store = ConfigStore(Path(path))
+
+    def apply(config):
+        config[key] = config.get(key, 0) + 1
+
+    for _ in range(ROUNDS):
+        store.update(apply)
+
+
+class ConfigStoreUpdateTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "openclaw.json"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_concurrent_writers_keep_each_others_changes(self):
+        ctx = multiprocessing.get_context("fork")
+        writers = [ctx.Process(target=bump, args=(str(self.path), key)) for key in ("a", "b")]
+        for p in writers:
+            p.start()
+        for p in writers:
+            p.join(60)
+            self.assertEqual(p.exitcode, 0)
+
+        self.assertEqual(json.loads(self.path.read_text()), {"a": ROUNDS, "b": ROUNDS})
+
+    def test_unchanged_update_is_not_written(self):
+        store = ConfigStore(self.path)
+        self.assertTrue(store.update(lambda config: config.update(primary="x")))
+        mtime = self.path.stat().st_mtime_ns
+        self.assertFalse(store.update(lambda config: config.update(primary="x")))
+        self.assertEqual(self.path.stat().st_mtime_ns, mtime)
+
+
+if __name__ == "__main__":
+    unittest.main()
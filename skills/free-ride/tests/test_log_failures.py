@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""Gateway log classification (watcher.classify_log_line)."""
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from watcher import classify_log_line  # noqa: E402
+
+MODEL = "qwen/qwen3-coder:free"
+
+
+class ClassifyLogLineTest(unittest.TestCase):
+
+    def test_status_lines(self):
+        cases = {
+            "provider error for qwen/qwen3-coder: HTTP 429": "rate_limit",
+            "qwen/qwen3-coder:free failed status=429": "rate_limit",
+            "model=qwen/qwen3-coder:free status_code: 503": "unavailable",
+            "qwen/qwen3-coder:free -> HTTP/1.1 503": "unavailable",
+            'qwen/qwen3-coder {"error": 429}': "rate_limit",
+            "qwen/qwen3-coder:free: Rate limit exceeded": "rate_limit",
+            "qwen/qwen3-coder:free: 429 Too Many Requests": "rate_limit",
+            "qwen/qwen3-coder:free: provider overloaded": "unavailable",
+        }
+        for line, expected in cases.items():
+            with self.subTest(line=line):
+                self.assertEqual(classify_log_line(line, MODEL), expected)
+
+    def test_unrelated_numbers(self):
+        lines = [
+            "request 429 to qwen/qwen3-coder:free completed in 812ms",
+            "qwen/qwen3-coder:free streamed 503 bytes",
+            "listening on 127.0.0.1:4290, primary qwen/qwen3-coder:free",
+            "session 503 switched to qwen/qwen3-coder:free",
+            "qwen/qwen3-coder:free status=200 tokens=429",
+            "qwen/qwen3-coder:free HTTP 200 id=chatcmpl-503",
+        ]
+        for line in lines:
+            with self.subTest(line=line):
+                self.assertIsNone(classify_log_line(line, MODEL))
+
+    def test_other_models_ignored(self):
+        self.assertIsNone(classify_log_line("meta-llama/llama-3.3-70b: HTTP 429", MODEL))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -7,11 +7,16 @@ Can run as a daemon or be called periodically via cron.
 
 import json
 import os
+import re
 import sys
 import time
+import random
 import signal
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from datetime import datetime, timedelta
+from datetime import datetime
+from email.utils import parsedate_to_datetime
 from typing import Optional
 
 try:
@@ -25,60 +30,288 @@ except ImportError:
 from main import (
     get_api_key,
     get_free_models,
-    load_openclaw_config,
-    save_openclaw_config,
+    get_config_store,
+    update_openclaw_config,
     ensure_config_structure,
     format_model_for_openclaw,
-    OPENCLAW_CONFIG_PATH
+    OPENCLAW_CONFIG_PATH,
+    OPENROUTER_BASE_URL,
+    WATCHER_STATE_FILE
+)
+from logtail import LogTailer, default_log_paths
+from statestore import JournaledState
+from ratelimit import get_rate_limiter, get_probe_budget
+from metrics import (
+    get_metrics,
+    emit,
+    serve_metrics,
+    open_event_log,
+    close_event_log,
+    METRICS_HOST
 )
 
 
 # Constants
-STATE_FILE = Path.home() / ".openclaw" / ".freeride-watcher-state.json"
-RATE_LIMIT_COOLDOWN_MINUTES = 30
+STATE_FILE = WATCHER_STATE_FILE
 CHECK_INTERVAL_SECONDS = 60
-OPENROUTER_CHAT_URL = "https://openrouter.ai/api/v1/chat/completions"
+SAFETY_NET_INTERVAL_SECONDS = 600  # Periodic probe interval when following gateway logs
+
+# Adaptive check interval: relaxes while the primary stays healthy and overnight,
+# tightens after failures; probe quota itself is capped by ratelimit's probe budget
+CHECK_INTERVAL_MIN_SECONDS = 30
+CHECK_INTERVAL_MAX_SECONDS = 900
+CHECK_HEALTHY_BACKOFF = 1.5         # Interval grows by this factor per healthy check
+CHECK_RECENT_FAILURE_SECONDS = 900  # A rotation this recent keeps checks at the minimum
+CHECK_JITTER = 0.2                  # Randomize each interval by up to ±20%
+QUIET_HOURS = os.environ.get("FREERIDE_QUIET_HOURS", "0-7")  # Local hours, "start-end"
+QUIET_HOURS_FACTOR = 3              # Interval multiplier during quiet hours
+PROBE_CANDIDATES = 8      # Candidates probed per round when looking for a new model
+PROBE_CONCURRENCY = 4     # Probes in flight at once
+PROBE_MAX_TOKENS = 16              # Completion budget of a streaming probe
+PROBE_TIMEOUT = (10, 30)           # (connect, read) seconds
+PROBE_TPS_WINDOW_SECONDS = 1.0     # How long to keep reading after the first token
+LATENCY_HISTORY_SIZE = 50          # Recent probes summarised by --status
+OPENROUTER_CHAT_URL = f"{OPENROUTER_BASE_URL}/chat/completions"
+
+# Circuit breaker: first cooldown per failure type, doubled per consecutive failure
+BREAKER_BASE_COOLDOWN_SECONDS = {
+    "rate_limit": 60,
+    "unavailable": 30,
+    "timeout": 60,
+}
+BREAKER_DEFAULT_COOLDOWN_SECONDS = 120  # Other errors (4xx/5xx, connection errors)
+BREAKER_MAX_COOLDOWN_SECONDS = 30 * 60  # Cap for computed backoff
+BREAKER_MAX_HEADER_COOLDOWN_SECONDS = 24 * 3600  # Cap for Retry-After / X-RateLimit-Reset
+BREAKER_TRIAL_TIMEOUT_SECONDS = 60      # A half-open trial not reported back by then is abandoned
+BREAKER_FORGET_SECONDS = 24 * 3600      # Drop breakers left half-open this long after cooldown
+LEGACY_COOLDOWN_MINUTES = 30            # Cooldown of pre-breaker "rate_limited_models" entries
+
+# Warm standby: a verified next primary and fallback chain kept ready by the daemon
+STANDBY_MAX_AGE_SECONDS = float(os.environ.get("FREERIDE_STANDBY_MAX_AGE_SECONDS", 300))
+STANDBY_FALLBACKS = 4   # Fallbacks kept after openrouter/free
+STANDBY_VERIFIED = 2    # Models a refresh verifies: the successor plus one fallback
+
+# Gateway log lines that mean the model behind them is failing. Bare 429/503
+# only count as a status ("HTTP 429", "status=503", "code: 429"), not as
+# ids, ports or byte counts that happen to share the line
+LOG_FAILURE_PATTERN = re.compile(
+    r"\b(?:status(?:[ _-]?code)?|http(?:/\d(?:\.\d)?)?|code|error)\b[\s=:\"']*(?:429|503)\b"
+    r"|rate[ _-]?limit|too many requests|service unavailable|overloaded",
+    re.IGNORECASE
+)
 
+# Probe threads record outcomes into the shared state dict
+_state_lock = threading.RLock()
+
+
+def load_state() -> JournaledState:
+    """Load watcher state (snapshot plus journal)."""
+    state = JournaledState(STATE_FILE, {"breakers": {}, "rotation_count": 0})
+
+    # Carry cooldowns written before the circuit breaker over as open breakers
+    legacy = state.get("rate_limited_models")
+    if legacy is not None:
+        for model_id, limited_at in legacy.items():
+            try:
+                open_until = datetime.fromisoformat(limited_at).timestamp() + LEGACY_COOLDOWN_MINUTES * 60
+            except (ValueError, TypeError):
+                continue
+            if model_id not in state.get("breakers", {}):
+                state.append({"op": "breaker", "model": model_id, "breaker": {
+                    "state": "open", "failures": 1, "open_until": open_until,
+                    "last_error": "rate_limit", "trial_at": None
+                }})
+        state.append({"op": "unset", "key": "rate_limited_models"})
+
+    get_rate_limiter().attach(state)
+    get_probe_budget().attach(state)
+    return state
+
+
+def save_state(state: JournaledState):
+    """Make sure journaled state changes have reached the disk."""
+    state.flush()
 
-def load_state() -> dict:
-    """Load watcher state."""
-    if STATE_FILE.exists():
-        try:
-            return json.loads(STATE_FILE.read_text())
-        except json.JSONDecodeError:
-            pass
-    return {"rate_limited_models": {}, "rotation_count": 0}
 
+# ============== Circuit Breaker ==============
+#
+# Each model that failed has an entry in state["breakers"]:
+#   closed     no entry; the model is probed and used normally
+#   open       failed recently; skipped until open_until
+#   half_open  cooldown over; exactly one trial probe may run, success
+#              closes the breaker, failure reopens it with a longer cooldown
 
-def save_state(state: dict):
-    """Save watcher state."""
-    STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
-    STATE_FILE.write_text(json.dumps(state, indent=2))
+
+def breaker_state(state: dict, model_id: str, now: float = None) -> str:
+    """Return "closed", "open" or "half_open" for a model."""
+    breaker = state.get("breakers", {}).get(model_id)
+    if not breaker:
+        return "closed"
+    now = time.time() if now is None else now
+    if breaker["state"] == "open" and now < breaker["open_until"]:
+        return "open"
+    return "half_open"
 
 
 def is_model_rate_limited(state: dict, model_id: str) -> bool:
-    """Check if a model is currently in rate-limit cooldown."""
-    rate_limited = state.get("rate_limited_models", {})
-    if model_id not in rate_limited:
-        return False
+    """Check if a model's breaker is open, i.e. it is still in cooldown."""
+    return breaker_state(state, model_id) == "open"
 
-    limited_at = datetime.fromisoformat(rate_limited[model_id])
-    cooldown_end = limited_at + timedelta(minutes=RATE_LIMIT_COOLDOWN_MINUTES)
-    return datetime.now() < cooldown_end
 
+def claim_breaker_trial(state: JournaledState, model_id: str) -> bool:
+    """
+    Return True if the model may be probed now.
 
-def mark_rate_limited(state: dict, model_id: str):
-    """Mark a model as rate limited."""
-    if "rate_limited_models" not in state:
-        state["rate_limited_models"] = {}
-    state["rate_limited_models"][model_id] = datetime.now().isoformat()
-    save_state(state)
+    Closed breakers always allow a probe. A half-open breaker allows a
+    single trial: the first caller claims it and others are turned away
+    until the trial reports back (or BREAKER_TRIAL_TIMEOUT_SECONDS pass).
+    Claims are journaled, so other processes sharing the state see them.
+    """
+    with _state_lock:
+        state.refresh()
+        now = time.time()
+        state_name = breaker_state(state, model_id, now)
+        if state_name == "closed":
+            return True
+        if state_name == "open":
+            return False
+
+        breaker = state["breakers"][model_id]
+        trial_at = breaker.get("trial_at")
+        if trial_at and now - trial_at < BREAKER_TRIAL_TIMEOUT_SECONDS:
+            return False
+        state.append({"op": "breaker", "model": model_id,
+                      "breaker": dict(breaker, state="half_open", trial_at=now)})
+        return True
+
+
+def _breaker_cooldown(error: str, failures: int, retry_after: Optional[float]) -> float:
+    """Cooldown for the given failure: the server's hint if any, else exponential backoff."""
+    if retry_after is not None:
+        return min(retry_after, BREAKER_MAX_HEADER_COOLDOWN_SECONDS)
+    base = BREAKER_BASE_COOLDOWN_SECONDS.get(error, BREAKER_DEFAULT_COOLDOWN_SECONDS)
+    return min(base * 2 ** (failures - 1), BREAKER_MAX_COOLDOWN_SECONDS)
+
+
+def _update_breaker(state: JournaledState, model_id: str, result: dict):
+    """Apply a probe result to a model's breaker. Caller holds _state_lock."""
+    breaker = state.get("breakers", {}).get(model_id)
+    if result.get("err") in ("cancelled", "throttled"):
+        # The trial never ran to completion; let someone else take it
+        if breaker and breaker.get("trial_at"):
+            state.append({"op": "breaker", "model": model_id, "breaker": dict(breaker, trial_at=None)})
+        return
+
+    if result.get("ok"):
+        if breaker:
+            state.append({"op": "breaker", "model": model_id, "breaker": None})
+            emit("breaker_closed", model=model_id)
+        return
+
+    failures = (breaker or {}).get("failures", 0) + 1
+    cooldown = _breaker_cooldown(result["err"], failures, result.get("retry_after"))
+    state.append({"op": "breaker", "model": model_id, "breaker": {
+        "state": "open",
+        "failures": failures,
+        "open_until": time.time() + cooldown,
+        "last_error": result["err"],
+        "trial_at": None
+    }})
+    get_metrics().inc("freeride_breaker_trips_total", error=result["err"])
+    emit("breaker_open", model=model_id, error=result["err"], failures=failures, cooldown_s=round(cooldown))
+
+
+def mark_model_failed(state: JournaledState, model_id: str, error: str, retry_after: float = None):
+    """Open a model's breaker after a failure seen outside a probe (e.g. in gateway logs)."""
+    with _state_lock:
+        _update_breaker(state, model_id, {"ok": False, "err": error, "retry_after": retry_after})
+
+
+def mark_model_ok(state: JournaledState, model_id: str):
+    """Close a model's breaker after it served a request outside a probe."""
+    with _state_lock:
+        _update_breaker(state, model_id, {"ok": True, "err": None})
+
+
+def cleanup_breakers(state: dict):
+    """Forget breakers whose cooldown ended long ago without a trial probe."""
+    with _state_lock:
+        breakers = state.get("breakers", {})
+        cutoff = time.time() - BREAKER_FORGET_SECONDS
+        expired = [
+            model_id for model_id, breaker in breakers.items()
+            if not isinstance(breaker.get("open_until"), (int, float))
+            or breaker["open_until"] < cutoff
+        ]
+
+        for model_id in expired:
+            state.append({"op": "breaker", "model": model_id, "breaker": None})
+            print(f"  Cleared cooldown: {model_id}")
+
+
+def retry_after_seconds(headers) -> Optional[float]:
+    """Seconds until the server wants us back, from Retry-After or X-RateLimit-Reset."""
+    retry_after = headers.get("Retry-After")
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+
+    reset = headers.get("X-RateLimit-Reset")
+    if reset:
+        try:
+            reset = float(reset)
+        except ValueError:
+            return None
+        if reset > 1e12:
+            reset /= 1000  # OpenRouter sends epoch milliseconds
+        if reset > 1e9:
+            return max(0.0, reset - time.time())
+        return max(0.0, reset)  # Already relative
 
+    return None
 
-def test_model(api_key: str, model_id: str) -> tuple[bool, Optional[str]]:
+
+def _status_error(status_code: int) -> str:
+    if status_code == 429:
+        return "rate_limit"
+    if status_code == 503:
+        return "unavailable"
+    return f"error_{status_code}"
+
+
+def probe_model(
+    api_key: str,
+    model_id: str,
+    cancel: threading.Event = None,
+    messages: list = None,
+    max_tokens: int = PROBE_MAX_TOKENS,
+    tps_window: Optional[float] = PROBE_TPS_WINDOW_SECONDS,
+    limit_wait: float = 0.0,
+    budgeted: bool = True
+) -> dict:
     """
-    Test if a model is available by making a minimal API call.
-    Returns (success, error_type).
+    Probe a model with a small streaming completion and measure it.
+
+    Records time to response headers (connect_ms), time to first token
+    (ttft_ms) and, from the tokens that arrive within tps_window seconds
+    of the first one, tokens/sec. The stream is closed as soon as that
+    window ends; with tps_window=None it is read to the end, and total_ms
+    and tokens cover the whole completion (benchmarks do this). Setting
+    `cancel` before the request goes out skips it with err="cancelled";
+    once response headers are in, the status is already known, so a
+    cancel stops reading and returns that outcome with whatever was
+    measured so far. For
+    error responses, retry_after carries the server's Retry-After /
+    X-RateLimit-Reset hint in seconds. Probes take a token from the
+    model's rate limiter like any other request, waiting up to
+    limit_wait seconds for one, and unless budgeted=False count against
+    the hourly probe budget; with no token or budget left the probe is
+    skipped with err="throttled".
     """
     headers = {
         "Authorization": f"Bearer {api_key}",
@@ -89,39 +322,224 @@ def test_model(api_key: str, model_id: str) -> tuple[bool, Optional[str]]:
 
     payload = {
         "model": model_id,
-        "messages": [{"role": "user", "content": "Hi"}],
-        "max_tokens": 5,
-        "stream": False
+        "messages": messages or [{"role": "user", "content": "Hi"}],
+        "max_tokens": max_tokens,
+        "stream": True
     }
 
+    result = {"t": time.time(), "ok": False, "err": None, "retry_after": None,
+              "connect_ms": None, "ttft_ms": None, "tps": None, "total_ms": None, "tokens": None}
+
+    if cancel is not None and cancel.is_set():
+        result["err"] = "cancelled"
+        return result
+    budget = get_probe_budget()
+    if budgeted and not budget.available(model_id):
+        result["err"] = "throttled"
+        return result
+    limiter = get_rate_limiter()
+    if not (limiter.acquire(model_id, limit_wait) if limit_wait else limiter.try_acquire(model_id)):
+        result["err"] = "throttled"
+        return result
+    budget.spend(model_id)
+    start = time.perf_counter()
+
     try:
-        response = requests.post(
+        with requests.post(
             OPENROUTER_CHAT_URL,
             headers=headers,
             json=payload,
-            timeout=30
-        )
-
-        if response.status_code == 200:
-            return True, None
-        elif response.status_code == 429:
-            return False, "rate_limit"
-        elif response.status_code == 503:
-            return False, "unavailable"
-        else:
-            return False, f"error_{response.status_code}"
+            timeout=PROBE_TIMEOUT,
+            stream=True
+        ) as response:
+            result["connect_ms"] = (time.perf_counter() - start) * 1000
+            if response.status_code != 200:
+                result["err"] = _status_error(response.status_code)
+                result["retry_after"] = retry_after_seconds(response.headers)
+                if response.status_code == 429:
+                    limiter.note_rate_limited(model_id, result["retry_after"])
+                return result
+
+            first_at = last_at = None
+            tokens = 0
+            usage_tokens = None
+            for line in response.iter_lines(chunk_size=None):
+                if cancel is not None and cancel.is_set():
+                    # The model answered; record that rather than dropping the probe
+                    result["ok"] = True
+                    return result
+                if not line.startswith(b"data:"):
+                    continue  # SSE comments / keep-alives
+                data = line[5:].strip()
+                if data == b"[DONE]":
+                    break
+                try:
+                    event = json.loads(data)
+                except ValueError:
+                    continue
+
+                if "error" in event:
+                    code = (event.get("error") or {}).get("code")
+                    result["err"] = _status_error(code) if isinstance(code, int) else "stream_error"
+                    if code == 429:
+                        limiter.note_rate_limited(model_id)
+                    return result
+
+                if (event.get("usage") or {}).get("completion_tokens"):
+                    usage_tokens = event["usage"]["completion_tokens"]
+                delta = ((event.get("choices") or [{}])[0]).get("delta") or {}
+                if not (delta.get("content") or delta.get("reasoning")):
+                    continue
+
+                now = time.perf_counter()
+                if first_at is None:
+                    first_at = now
+                    result["ttft_ms"] = (now - start) * 1000
+                last_at = now
+                tokens += 1
+                if tps_window is not None and now - first_at >= tps_window:
+                    break
+
+            # Chunks can carry several tokens; trust the usage report when the stream has one
+            if usage_tokens and tokens > 1:
+                tokens = usage_tokens
+            if tokens > 1 and last_at > first_at:
+                result["tps"] = (tokens - 1) / (last_at - first_at)
+            result["total_ms"] = (time.perf_counter() - start) * 1000
+            result["tokens"] = usage_tokens or tokens
+            result["ok"] = True
 
     except requests.Timeout:
-        return False, "timeout"
-    except requests.RequestException as e:
-        return False, "request_error"
+        result["err"] = "timeout"
+    except requests.RequestException:
+        result["err"] = "request_error"
 
+    return result
+
+
+def test_model(api_key: str, model_id: str) -> tuple[bool, Optional[str]]:
+    """
+    Test if a model is available by making a minimal API call.
+    Returns (success, error_type).
+    """
+    result = probe_model(api_key, model_id)
+    return result["ok"], result["err"]
+
+
+def record_probe_result(state: JournaledState, model_id: str, result: dict):
+    """Record a probe sample in the model's latency history and update its breaker."""
+    if result.get("err") in ("cancelled", "throttled"):
+        with _state_lock:
+            _update_breaker(state, model_id, result)
+        return
+
+    sample = {k: result[k] for k in ("t", "ok", "err")}
+    for key in ("connect_ms", "ttft_ms", "tps"):
+        if result.get(key) is not None:
+            sample[key] = round(result[key], 1)
+
+    with _state_lock:
+        state.record_probe(model_id, sample)
+        _update_breaker(state, model_id, result)
+
+    metrics = get_metrics()
+    metrics.inc("freeride_probes_total", model=model_id, result="ok" if result["ok"] else result["err"])
+    if result["ok"] and result.get("ttft_ms") is not None:
+        metrics.observe("freeride_probe_ttft_seconds", result["ttft_ms"] / 1000, model=model_id)
+    emit("probe", model=model_id, **{k: v for k, v in sample.items() if k != "t"})
+
+
+def percentile(sorted_values: list, pct: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+def latency_summary(history: list) -> dict:
+    """p50/p95 TTFT, median tokens/sec and error rate over a model's probe history."""
+    ttfts = sorted(s["ttft_ms"] for s in history if s.get("ok") and s.get("ttft_ms") is not None)
+    tps = sorted(s["tps"] for s in history if s.get("ok") and s.get("tps") is not None)
+    errors = sum(1 for s in history if not s.get("ok"))
+    return {
+        "samples": len(history),
+        "ttft_p50": percentile(ttfts, 50),
+        "ttft_p95": percentile(ttfts, 95),
+        "tps_p50": percentile(tps, 50),
+        "error_rate": errors / len(history) if history else 0.0
+    }
 
-def get_next_available_model(api_key: str, state: dict, exclude_model: str = None) -> Optional[str]:
-    """Get the next best model that isn't rate limited."""
-    models = get_free_models(api_key)
 
-    for model in models:
+def _record_probe_outcome(state: dict, model_id: str, future):
+    """Feed a finished probe into the breaker and latency state, even if nobody waits on it."""
+    if future.cancelled():
+        result = {"ok": False, "err": "cancelled"}
+    elif future.exception() is not None:
+        result = {"t": time.time(), "ok": False, "err": "request_error"}
+    else:
+        result = future.result()
+    record_probe_result(state, model_id, result)
+
+
+def probe_candidates(
+    api_key: str,
+    state: dict,
+    candidates: list,
+    max_candidates: int = PROBE_CANDIDATES,
+    concurrency: int = PROBE_CONCURRENCY
+) -> Optional[str]:
+    """Probe ranked candidates concurrently and return the best-ranked healthy one.
+
+    Candidates are probed in rounds of max_candidates with at most
+    `concurrency` requests in flight. A model wins as soon as it succeeds
+    and every better-ranked candidate in its round has failed; queued
+    probes are then cancelled and probes that have not sent their request
+    yet are skipped. Probes already in flight still record their status
+    in the breaker and latency state in the background, streaming ones
+    as soon as they notice the cancel.
+    Candidates whose half-open trial is already taken are skipped.
+    """
+    for start in range(0, len(candidates), max_candidates):
+        window = candidates[start:start + max_candidates]
+        outcomes = [None] * len(window)
+        cancel = threading.Event()
+        executor = ThreadPoolExecutor(
+            max_workers=min(concurrency, len(window)), thread_name_prefix="freeride-probe"
+        )
+        try:
+            futures = {}
+            for rank, model_id in enumerate(window):
+                if not claim_breaker_trial(state, model_id):
+                    outcomes[rank] = False
+                    continue
+                future = executor.submit(probe_model, api_key, model_id, cancel)
+                future.add_done_callback(
+                    lambda f, model_id=model_id: _record_probe_outcome(state, model_id, f)
+                )
+                futures[future] = rank
+
+            for future in as_completed(futures):
+                rank = futures[future]
+                outcomes[rank] = future.exception() is None and future.result()["ok"]
+
+                # Best-ranked candidate whose fate is known, skipping failures
+                for i, outcome in enumerate(outcomes):
+                    if outcome is None:
+                        break
+                    if outcome:
+                        return window[i]
+        finally:
+            cancel.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    return None
+
+
+def _rotation_candidates(api_key: str, state: dict, exclude_model: str = None) -> list:
+    """Ranked model ids eligible to become primary or fallback."""
+    candidates = []
+    for model in get_free_models(api_key):
         model_id = model["id"]
 
         # Skip the openrouter/free router - we want specific models
@@ -136,44 +554,154 @@ def get_next_available_model(api_key: str, state: dict, exclude_model: str = Non
         if is_model_rate_limited(state, model_id):
             continue
 
-        # Test if actually available
-        success, error = test_model(api_key, model_id)
-        if success:
-            return model_id
+        candidates.append(model_id)
+    return candidates
 
-        # Mark as rate limited if that's the error
-        if error == "rate_limit":
-            mark_rate_limited(state, model_id)
 
-    return None
+def get_next_available_model(api_key: str, state: dict, exclude_model: str = None) -> Optional[str]:
+    """Get the next best model whose breaker isn't open."""
+    candidates = _rotation_candidates(api_key, state, exclude_model)
 
+    # Test which candidates are actually available
+    return probe_candidates(api_key, state, candidates)
 
-def rotate_to_next_model(api_key: str, state: dict, reason: str = "manual"):
-    """Rotate to the next available model."""
-    config = load_openclaw_config()
-    config = ensure_config_structure(config)
-    current = config.get("agents", {}).get("defaults", {}).get("model", {}).get("primary")
 
-    # Extract base model ID from OpenClaw format
-    current_base = None
-    if current:
-        # openrouter/provider/model:free -> provider/model:free
-        if current.startswith("openrouter/"):
-            current_base = current[len("openrouter/"):]
-        else:
-            current_base = current
+def probe_all(
+    api_key: str,
+    state: dict,
+    candidates: list,
+    concurrency: int = PROBE_CONCURRENCY
+) -> list:
+    """Probe every candidate and return the healthy ones in rank order."""
+    candidates = [model_id for model_id in candidates if claim_breaker_trial(state, model_id)]
+    if not candidates:
+        return []
 
-    print(f"[{datetime.now().isoformat()}] Rotating from: {current_base or 'none'}")
-    print(f"  Reason: {reason}")
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(candidates)),
+                            thread_name_prefix="freeride-probe") as executor:
+        results = list(executor.map(lambda model_id: probe_model(api_key, model_id), candidates))
 
-    next_model = get_next_available_model(api_key, state, current_base)
+    healthy = []
+    for model_id, result in zip(candidates, results):
+        record_probe_result(state, model_id, result)
+        if result["ok"]:
+            healthy.append(model_id)
+    return healthy
+
+
+def get_current_base() -> Optional[str]:
+    """Current primary without the "openrouter/" provider prefix."""
+    current = get_config_store().peek().get("agents", {}).get("defaults", {}).get("model", {}).get("primary")
+    if current and current.startswith("openrouter/"):
+        return current[len("openrouter/"):]
+    return current
 
-    if not next_model:
-        print("  Error: No available models found!")
-        return False
 
-    print(f"  New model: {next_model}")
+def _recently_verified(state: JournaledState, model_id: str, max_age: float = STANDBY_MAX_AGE_SECONDS) -> bool:
+    """True if the model's latest probe succeeded within max_age seconds and its breaker is closed."""
+    last_probe = state.probes.latest(model_id)
+    return (bool(last_probe) and last_probe["ok"] and time.time() - last_probe["t"] < max_age
+            and breaker_state(state, model_id) == "closed")
 
+
+def refresh_standby(api_key: str, state: JournaledState, current_base: str = None) -> Optional[dict]:
+    """
+    Verify a successor for current_base and a fallback chain behind it.
+
+    Walks the top PROBE_CANDIDATES eligible models in rank order until
+    STANDBY_VERIFIED of them are known healthy, probing only those
+    without a recent successful probe. The first becomes the standby
+    primary; the fallbacks are the other verified ones, topped up to
+    STANDBY_FALLBACKS with candidates that were not tried. A failed
+    refresh is recorded too, so it is retried only after
+    STANDBY_MAX_AGE_SECONDS.
+    """
+    candidates = _rotation_candidates(api_key, state, current_base)
+    window = candidates[:PROBE_CANDIDATES]
+    verdicts = {}
+    tried = 0
+    while tried < len(window) and sum(verdicts.values()) < STANDBY_VERIFIED:
+        batch = []
+        while tried < len(window) and sum(verdicts.values()) + len(batch) < STANDBY_VERIFIED:
+            model_id = window[tried]
+            tried += 1
+            if _recently_verified(state, model_id):
+                verdicts[model_id] = True
+            else:
+                batch.append(model_id)
+        healthy_batch = probe_all(api_key, state, batch)
+        for model_id in batch:
+            verdicts[model_id] = model_id in healthy_batch
+    healthy = [model_id for model_id in window if verdicts.get(model_id)]
+
+    fallbacks = healthy[1:1 + STANDBY_FALLBACKS]
+    verified = len(fallbacks)
+    for model_id in candidates[tried:]:
+        if len(fallbacks) >= STANDBY_FALLBACKS:
+            break
+        fallbacks.append(model_id)
+
+    standby = {
+        "for": current_base,
+        "primary": healthy[0] if healthy else None,
+        "fallbacks": fallbacks,
+        "verified_fallbacks": verified,
+        "verified_at": time.time()
+    }
+    state.append({"op": "set", "key": "standby", "value": standby})
+    return standby
+
+
+def standby_needs_refresh(
+    state: dict,
+    current_base: Optional[str],
+    max_age: float = STANDBY_MAX_AGE_SECONDS
+) -> bool:
+    """True if there is no standby for current_base or it is older than max_age seconds."""
+    standby = state.get("standby")
+    if not standby or standby.get("for") != current_base:
+        return True
+    return time.time() - standby.get("verified_at", 0) >= max_age
+
+
+def _usable_standby(
+    api_key: str,
+    state: JournaledState,
+    current_base: Optional[str],
+    max_age: float = CHECK_INTERVAL_SECONDS
+) -> Optional[dict]:
+    """
+    The standby for current_base if its primary can be swapped in right now.
+
+    A standby whose primary has a breaker (open or half-open) or failed a
+    probe since it was verified is dropped. One verified more than max_age
+    seconds (a check interval) ago is re-probed first, since failures
+    often hit several models at once.
+    """
+    standby = state.get("standby")
+    if not standby or standby.get("for") != current_base or not standby.get("primary"):
+        return None
+    primary = standby["primary"]
+    verified_at = standby.get("verified_at", 0)
+    if breaker_state(state, primary) != "closed":
+        return None
+    last_probe = state.probes.latest(primary)
+    if last_probe and last_probe["t"] > verified_at and not last_probe["ok"]:
+        return None
+
+    if time.time() - verified_at >= max_age:
+        # Too old to trust blindly: re-verify just the successor
+        if not claim_breaker_trial(state, primary):
+            return None
+        result = probe_model(api_key, primary)
+        record_probe_result(state, primary, result)
+        if not result["ok"]:
+            return None
+    return standby
+
+
+def _apply_rotation(config: dict, next_model: str, fallback_ids: list):
+    """Point the config at next_model with openrouter/free plus fallback_ids behind it."""
     # Update config - primary uses provider prefix, fallbacks don't
     formatted_primary = format_model_for_openclaw(next_model, with_provider_prefix=True)
     config["agents"]["defaults"]["model"]["primary"] = formatted_primary
@@ -182,37 +710,83 @@ def rotate_to_next_model(api_key: str, state: dict, reason: str = "manual"):
     formatted_for_list = format_model_for_openclaw(next_model, with_provider_prefix=False)
     config["agents"]["defaults"]["models"][formatted_for_list] = {}
 
-    # Rebuild fallbacks from remaining models (using correct format: no provider prefix)
-    models = get_free_models(api_key)
-    fallbacks = []
-
-    # Always add openrouter/free as first fallback
+    # Always add openrouter/free as first fallback (no provider prefix)
     free_router = "openrouter/free"
-    fallbacks.append(free_router)
+    fallbacks = [free_router]
     config["agents"]["defaults"]["models"][free_router] = {}
 
-    for m in models:
-        if m["id"] == next_model or "openrouter/free" in m["id"]:
-            continue
-        if is_model_rate_limited(state, m["id"]):
-            continue
-
-        fb_formatted = format_model_for_openclaw(m["id"], with_provider_prefix=False)
+    for model_id in fallback_ids:
+        fb_formatted = format_model_for_openclaw(model_id, with_provider_prefix=False)
         fallbacks.append(fb_formatted)
         config["agents"]["defaults"]["models"][fb_formatted] = {}
 
-        if len(fallbacks) >= 5:
-            break
-
     config["agents"]["defaults"]["model"]["fallbacks"] = fallbacks
 
-    save_openclaw_config(config)
+
+def rotate_to_next_model(api_key: str, state: dict, reason: str = "manual"):
+    """Rotate to the next available model.
+
+    Swaps in the warm standby when one is ready for the current primary;
+    otherwise probes candidates and rebuilds the fallbacks inline.
+    """
+    config = get_config_store().peek()
+    current = config.get("agents", {}).get("defaults", {}).get("model", {}).get("primary")
+
+    # Extract base model ID from OpenClaw format
+    current_base = None
+    if current:
+        # openrouter/provider/model:free -> provider/model:free
+        if current.startswith("openrouter/"):
+            current_base = current[len("openrouter/"):]
+        else:
+            current_base = current
+
+    print(f"[{datetime.now().isoformat()}] Rotating from: {current_base or 'none'}")
+    print(f"  Reason: {reason}")
+
+    standby = _usable_standby(api_key, state, current_base)
+    if standby:
+        next_model = standby["primary"]
+        fallback_ids = [
+            m for m in standby["fallbacks"]
+            if m != current_base and not is_model_rate_limited(state, m)
+        ]
+        print(f"  New model: {next_model} (warm standby)")
+    else:
+        next_model = get_next_available_model(api_key, state, current_base)
+
+        if not next_model:
+            print("  Error: No available models found!")
+            emit("rotation_failed", model=current_base, reason=reason)
+            return False
+
+        print(f"  New model: {next_model}")
+
+        # Rebuild fallbacks from remaining models
+        fallback_ids = []
+        for m in get_free_models(api_key):
+            if m["id"] == next_model or "openrouter/free" in m["id"]:
+                continue
+            if is_model_rate_limited(state, m["id"]):
+                continue
+            fallback_ids.append(m["id"])
+            if len(fallback_ids) >= STANDBY_FALLBACKS:
+                break
+
+    # Probing happens outside the lock; the write re-reads the config under it
+    def apply(config: dict):
+        _apply_rotation(ensure_config_structure(config), next_model, fallback_ids)
+
+    written = update_openclaw_config(apply)
 
     # Update state
-    state["rotation_count"] = state.get("rotation_count", 0) + 1
-    state["last_rotation"] = datetime.now().isoformat()
-    state["last_rotation_reason"] = reason
-    save_state(state)
+    state.append({"op": "rotation", "t": datetime.now().isoformat(),
+                  "from": current_base, "to": next_model, "reason": reason})
+    metrics = get_metrics()
+    metrics.inc("freeride_config_writes_total", result="written" if written else "unchanged")
+    metrics.inc("freeride_rotations_total", reason=reason)
+    emit("rotation", model=next_model, previous=current_base, reason=reason,
+         standby=bool(standby), fallbacks=fallback_ids)
 
     print(f"  Success! Rotated to {next_model}")
     print(f"  Total rotations this session: {state['rotation_count']}")
@@ -220,9 +794,41 @@ def rotate_to_next_model(api_key: str, state: dict, reason: str = "manual"):
     return True
 
 
+def classify_log_line(line: str, model_base: str) -> Optional[str]:
+    """Return "rate_limit" or "unavailable" if a log line reports a failure for model_base."""
+    # Logs may mention the model with or without the ":free" suffix
+    if not model_base or model_base.split(":")[0] not in line:
+        return None
+    match = LOG_FAILURE_PATTERN.search(line)
+    if not match:
+        return None
+    text = match.group(0).lower()
+    if "503" in text or "unavailable" in text or "overloaded" in text:
+        return "unavailable"
+    return "rate_limit"
+
+
+def rotate_on_log_failure(api_key: str, state: dict, lines: list) -> bool:
+    """Rotate right away if the gateway logged a 429/503 for the current primary."""
+    current = get_config_store().peek().get("agents", {}).get("defaults", {}).get("model", {}).get("primary")
+    if not current:
+        return False
+    current_base = current[len("openrouter/"):] if current.startswith("openrouter/") else current
+
+    for line in lines:
+        error = classify_log_line(line, current_base)
+        if not error:
+            continue
+        print(f"[{datetime.now().isoformat()}] Gateway log reports {error} for {current_base}")
+        mark_model_failed(state, current_base, error)
+        return rotate_to_next_model(api_key, state, f"log_{error}")
+
+    return False
+
+
 def check_and_rotate(api_key: str, state: dict) -> bool:
     """Check current model and rotate if needed."""
-    config = load_openclaw_config()
+    config = get_config_store().peek()
     current = config.get("agents", {}).get("defaults", {}).get("model", {}).get("primary")
 
     if not current:
@@ -235,68 +841,199 @@ def check_and_rotate(api_key: str, state: dict) -> bool:
     else:
         current_base = current
 
-    # Check if current model is rate limited
+    # Rotate away while the current model's breaker is open
     if is_model_rate_limited(state, current_base):
         return rotate_to_next_model(api_key, state, "cooldown_active")
 
-    # Test current model
+    # Test current model (this is the trial probe if its breaker is half-open)
+    if not claim_breaker_trial(state, current_base):
+        print(f"[{datetime.now().isoformat()}] Skipping {current_base}: its trial probe is already running")
+        return False
     print(f"[{datetime.now().isoformat()}] Testing: {current_base}")
-    success, error = test_model(api_key, current_base)
+    result = probe_model(api_key, current_base)
+    record_probe_result(state, current_base, result)
+    success, error = result["ok"], result["err"]
 
+    if error == "throttled":
+        print("  Status: skipped (model is at its request budget)")
+        return False
     if success:
-        print(f"  Status: OK")
+        ttft = f"{result['ttft_ms']:.0f}ms" if result["ttft_ms"] is not None else "n/a"
+        print(f"  Status: OK (TTFT {ttft})")
         return False  # No rotation needed
     else:
         print(f"  Status: {error}")
-        if error == "rate_limit":
-            mark_rate_limited(state, current_base)
         return rotate_to_next_model(api_key, state, error)
 
 
-def cleanup_old_rate_limits(state: dict):
-    """Remove rate limit entries that have expired."""
-    rate_limited = state.get("rate_limited_models", {})
-    current_time = datetime.now()
-    expired = []
-
-    for model_id, limited_at_str in rate_limited.items():
-        try:
-            limited_at = datetime.fromisoformat(limited_at_str)
-            if current_time - limited_at > timedelta(minutes=RATE_LIMIT_COOLDOWN_MINUTES):
-                expired.append(model_id)
-        except (ValueError, TypeError):
-            expired.append(model_id)
-
-    for model_id in expired:
-        del rate_limited[model_id]
-        print(f"  Cleared cooldown: {model_id}")
+def _in_quiet_hours(moment: datetime) -> bool:
+    """True if moment falls in QUIET_HOURS ("0-7"; "22-6" wraps midnight)."""
+    try:
+        start, end = (int(hour) for hour in QUIET_HOURS.split("-"))
+    except ValueError:
+        return False
+    if start <= end:
+        return start <= moment.hour < end
+    return moment.hour >= start or moment.hour < end
 
-    if expired:
-        save_state(state)
 
+def next_check_interval(state: dict, base: float, healthy_streak: int, now: float = None) -> float:
+    """
+    Seconds until the next health check.
+
+    Starts at base and grows by CHECK_HEALTHY_BACKOFF per consecutive
+    healthy check, up to CHECK_INTERVAL_MAX_SECONDS. A rotation in the
+    last CHECK_RECENT_FAILURE_SECONDS or a breaker on the primary drops it
+    to CHECK_INTERVAL_MIN_SECONDS; otherwise quiet hours multiply it by
+    QUIET_HOURS_FACTOR. It never comes before the primary's probe budget
+    allows another probe, and is jittered so checks don't fall into step
+    with other clients.
+    """
+    now = time.time() if now is None else now
+    low = min(CHECK_INTERVAL_MIN_SECONDS, base)
+    high = max(CHECK_INTERVAL_MAX_SECONDS, base)
+    interval = min(high, base * CHECK_HEALTHY_BACKOFF ** healthy_streak)
 
-def run_once():
-    """Run a single check and rotate cycle."""
+    try:
+        rotated_ago = now - datetime.fromisoformat(state.get("last_rotation") or "").timestamp()
+    except ValueError:
+        rotated_ago = None
+    current_base = get_current_base()
+    if ((rotated_ago is not None and rotated_ago < CHECK_RECENT_FAILURE_SECONDS)
+            or current_base in state.get("breakers", {})):
+        interval = low
+    elif _in_quiet_hours(datetime.fromtimestamp(now)):
+        interval *= QUIET_HOURS_FACTOR
+
+    interval *= random.uniform(1 - CHECK_JITTER, 1 + CHECK_JITTER)
+    if current_base:
+        interval = max(interval, get_probe_budget().wait_time(current_base, now))
+    return interval
+
+
+def _state_collector(state: dict):
+    """Metrics collector for the gauges derived from watcher state."""
+    def collect(metrics):
+        now = time.time()
+        counts = {"open": 0, "half_open": 0}
+        for model_id in list(state.get("breakers", {})):
+            name = breaker_state(state, model_id, now)
+            if name in counts:
+                counts[name] += 1
+        metrics.set("freeride_models_in_cooldown", counts["open"])
+        for name, count in counts.items():
+            metrics.set("freeride_breakers", count, state=name)
+        metrics.clear("freeride_probe_budget_used")
+        for model_id, count in get_probe_budget().usage(now).items():
+            metrics.set("freeride_probe_budget_used", count, model=model_id)
+    return collect
+
+
+def run_check(api_key: str, state: dict) -> tuple:
+    """One check-and-rotate cycle with its metrics and event.
+
+    Returns (ok, healthy): ok is False if the check raised or had to
+    rotate, healthy is True if the primary it leaves behind has no breaker.
+    """
+    start = time.perf_counter()
+    rotated = failed = False
+    try:
+        cleanup_breakers(state)
+        rotated = check_and_rotate(api_key, state)
+    except Exception as e:
+        print(f"Error during check: {e}")
+        failed = True
+    duration = time.perf_counter() - start
+
+    current_base = get_current_base()
+    healthy = bool(current_base) and current_base not in state.get("breakers", {})
+    metrics = get_metrics()
+    metrics.observe("freeride_check_duration_seconds", duration)
+    metrics.set("freeride_primary_healthy", int(healthy))
+    metrics.set("freeride_last_check_timestamp_seconds", round(time.time(), 3))
+    emit("check", model=current_base, healthy=healthy, rotated=bool(rotated), error=failed,
+         duration_ms=round(duration * 1000, 1))
+    return not (rotated or failed), healthy
+
+
+def run_once(metrics_textfile: Optional[str] = None, event_log: Optional[str] = None):
+    """Run a single check and rotate cycle.
+
+    With metrics_textfile, the metrics are written there for node_exporter's
+    textfile collector; counters carry on from the previous file.
+    """
     api_key = get_api_key()
     if not api_key:
         print("Error: OPENROUTER_API_KEY not set")
         sys.exit(1)
 
-    state = load_state()
-    cleanup_old_rate_limits(state)
-    check_and_rotate(api_key, state)
-
+    metrics = get_metrics()
+    if metrics_textfile:
+        try:
+            metrics.restore(Path(metrics_textfile).expanduser().read_text())
+        except OSError:
+            pass  # First run
+    if event_log:
+        open_event_log(event_log)
 
-def run_daemon():
-    """Run as a continuous daemon."""
+    state = load_state()
+    metrics.add_collector(_state_collector(state))
+    run_check(api_key, state)
+    if metrics_textfile:
+        metrics.write_textfile(Path(metrics_textfile).expanduser())
+    state.close()
+    close_event_log()
+
+
+def run_daemon(
+    watch_logs: bool = False,
+    log_files: list = None,
+    metrics_port: Optional[int] = None,
+    metrics_host: str = METRICS_HOST,
+    metrics_textfile: Optional[str] = None,
+    event_log: Optional[str] = None
+):
+    """Run as a continuous daemon.
+
+    With watch_logs, the daemon follows OpenClaw's gateway logs and rotates
+    as soon as the current primary hits a 429/503; the periodic probe then
+    only runs every SAFETY_NET_INTERVAL_SECONDS as a safety net.
+
+    Between checks a background thread keeps a verified standby successor
+    for the current primary, so a rotation is just a config swap.
+
+    The time between checks adapts (see next_check_interval), and the
+    standby is re-verified less often in the same proportion.
+
+    Metrics can be served on metrics_host:metrics_port (/metrics) and/or
+    rewritten to metrics_textfile after every check; event_log receives
+    one JSON line per probe, check, breaker change and rotation.
+    """
     api_key = get_api_key()
     if not api_key:
         print("Error: OPENROUTER_API_KEY not set")
         sys.exit(1)
 
+    tailer = None
+    base_interval = CHECK_INTERVAL_SECONDS
+    if watch_logs:
+        paths = [Path(p).expanduser() for p in log_files] if log_files else None
+        tailer = LogTailer(lambda: paths) if paths else LogTailer()
+        base_interval = SAFETY_NET_INTERVAL_SECONDS
+
+    budget = get_probe_budget()
     print(f"FreeRide Watcher started")
-    print(f"Check interval: {CHECK_INTERVAL_SECONDS}s")
-    print(f"Rate limit cooldown: {RATE_LIMIT_COOLDOWN_MINUTES}m")
+    print(f"Check interval: {base_interval}s, adapting between "
+          f"{min(CHECK_INTERVAL_MIN_SECONDS, base_interval)}s and "
+          f"{max(CHECK_INTERVAL_MAX_SECONDS, base_interval)}s (x{QUIET_HOURS_FACTOR} during hours {QUIET_HOURS})")
+    print(f"Probe budget: {budget.per_model}/hour per model, {budget.total}/hour in total")
+    print(f"Standby re-verified every: {STANDBY_MAX_AGE_SECONDS:.0f}s or more")
+    print(f"Breaker cooldown: server hint, else {min(BREAKER_BASE_COOLDOWN_SECONDS.values())}s "
+          f"doubling to {BREAKER_MAX_COOLDOWN_SECONDS // 60}m")
+    if tailer:
+        print(f"Following gateway logs ({tailer.mode}):")
+        for path in (paths or default_log_paths()):
+            print(f"  {path}")
     print("-" * 50)
 
     # Handle graceful shutdown
@@ -310,23 +1047,86 @@ def run_daemon():
     signal.signal(signal.SIGTERM, signal_handler)
 
     state = load_state()
-
-    while running:
+    metrics = get_metrics()
+    metrics.add_collector(_state_collector(state))
+    metrics_server = None
+    if metrics_port is not None:
+        metrics_server = serve_metrics(metrics_host, metrics_port)
+        print(f"Metrics: http://{metrics_host}:{metrics_server.server_port}/metrics")
+    if event_log:
+        open_event_log(event_log)
+        print(f"Event log: {event_log}")
+    emit("watcher_started", interval_s=base_interval, watch_logs=bool(tailer))
+
+    next_check = 0.0
+    interval = base_interval
+    healthy_streak = 0
+    standby_thread = None
+    last_tick = time.monotonic()
+
+    def refresh_standby_in_background(current_base):
         try:
-            cleanup_old_rate_limits(state)
-            check_and_rotate(api_key, state)
+            refresh_standby(api_key, state, current_base)
         except Exception as e:
-            print(f"Error during check: {e}")
+            print(f"Error refreshing standby: {e}")
 
-        # Sleep in small increments to allow graceful shutdown
-        for _ in range(CHECK_INTERVAL_SECONDS):
-            if not running:
-                break
+    while running:
+        if time.monotonic() >= next_check:
+            ok, healthy = run_check(api_key, state)
+            healthy_streak = healthy_streak + 1 if ok and healthy else 0
+            interval = next_check_interval(state, base_interval, healthy_streak)
+            metrics.set("freeride_check_interval_seconds", round(interval, 1))
+            if metrics_textfile:
+                metrics.write_textfile(Path(metrics_textfile).expanduser())
+            print(f"  Next check in {interval:.0f}s")
+            next_check = time.monotonic() + interval
+
+        # Degraded: the primary is failing and nothing healthy has replaced it yet
+        current_base = get_current_base()
+        now = time.monotonic()
+        if not current_base or current_base in state.get("breakers", {}):
+            metrics.inc("freeride_degraded_seconds_total", round(now - last_tick, 3))
+        last_tick = now
+
+        # Keep the next primary verified off the critical path
+        standby_age = STANDBY_MAX_AGE_SECONDS * max(1.0, interval / base_interval)
+        if (current_base and (standby_thread is None or not standby_thread.is_alive())
+                and standby_needs_refresh(state, current_base, standby_age)):
+            standby_thread = threading.Thread(
+                target=refresh_standby_in_background, args=(current_base,),
+                name="freeride-standby", daemon=True
+            )
+            standby_thread.start()
+
+        # Wait in small increments to allow graceful shutdown
+        if tailer:
+            tailer.wait(1.0)
+            try:
+                rotate_on_log_failure(api_key, state, tailer.read_lines())
+            except Exception as e:
+                print(f"Error handling log event: {e}")
+        else:
             time.sleep(1)
 
+    if tailer:
+        tailer.close()
+    if metrics_server:
+        metrics_server.shutdown()
+    if standby_thread is not None and standby_thread.is_alive():
+        # Let an in-flight refresh finish writing state and events
+        standby_thread.join(sum(PROBE_TIMEOUT))
+        if standby_thread.is_alive():
+            print("Warning: standby refresh still running at shutdown")
+    emit("watcher_stopped")
+    close_event_log()
+    state.close()
     print("Watcher stopped.")
 
 
+def _fmt_metric(value: Optional[float], unit: str = "") -> str:
+    return f"{value:.0f}{unit}" if value is not None else "-"
+
+
 def main():
     import argparse
 
@@ -341,7 +1141,19 @@ def main():
     parser.add_argument("--status", "-s", action="store_true",
                        help="Show watcher status")
     parser.add_argument("--clear-cooldowns", action="store_true",
-                       help="Clear all rate limit cooldowns")
+                       help="Close all circuit breakers")
+    parser.add_argument("--watch-logs", "-w", action="store_true",
+                       help="With --daemon: rotate on 429/503s in OpenClaw's gateway logs")
+    parser.add_argument("--log-file", action="append", metavar="PATH",
+                       help="Log file to follow instead of the defaults (repeatable)")
+    parser.add_argument("--metrics-port", type=int, metavar="PORT",
+                       help="With --daemon: serve Prometheus metrics on http://127.0.0.1:PORT/metrics")
+    parser.add_argument("--metrics-host", default=METRICS_HOST,
+                       help="Address for --metrics-port (default: 127.0.0.1)")
+    parser.add_argument("--metrics-textfile", metavar="PATH",
+                       help="Write metrics to PATH after every check (node_exporter textfile collector)")
+    parser.add_argument("--event-log", metavar="PATH",
+                       help="Append structured JSONL events (probes, checks, breakers, rotations) to PATH")
 
     args = parser.parse_args()
 
@@ -352,17 +1164,68 @@ def main():
         print(f"Total rotations: {state.get('rotation_count', 0)}")
         print(f"Last rotation: {state.get('last_rotation', 'Never')}")
         print(f"Last reason: {state.get('last_rotation_reason', 'N/A')}")
-        print(f"\nModels in cooldown:")
-        for model, limited_at in state.get("rate_limited_models", {}).items():
-            print(f"  - {model} (since {limited_at})")
-        if not state.get("rate_limited_models"):
-            print("  None")
+        standby = state.get("standby")
+        print(f"\nWarm standby:")
+        if standby and standby.get("primary"):
+            age = time.time() - standby.get("verified_at", 0)
+            stale = " (stale, re-verified on use)" if age >= STANDBY_MAX_AGE_SECONDS else \
+                " (re-verified on use)" if age >= CHECK_INTERVAL_SECONDS else ""
+            if standby.get("for") != get_current_base():
+                stale = " (outdated: the primary has changed since)"
+            print(f"  Next primary: {standby['primary']} (verified {int(age)}s ago){stale}")
+            print(f"  Successor to: {standby.get('for') or 'none'}")
+            print(f"  Fallbacks: {', '.join(standby.get('fallbacks', [])) or 'none'} "
+                  f"({standby.get('verified_fallbacks', 0)} verified)")
+        else:
+            print("  None (the daemon keeps one ready)")
+
+        print(f"\nCircuit breakers:")
+        now = time.time()
+        breakers = state.get("breakers", {})
+        for model, breaker in sorted(breakers.items(), key=lambda item: item[1].get("open_until", 0)):
+            name = breaker_state(state, model, now)
+            detail = f"retry in {int(breaker['open_until'] - now)}s" if name == "open" else "awaiting trial probe"
+            print(f"  - {model}: {name}, {breaker.get('failures', 0)} failure(s), "
+                  f"last {breaker.get('last_error')} ({detail})")
+        if not breakers:
+            print("  None (all closed)")
+
+        limiter = get_rate_limiter()
+        learned = state.get("rate_limits", {})
+        print(f"\nRequest limits: {limiter.default_rpm:g}/min per model by default")
+        for model in sorted(learned):
+            rpm = limiter.limit_for(model)
+            if rpm < limiter.configured_rpm(model):
+                print(f"  - {model}: {rpm:g}/min (learned from 429s)")
+
+        budget = get_probe_budget()
+        usage = budget.usage()
+        print(f"\nProbe budget (last hour): {sum(usage.values())}/{budget.total} probes, "
+              f"{budget.per_model} per model")
+        for model, count in sorted(usage.items(), key=lambda item: -item[1]):
+            share = count / (limiter.limit_for(model) * 60)
+            print(f"  - {model}: {count}/{budget.per_model} ({share:.1%} of its hourly request limit)")
+
+        history = state.probes.samples(limit=LATENCY_HISTORY_SIZE)
+        print(f"\nProbe latency (last {LATENCY_HISTORY_SIZE} probes per model):")
+        if history:
+            print(f"  {'Model':<45} {'TTFT p50':>9} {'TTFT p95':>9} {'tok/s':>7} {'errors':>7}")
+            summaries = sorted(
+                ((model, latency_summary(samples)) for model, samples in history.items()),
+                key=lambda item: item[1]["ttft_p50"] if item[1]["ttft_p50"] is not None else float("inf")
+            )
+            for model, summary in summaries:
+                print(f"  {model:<45} {_fmt_metric(summary['ttft_p50'], 'ms'):>9} "
+                      f"{_fmt_metric(summary['ttft_p95'], 'ms'):>9} "
+                      f"{_fmt_metric(summary['tps_p50']):>7} {summary['error_rate']:>6.0%}")
+        else:
+            print("  No probes recorded yet")
 
     elif args.clear_cooldowns:
         state = load_state()
-        state["rate_limited_models"] = {}
+        state.append({"op": "set", "key": "breakers", "value": {}})
         save_state(state)
-        print("Cleared all rate limit cooldowns.")
+        print("Closed all circuit breakers.")
 
     elif args.rotate:
         api_key = get_api_key()
@@ -371,12 +1234,15 @@ def main():
             sys.exit(1)
         state = load_state()
         rotate_to_next_model(api_key, state, "manual_rotation")
+        state.close()
 
     elif args.daemon:
-        run_daemon()
+        run_daemon(watch_logs=args.watch_logs or bool(args.log_file), log_files=args.log_file,
+                   metrics_port=args.metrics_port, metrics_host=args.metrics_host,
+                   metrics_textfile=args.metrics_textfile, event_log=args.event_log)
 
     else:
-        run_once()
+        run_once(metrics_textfile=args.metrics_textfile, event_log=args.event_log)
 
 
 if __name__ == "__main__":
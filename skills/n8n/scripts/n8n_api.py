@@ -7,33 +7,327 @@ Manages workflows, executions, and credentials via n8n REST API
 import os
 import sys
 import json
+import math
+import time
+import random
+import fnmatch
 import argparse
+import threading
 import requests
+from email.utils import parsedate_to_datetime
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ConnectTimeoutError
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Iterator
+
+
+PAGE_SIZE = 250  # n8n's maximum page size for list endpoints
+
+# Transport
+CONNECT_TIMEOUT = 5      # Seconds to establish a connection
+READ_TIMEOUT = 30        # Seconds to wait for response data
+POOL_SIZE = 16           # Pooled connections per host (covers prefetch and bulk workers)
+MAX_RETRIES = 3          # Retries after the first attempt
+BACKOFF_BASE = 0.5       # Seconds; doubles with every retry (full jitter)
+BACKOFF_MAX = 30         # Longest single wait, including Retry-After
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'}
+
+BULK_CONCURRENCY = 8     # Workflows processed at once by bulk actions
+
+
+def parse_timestamp(value: str) -> Optional[datetime]:
+    """Parse an n8n ISO timestamp ('2026-01-14T12:00:00.000Z') as an aware UTC datetime"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Treat naive datetimes as UTC so they compare with parsed timestamps"""
+    if value is None or value.tzinfo:
+        return value
+    return value.replace(tzinfo=timezone.utc)
+
+
+class QuantileSketch:
+    """Mergeable quantile sketch with bounded relative error (DDSketch-style).
+    
+    Values are counted in logarithmic buckets, so any quantile is within
+    `relative_accuracy` of the true value and memory depends on the value
+    range, not on how many values were added. Sketches built separately
+    (per page, per day, per workflow) combine exactly with merge().
+    """
+    
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.relative_accuracy = relative_accuracy
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self.buckets = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+    
+    def add(self, value: float):
+        """Add a non-negative value"""
+        if value <= 1e-9:
+            self.zero_count += 1
+        else:
+            index = math.ceil(math.log(value) / self._log_gamma)
+            self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+    
+    def merge(self, other: 'QuantileSketch'):
+        """Add another sketch's values (both must use the same accuracy)"""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different accuracy")
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        for value in (other.min, other.max):
+            if value is not None:
+                self.min = value if self.min is None else min(self.min, value)
+                self.max = value if self.max is None else max(self.max, value)
+    
+    def quantile(self, q: float) -> Optional[float]:
+        """Approximate q-quantile (0 <= q <= 1), or None if empty"""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if rank < seen:
+                value = 2 * self._gamma ** index / (self._gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+    
+    def summary(self) -> Dict:
+        """count/mean/min/max and p50/p90/p99, rounded to milliseconds"""
+        def rounded(value):
+            return round(value, 3) if value is not None else None
+        
+        return {
+            'count': self.count,
+            'mean': rounded(self.sum / self.count) if self.count else None,
+            'min': rounded(self.min),
+            'max': rounded(self.max),
+            'p50': rounded(self.quantile(0.5)),
+            'p90': rounded(self.quantile(0.9)),
+            'p99': rounded(self.quantile(0.99))
+        }
+    
+    def to_dict(self) -> Dict:
+        return {
+            'relative_accuracy': self.relative_accuracy,
+            'buckets': {str(index): count for index, count in self.buckets.items()},
+            'zero_count': self.zero_count,
+            'count': self.count,
+            'sum': self.sum,
+            'min': self.min,
+            'max': self.max
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'QuantileSketch':
+        sketch = cls(data.get('relative_accuracy', 0.01))
+        sketch.buckets = {int(index): count for index, count in data.get('buckets', {}).items()}
+        sketch.zero_count = data.get('zero_count', 0)
+        sketch.count = data.get('count', 0)
+        sketch.sum = data.get('sum', 0.0)
+        sketch.min = data.get('min')
+        sketch.max = data.get('max')
+        return sketch
+
+
+def execution_outcome(execution: Dict) -> str:
+    """Classify an execution as 'success', 'failed' or 'running'"""
+    status = execution.get('status')
+    if status == 'success' or (status is None and execution.get('finished')):
+        return 'success'
+    if status in ('running', 'waiting', 'new') or (status is None and not execution.get('stoppedAt')):
+        return 'running'
+    return 'failed'
+
+
+def execution_duration(execution: Dict) -> Optional[float]:
+    """Wall-clock duration in seconds, or None while still running"""
+    start = parse_timestamp(execution.get('startedAt'))
+    stop = parse_timestamp(execution.get('stoppedAt'))
+    if not start or not stop:
+        return None
+    return max(0.0, (stop - start).total_seconds())
+
+
+def execution_error(execution: Dict) -> str:
+    """Error message of a failed execution (needs includeData), else its status"""
+    error = (execution.get('data') or {}).get('resultData', {}).get('error') or {}
+    if error.get('message'):
+        return error['message']
+    status = execution.get('status')
+    return f"Execution {status}" if status and status != 'error' else 'Unknown error'
+
+
+def retry_after_seconds(value: str) -> Optional[float]:
+    """Parse a Retry-After header (delay in seconds or an HTTP date)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def endpoint_key(method: str, endpoint: str) -> str:
+    """Group requests per endpoint: 'GET workflows/{id}' rather than one key per id"""
+    parts = endpoint.strip('/').split('/')
+    return method + ' ' + '/'.join('{id}' if i % 2 else part for i, part in enumerate(parts))
+
+
+def connect_failed(error: Exception) -> bool:
+    """True if a request error happened before the connection was established (nothing was sent)"""
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    if not isinstance(error, requests.exceptions.ConnectionError):
+        return False
+    # requests wraps urllib3's MaxRetryError, whose reason is the underlying error;
+    # NewConnectionError (refused, unreachable, DNS failure) is a ConnectTimeoutError
+    reason = error.args[0] if error.args else None
+    reason = getattr(reason, 'reason', reason)
+    return isinstance(reason, ConnectTimeoutError)
+
+
+class Transport:
+    """Pooled HTTP transport with timeouts, retries and per-endpoint latency stats.
+    
+    Idempotent requests (GET, PUT, DELETE) are retried on timeouts,
+    connection errors, 429 and 5xx. Other methods are only retried when
+    the request cannot have been processed: a 429, or a failed connect.
+    Waits use jittered exponential backoff, or Retry-After when given.
+    """
+    
+    def __init__(self, base_url: str, headers: Dict = None, timeout: tuple = (CONNECT_TIMEOUT, READ_TIMEOUT),
+                 max_retries: int = MAX_RETRIES, pool_size: int = POOL_SIZE):
+        self.api_url = f"{(base_url or '').rstrip('/')}/api/v1/"
+        self.timeout = timeout
+        self.max_retries = max_retries
+        
+        self.session = requests.Session()
+        self.session.headers.update(headers or {})
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        
+        self._stats = {}
+        self._lock = threading.Lock()
+    
+    def _backoff(self, attempt: int, response: requests.Response = None) -> float:
+        retry_after = retry_after_seconds(response.headers.get('Retry-After')) if response is not None else None
+        if retry_after is not None:
+            return min(retry_after, BACKOFF_MAX)
+        return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+    
+    def _record(self, key: str, elapsed: float, error: bool, retry: bool):
+        with self._lock:
+            entry = self._stats.get(key)
+            if entry is None:
+                entry = self._stats[key] = {'requests': 0, 'errors': 0, 'retries': 0, 'latency': QuantileSketch()}
+            entry['requests'] += 1
+            entry['errors'] += int(error)
+            entry['retries'] += int(retry)
+            entry['latency'].add(elapsed)
+    
+    def request(self, method: str, endpoint: str, idempotent: bool = None, **kwargs) -> requests.Response:
+        """Send a request, retrying transient failures; returns the final response"""
+        method = method.upper()
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        url = self.api_url + endpoint.lstrip('/')
+        kwargs.setdefault('timeout', self.timeout)
+        key = endpoint_key(method, endpoint)
+        
+        attempt = 0
+        while True:
+            started = time.monotonic()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                self._record(key, time.monotonic() - started, True, attempt > 0)
+                # A failed connect never reached the server; anything later might have
+                safe = idempotent or connect_failed(e)
+                if not safe or attempt >= self.max_retries:
+                    kind = 'timed out' if isinstance(e, requests.exceptions.Timeout) else 'failed'
+                    raise Exception(f"Request {kind}: {method} {endpoint} ({e})") from e
+                time.sleep(self._backoff(attempt))
+                attempt += 1
+                continue
+            
+            retryable = response.status_code in RETRY_STATUSES and (idempotent or response.status_code == 429)
+            self._record(key, time.monotonic() - started, response.status_code >= 400, attempt > 0)
+            if not retryable or attempt >= self.max_retries:
+                return response
+            time.sleep(self._backoff(attempt, response))
+            attempt += 1
+    
+    def stats(self) -> Dict[str, Dict]:
+        """Per-endpoint attempt counts (retries included) and latency percentiles in seconds"""
+        with self._lock:
+            result = {}
+            for key, entry in sorted(self._stats.items()):
+                latency = entry['latency'].summary()
+                result[key] = {
+                    'requests': entry['requests'],
+                    'errors': entry['errors'],
+                    'retries': entry['retries'],
+                    'total_seconds': round(entry['latency'].sum, 3),
+                    'p50': latency['p50'],
+                    'p90': latency['p90'],
+                    'p99': latency['p99'],
+                    'max': latency['max']
+                }
+            return result
 
 
 class N8nClient:
     """n8n API client"""
     
-    def __init__(self, base_url: str = None, api_key: str = None):
+    def __init__(self, base_url: str = None, api_key: str = None, timeout: tuple = (CONNECT_TIMEOUT, READ_TIMEOUT),
+                 max_retries: int = MAX_RETRIES, pool_size: int = POOL_SIZE):
         self.base_url = base_url or os.getenv('N8N_BASE_URL')
         self.api_key = api_key or os.getenv('N8N_API_KEY')
         
         if not self.api_key:
             raise ValueError("N8N_API_KEY not found in environment")
         
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.transport = Transport(self.base_url, headers={
             'X-N8N-API-KEY': self.api_key,
             'Accept': 'application/json',
             'Content-Type': 'application/json'
-        })
+        }, timeout=timeout, max_retries=max_retries, pool_size=pool_size)
+        self.session = self.transport.session
     
     def _request(self, method: str, endpoint: str, **kwargs) -> Dict[str, Any]:
         """Make API request"""
-        url = f"{self.base_url}/api/v1/{endpoint.lstrip('/')}"
-        response = self.session.request(method, url, **kwargs)
+        response = self.transport.request(method, endpoint, **kwargs)
         
         try:
             response.raise_for_status()
@@ -42,6 +336,34 @@ class N8nClient:
             error_msg = f"HTTP {response.status_code}: {response.text}"
             raise Exception(error_msg) from e
     
+    def request_stats(self) -> Dict[str, Dict]:
+        """Per-endpoint latency and retry counters for requests made so far"""
+        return self.transport.stats()
+    
+    def _paginate(self, endpoint: str, params: Dict, page_size: int = PAGE_SIZE) -> Iterator[Dict]:
+        """Yield items across all pages of a cursor-paginated endpoint.
+        
+        The next page is fetched in the background while the caller works
+        through the current one, so at most two pages are held in memory.
+        """
+        params = dict(params, limit=min(page_size, PAGE_SIZE))
+        
+        def fetch(cursor: Optional[str]) -> Dict:
+            page_params = dict(params, cursor=cursor) if cursor else params
+            return self._request('GET', endpoint, params=page_params)
+        
+        executor = ThreadPoolExecutor(max_workers=1)
+        try:
+            pending = executor.submit(fetch, None)
+            while pending is not None:
+                page = pending.result()
+                cursor = page.get('nextCursor')
+                pending = executor.submit(fetch, cursor) if cursor else None
+                yield from page.get('data', [])
+        finally:
+            # Abandoned iteration: don't wait on a prefetch nobody will read
+            executor.shutdown(wait=False, cancel_futures=True)
+    
     # Workflows
     def list_workflows(self, active: bool = None) -> List[Dict]:
         """List all workflows"""
@@ -50,6 +372,18 @@ class N8nClient:
             params['active'] = str(active).lower()
         return self._request('GET', 'workflows', params=params)
     
+    def iter_workflows(self, active: bool = None, tags: List[str] = None, name: str = None,
+                       page_size: int = PAGE_SIZE) -> Iterator[Dict]:
+        """Iterate over every workflow, following nextCursor lazily"""
+        params = {}
+        if active is not None:
+            params['active'] = str(active).lower()
+        if tags:
+            params['tags'] = ','.join(tags)
+        if name:
+            params['name'] = name
+        return self._paginate('workflows', params, page_size)
+    
     def get_workflow(self, workflow_id: str) -> Dict:
         """Get workflow details"""
         return self._request('GET', f'workflows/{workflow_id}')
@@ -78,6 +412,74 @@ class N8nClient:
         """Deactivate workflow"""
         return self._request('PATCH', f'workflows/{workflow_id}', json={'active': False})
     
+    # Bulk operations
+    def select_workflows(self, ids: List[str] = None, tag: str = None, name_pattern: str = None) -> List[Dict]:
+        """Workflows to act on: explicit ids, or every workflow with a tag and/or
+        a name matching a glob pattern (case-insensitive, e.g. 'Lead *')"""
+        if ids:
+            return [{'id': str(workflow_id)} for workflow_id in ids]
+        if not tag and not name_pattern:
+            raise ValueError("Select workflows by ids, tag or name pattern")
+        
+        selected = []
+        for workflow in self.iter_workflows(tags=[tag] if tag else None):
+            if name_pattern and not fnmatch.fnmatch(workflow.get('name', '').lower(), name_pattern.lower()):
+                continue
+            selected.append({'id': workflow['id'], 'name': workflow.get('name'), 'active': workflow.get('active')})
+        return selected
+    
+    def bulk_action(self, action: str, workflows: List[Dict], concurrency: int = BULK_CONCURRENCY,
+                    output_dir: str = None) -> Dict:
+        """Run activate, deactivate, delete or export over many workflows at once.
+        
+        Calls share the client's pooled session, at most `concurrency` in
+        flight. One failure doesn't stop the rest; every workflow gets a
+        result entry, in input order. Exports are written to
+        output_dir/<id>.json when given, else returned inline.
+        """
+        operations = {
+            'activate': self.activate_workflow,
+            'deactivate': self.deactivate_workflow,
+            'delete': self.delete_workflow,
+            'export': self.get_workflow
+        }
+        if action not in operations:
+            raise ValueError(f"Unknown bulk action: {action}")
+        if output_dir:
+            Path(output_dir).mkdir(parents=True, exist_ok=True)
+        
+        def run(workflow: Dict) -> Dict:
+            item = {'id': workflow['id'], 'name': workflow.get('name')}
+            try:
+                response = operations[action](workflow['id'])
+            except Exception as e:
+                return dict(item, ok=False, error=str(e))
+            item['name'] = item['name'] or response.get('name')
+            if action == 'export':
+                if output_dir:
+                    path = Path(output_dir) / f"{workflow['id']}.json"
+                    path.write_text(json.dumps(response, indent=2))
+                    item['file'] = str(path)
+                else:
+                    item['workflow'] = response
+            elif action != 'delete':
+                item['active'] = response.get('active')
+            return dict(item, ok=True)
+        
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+            results = list(executor.map(run, workflows))
+        
+        succeeded = sum(1 for result in results if result['ok'])
+        return {
+            'action': action,
+            'requested': len(workflows),
+            'succeeded': succeeded,
+            'failed': len(workflows) - succeeded,
+            'elapsed_seconds': round(time.monotonic() - started, 3),
+            'results': results
+        }
+    
     # Executions
     def list_executions(self, workflow_id: str = None, limit: int = 20) -> List[Dict]:
         """List workflow executions"""
@@ -86,9 +488,50 @@ class N8nClient:
             params['workflowId'] = workflow_id
         return self._request('GET', 'executions', params=params)
     
-    def get_execution(self, execution_id: str) -> Dict:
+    def iter_executions(self, workflow_id: str = None, status: str = None,
+                        started_after: datetime = None, started_before: datetime = None,
+                        include_data: bool = False, limit: int = None,
+                        page_size: int = PAGE_SIZE) -> Iterator[Dict]:
+        """Iterate over executions, newest first, following nextCursor lazily.
+        
+        workflow_id and status ('success', 'error', 'waiting') are filtered
+        server-side. n8n has no time filter, but executions come newest
+        first, so iteration stops at the first one started before
+        started_after and skips those started after started_before.
+        Naive datetimes are taken as UTC.
+        """
+        params = {}
+        if workflow_id:
+            params['workflowId'] = workflow_id
+        if status:
+            params['status'] = status
+        if include_data:
+            params['includeData'] = 'true'
+        if limit:
+            page_size = min(page_size, limit)
+        started_after = _as_utc(started_after)
+        started_before = _as_utc(started_before)
+        
+        count = 0
+        pages = self._paginate('executions', params, page_size)
+        try:
+            for execution in pages:
+                started = parse_timestamp(execution.get('startedAt'))
+                if started_after and started and started < started_after:
+                    return
+                if started_before and started and started >= started_before:
+                    continue
+                yield execution
+                count += 1
+                if limit and count >= limit:
+                    return
+        finally:
+            pages.close()
+    
+    def get_execution(self, execution_id: str, include_data: bool = False) -> Dict:
         """Get execution details"""
-        return self._request('GET', f'executions/{execution_id}')
+        params = {'includeData': 'true'} if include_data else None
+        return self._request('GET', f'executions/{execution_id}', params=params)
     
     def delete_execution(self, execution_id: str) -> Dict:
         """Delete execution"""
@@ -180,38 +623,57 @@ class N8nClient:
     
     # Optimization & Analytics
     def get_workflow_statistics(self, workflow_id: str, days: int = 7) -> Dict:
-        """Get workflow execution statistics"""
-        executions = self.list_executions(workflow_id=workflow_id, limit=100)
+        """Get workflow execution statistics over the last `days` days.
+        
+        One streaming pass over the window builds a duration sketch and
+        hourly counts; a second pass over only the failed executions
+        (with their data) collects error messages.
+        """
+        window_end = datetime.now(timezone.utc)
+        window_start = window_end - timedelta(days=days)
         
         stats = {
-            'total_executions': len(executions),
+            'workflow_id': workflow_id,
+            'days': days,
+            'window_start': window_start.isoformat(timespec='seconds'),
+            'window_end': window_end.isoformat(timespec='seconds'),
+            'total_executions': 0,
             'successful': 0,
             'failed': 0,
-            'execution_times': [],
+            'running': 0,
             'error_patterns': {}
         }
+        durations = QuantileSketch()
+        hourly = {}
         
-        for execution in executions:
-            status = execution.get('finished')
-            if status:
-                stats['successful'] += 1
-            else:
-                stats['failed'] += 1
-                error = execution.get('data', {}).get('resultData', {}).get('error', {}).get('message', 'Unknown error')
+        for execution in self.iter_executions(workflow_id=workflow_id, started_after=window_start):
+            stats['total_executions'] += 1
+            outcome = execution_outcome(execution)
+            stats[outcome if outcome != 'success' else 'successful'] += 1
+            if outcome == 'failed' and execution.get('status') not in (None, 'error'):
+                error = execution_error(execution)
                 stats['error_patterns'][error] = stats['error_patterns'].get(error, 0) + 1
             
-            # Execution time
-            start = execution.get('startedAt')
-            stop = execution.get('stoppedAt')
-            if start and stop:
-                # Calculate duration (simplified)
-                stats['execution_times'].append({'start': start, 'stop': stop})
-        
-        # Calculate success rate
-        if stats['total_executions'] > 0:
-            stats['success_rate'] = (stats['successful'] / stats['total_executions']) * 100
-        else:
-            stats['success_rate'] = 0
+            duration = execution_duration(execution)
+            if duration is not None:
+                durations.add(duration)
+            started = parse_timestamp(execution.get('startedAt'))
+            if started:
+                hour = started.replace(minute=0, second=0, microsecond=0)
+                hourly[hour] = hourly.get(hour, 0) + 1
+        
+        # Error messages live in the execution data, so fetch it for failures only
+        if stats['failed']:
+            for execution in self.iter_executions(workflow_id=workflow_id, status='error',
+                                                  started_after=window_start, include_data=True):
+                error = execution_error(execution)
+                stats['error_patterns'][error] = stats['error_patterns'].get(error, 0) + 1
+        
+        finished = stats['successful'] + stats['failed']
+        stats['success_rate'] = (stats['successful'] / finished) * 100 if finished else 0
+        stats['duration_seconds'] = durations.summary()
+        stats['throughput_per_hour'] = round(stats['total_executions'] / (days * 24), 3) if days else 0
+        stats['peak_executions_per_hour'] = max(hourly.values()) if hourly else 0
         
         return stats
     
@@ -265,11 +727,21 @@ class N8nClient:
         return analysis
 
 
+def _open_store(path: str, base_url: str):
+    """Open the local execution mirror (imported lazily, it depends on this module)"""
+    try:
+        from n8n_store import ExecutionStore
+    except ImportError:
+        from scripts.n8n_store import ExecutionStore
+    return ExecutionStore(path, base_url=base_url)
+
+
 def main():
     parser = argparse.ArgumentParser(description='n8n API Client')
     parser.add_argument('action', choices=[
         'list-workflows', 'get-workflow', 'create', 'activate', 'deactivate',
-        'list-executions', 'get-execution', 'execute', 'validate', 'stats'
+        'list-executions', 'get-execution', 'execute', 'validate', 'stats', 'sync',
+        'bulk-activate', 'bulk-deactivate', 'bulk-delete', 'bulk-export'
     ])
     parser.add_argument('--id', help='Workflow or execution ID')
     parser.add_argument('--active', type=lambda x: x.lower() == 'true', help='Filter by active status')
@@ -279,12 +751,27 @@ def main():
     parser.add_argument('--from-template', help='Create workflow from template name')
     parser.add_argument('--days', type=int, default=7, help='Days for statistics')
     parser.add_argument('--pretty', action='store_true', help='Pretty print JSON output')
+    parser.add_argument('--mirror', action='store_true', help='Compute stats from the local execution mirror (see sync)')
+    parser.add_argument('--db', help='Execution mirror database path (default: ~/.cache/n8n-skill/executions.sqlite)')
+    parser.add_argument('--no-node-timings', action='store_true', help='Sync execution metadata only, without per-node timings')
+    parser.add_argument('--timeout', type=float, default=READ_TIMEOUT, help='Read timeout per request in seconds')
+    parser.add_argument('--retries', type=int, default=MAX_RETRIES, help='Retries for transient failures')
+    parser.add_argument('--timings', action='store_true', help='Print per-endpoint request latency to stderr')
+    parser.add_argument('--ids', help='Comma-separated workflow IDs for bulk actions')
+    parser.add_argument('--tag', help='Bulk actions: select workflows with this tag')
+    parser.add_argument('--name', help="Bulk actions: select workflows whose name matches this glob (e.g. 'Lead *')")
+    parser.add_argument('--concurrency', type=int, default=BULK_CONCURRENCY, help='Workflows processed at once by bulk actions')
+    parser.add_argument('--output-dir', help='bulk-export: write each workflow to <dir>/<id>.json')
+    parser.add_argument('--dry-run', action='store_true', help='Bulk actions: list the selected workflows without changing anything')
+    parser.add_argument('--yes', action='store_true', help='Confirm bulk-delete')
     
     args = parser.parse_args()
     
     try:
-        client = N8nClient()
+        client = N8nClient(timeout=(CONNECT_TIMEOUT, args.timeout), max_retries=args.retries,
+                           pool_size=max(POOL_SIZE, args.concurrency))
         result = None
+        exit_code = 0
         
         if args.action == 'list-workflows':
             result = client.list_workflows(active=args.active)
@@ -338,13 +825,45 @@ def main():
         elif args.action == 'stats':
             if not args.id:
                 raise ValueError("--id required for stats")
-            result = client.get_workflow_statistics(args.id, days=args.days)
+            if args.mirror:
+                store = _open_store(args.db, client.base_url)
+                try:
+                    result = store.workflow_statistics(args.id, days=args.days)
+                finally:
+                    store.close()
+            else:
+                result = client.get_workflow_statistics(args.id, days=args.days)
+        elif args.action.startswith('bulk-'):
+            action = args.action[len('bulk-'):]
+            ids = [i.strip() for i in args.ids.split(',') if i.strip()] if args.ids else None
+            if not ids and not args.tag and not args.name:
+                raise ValueError(f"--ids, --tag or --name required for {args.action}")
+            workflows = client.select_workflows(ids=ids, tag=args.tag, name_pattern=args.name)
+            if args.dry_run:
+                result = {'action': action, 'dry_run': True, 'requested': len(workflows), 'workflows': workflows}
+            elif action == 'delete' and not args.yes:
+                raise ValueError(f"bulk-delete would delete {len(workflows)} workflow(s); "
+                                 "re-run with --yes (or --dry-run to preview)")
+            else:
+                result = client.bulk_action(action, workflows, concurrency=args.concurrency,
+                                            output_dir=args.output_dir)
+                exit_code = 1 if result['failed'] else 0
+        elif args.action == 'sync':
+            store = _open_store(args.db, client.base_url)
+            try:
+                result = store.sync(client, days=args.days, node_timings=not args.no_node_timings)
+            finally:
+                store.close()
         
         # Output
         if args.pretty:
             print(json.dumps(result, indent=2))
         else:
             print(json.dumps(result))
+        if args.timings:
+            print(json.dumps(client.request_stats(), indent=2), file=sys.stderr)
+        if exit_code:
+            sys.exit(exit_code)
             
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
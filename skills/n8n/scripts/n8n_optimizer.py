@@ -18,16 +18,25 @@ except ImportError:
     from scripts.n8n_api import N8nClient
 
 
+SLOW_EXECUTION_SECONDS = 300  # p99 above this is a bottleneck
+TAIL_LATENCY_RATIO = 10       # p99/p50 above this is flagged as tail latency
+SLOW_NODE_SHARE = 0.5         # A node taking this share of execution time is a bottleneck
+
+
 class WorkflowOptimizer:
     """Workflow performance analyzer and optimizer"""
     
-    def __init__(self, client: N8nClient = None):
+    def __init__(self, client: N8nClient = None, store=None):
         self.client = client or N8nClient()
+        self.store = store  # Optional ExecutionStore: read executions from the local mirror
     
     def analyze_performance(self, workflow_id: str, days: int = 7) -> Dict:
         """Comprehensive performance analysis"""
         workflow = self.client.get_workflow(workflow_id)
-        statistics = self.client.get_workflow_statistics(workflow_id, days=days)
+        if self.store:
+            statistics = self.store.workflow_statistics(workflow_id, days=days)
+        else:
+            statistics = self.client.get_workflow_statistics(workflow_id, days=days)
         
         analysis = {
             'workflow_id': workflow_id,
@@ -65,6 +74,18 @@ class WorkflowOptimizer:
         if metrics['total_executions'] > 0:
             metrics['failure_rate'] = (metrics['failed_executions'] / metrics['total_executions']) * 100
         
+        # Latency
+        durations = statistics.get('duration_seconds', {})
+        metrics['avg_duration_seconds'] = durations.get('mean')
+        metrics['p50_duration_seconds'] = durations.get('p50')
+        metrics['p90_duration_seconds'] = durations.get('p90')
+        metrics['p99_duration_seconds'] = durations.get('p99')
+        metrics['max_duration_seconds'] = durations.get('max')
+        metrics['throughput_per_hour'] = statistics.get('throughput_per_hour', 0)
+        metrics['peak_executions_per_hour'] = statistics.get('peak_executions_per_hour', 0)
+        metrics['error_patterns'] = statistics.get('error_patterns', {})
+        metrics['slowest_nodes'] = dict(list(statistics.get('node_timings', {}).items())[:5])
+        
         # Categorize health
         if metrics['success_rate'] >= 95:
             metrics['health'] = 'excellent'
@@ -211,6 +232,38 @@ class WorkflowOptimizer:
                 'impact': 'Unreliable execution'
             })
         
+        # Check for slow or erratic execution times
+        durations = statistics.get('duration_seconds', {})
+        p50, p99 = durations.get('p50'), durations.get('p99')
+        if p99 is not None and p99 > SLOW_EXECUTION_SECONDS:
+            bottlenecks.append({
+                'type': 'slow_executions',
+                'severity': 'high',
+                'description': f'1% of executions take longer than {p99:.1f}s (median {p50:.1f}s)',
+                'impact': 'Long-running executions hold workers and delay downstream systems'
+            })
+        elif p50 and p99 is not None and p99 > p50 * TAIL_LATENCY_RATIO and durations.get('count', 0) >= 20:
+            bottlenecks.append({
+                'type': 'tail_latency',
+                'severity': 'medium',
+                'description': f'p99 execution time ({p99:.1f}s) is over {TAIL_LATENCY_RATIO}x the median ({p50:.1f}s)',
+                'impact': 'Occasional slow runs, often from retries or slow external calls'
+            })
+        
+        # Check for a single node dominating execution time (needs the mirror's node timings)
+        node_timings = statistics.get('node_timings', {})
+        total_node_time = sum(timing['total'] for timing in node_timings.values())
+        for node_name, timing in node_timings.items():
+            share = timing['total'] / total_node_time if total_node_time else 0
+            if share >= SLOW_NODE_SHARE and (timing['p90'] or 0) >= 1:
+                bottlenecks.append({
+                    'type': 'slow_node',
+                    'severity': 'high',
+                    'description': f'Node "{node_name}" takes {share:.0%} of execution time (p90 {timing["p90"]:.1f}s)',
+                    'affected_nodes': [node_name],
+                    'impact': 'Most of each execution is spent waiting on this node'
+                })
+        
         # Check for missing error handling
         has_error_handling = any(
             node.get('type') in ['n8n-nodes-base.errorTrigger', 'n8n-nodes-base.if']
@@ -336,9 +389,9 @@ class WorkflowOptimizer:
         
         return max(0, min(100, int(score)))
     
-    def suggest_optimizations(self, workflow_id: str) -> Dict:
+    def suggest_optimizations(self, workflow_id: str, days: int = 7) -> Dict:
         """Generate optimization suggestions"""
-        analysis = self.analyze_performance(workflow_id)
+        analysis = self.analyze_performance(workflow_id, days=days)
         
         suggestions = {
             'workflow_id': workflow_id,
@@ -390,6 +443,24 @@ class WorkflowOptimizer:
         report.append(f"Total Executions: {metrics['total_executions']}")
         report.append(f"Success Rate: {metrics['success_rate']:.1f}%")
         report.append(f"Failure Rate: {metrics['failure_rate']:.1f}%")
+        if metrics.get('p50_duration_seconds') is not None:
+            report.append(f"Duration: avg {metrics['avg_duration_seconds']:.2f}s, "
+                          f"p50 {metrics['p50_duration_seconds']:.2f}s, "
+                          f"p90 {metrics['p90_duration_seconds']:.2f}s, "
+                          f"p99 {metrics['p99_duration_seconds']:.2f}s, "
+                          f"max {metrics['max_duration_seconds']:.2f}s")
+        report.append(f"Throughput: {metrics.get('throughput_per_hour', 0):.2f}/hour "
+                      f"(peak {metrics.get('peak_executions_per_hour', 0)}/hour)")
+        if metrics.get('error_patterns'):
+            report.append("Top Errors:")
+            top_errors = sorted(metrics['error_patterns'].items(), key=lambda item: item[1], reverse=True)
+            for error, count in top_errors[:5]:
+                report.append(f"  • {error} ({count}x)")
+        
+        if metrics.get('slowest_nodes'):
+            report.append("Slowest Nodes (p90):")
+            for node_name, timing in list(metrics['slowest_nodes'].items())[:3]:
+                report.append(f"  • {node_name}: {timing['p90']:.2f}s ({timing['count']} runs)")
         
         # Node Analysis
         node_analysis = analysis['node_analysis']
@@ -452,18 +523,28 @@ def main():
     parser.add_argument('--id', required=True, help='Workflow ID')
     parser.add_argument('--days', type=int, default=7, help='Analysis period in days')
     parser.add_argument('--pretty', action='store_true', help='Pretty print JSON output')
+    parser.add_argument('--mirror', action='store_true', help='Read executions from the local mirror (n8n_api.py sync)')
+    parser.add_argument('--db', help='Execution mirror database path')
     
     args = parser.parse_args()
     
+    store = None
     try:
-        optimizer = WorkflowOptimizer()
+        client = N8nClient()
+        if args.mirror:
+            try:
+                from n8n_store import ExecutionStore
+            except ImportError:
+                from scripts.n8n_store import ExecutionStore
+            store = ExecutionStore(args.db, base_url=client.base_url)
+        optimizer = WorkflowOptimizer(client, store=store)
         
         if args.action == 'analyze':
             result = optimizer.analyze_performance(args.id, days=args.days)
             print(json.dumps(result, indent=2 if args.pretty else None))
         
         elif args.action == 'suggest':
-            result = optimizer.suggest_optimizations(args.id)
+            result = optimizer.suggest_optimizations(args.id, days=args.days)
             print(json.dumps(result, indent=2 if args.pretty else None))
         
         elif args.action == 'report':
@@ -473,6 +554,9 @@ def main():
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
+    finally:
+        if store is not None:
+            store.close()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+n8n execution mirror
+Local SQLite copy of execution metadata and per-node run timings, kept
+up to date incrementally so statistics and optimizer runs don't have to
+re-download executions from the n8n API
+"""
+
+import os
+import sqlite3
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Optional, Dict, List
+
+# Import helpers - handle both direct and module imports
+try:
+    from n8n_api import (
+        PAGE_SIZE, QuantileSketch, parse_timestamp, execution_outcome, execution_duration, execution_error
+    )
+except ImportError:
+    from scripts.n8n_api import (
+        PAGE_SIZE, QuantileSketch, parse_timestamp, execution_outcome, execution_duration, execution_error
+    )
+
+
+DEFAULT_DB_PATH = Path(os.getenv('N8N_MIRROR_DB', Path.home() / '.cache' / 'n8n-skill' / 'executions.sqlite'))
+SYNC_PAGE_SIZE = 50  # Smaller pages when execution data is included
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS executions (
+    id INTEGER PRIMARY KEY,
+    workflow_id TEXT,
+    status TEXT,
+    outcome TEXT,
+    mode TEXT,
+    started_at REAL,
+    stopped_at REAL,
+    duration REAL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_executions_workflow_started ON executions (workflow_id, started_at);
+CREATE INDEX IF NOT EXISTS idx_executions_started ON executions (started_at);
+CREATE TABLE IF NOT EXISTS node_runs (
+    execution_id INTEGER,
+    node TEXT,
+    run_index INTEGER,
+    started_at REAL,
+    execution_time REAL,
+    status TEXT,
+    PRIMARY KEY (execution_id, node, run_index)
+);
+"""
+
+
+def _timestamp(value: str) -> Optional[float]:
+    parsed = parse_timestamp(value)
+    return parsed.timestamp() if parsed else None
+
+
+def _node_runs(execution: Dict) -> List[tuple]:
+    """(node, run_index, started_at, execution_time, status) rows from an execution's runData"""
+    run_data = (execution.get('data') or {}).get('resultData', {}).get('runData') or {}
+    rows = []
+    for node, runs in run_data.items():
+        for index, run in enumerate(runs or []):
+            start = run.get('startTime')
+            rows.append((
+                node,
+                index,
+                start / 1000 if start is not None else None,
+                (run.get('executionTime') or 0) / 1000,
+                run.get('executionStatus') or ('error' if run.get('error') else 'success')
+            ))
+    return rows
+
+
+class ExecutionStore:
+    """SQLite mirror of n8n executions"""
+    
+    def __init__(self, path: Path = None, base_url: str = None):
+        self.path = Path(path or DEFAULT_DB_PATH).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.executescript(SCHEMA)
+        
+        # One mirror per instance: refuse to mix executions from two servers
+        mirrored = self._get_meta('base_url')
+        if base_url and mirrored and mirrored != base_url.rstrip('/'):
+            raise Exception(f"Mirror {self.path} belongs to {mirrored}; use --db for another instance")
+    
+    def close(self):
+        self.conn.close()
+    
+    def _get_meta(self, key: str) -> Optional[str]:
+        row = self.conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+    
+    def _set_meta(self, key: str, value):
+        self.conn.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, str(value)))
+    
+    def _watermark(self) -> int:
+        """Highest execution id already synced"""
+        return int(self._get_meta('last_id') or 0)
+    
+    def _store_execution(self, execution: Dict, node_timings: bool):
+        execution_id = int(execution['id'])
+        outcome = execution_outcome(execution)
+        self.conn.execute(
+            'INSERT OR REPLACE INTO executions '
+            '(id, workflow_id, status, outcome, mode, started_at, stopped_at, duration, error) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (
+                execution_id,
+                str(execution.get('workflowId')),
+                execution.get('status'),
+                outcome,
+                execution.get('mode'),
+                _timestamp(execution.get('startedAt')),
+                _timestamp(execution.get('stoppedAt')),
+                execution_duration(execution),
+                execution_error(execution) if outcome == 'failed' else None
+            )
+        )
+        if node_timings:
+            self.conn.execute('DELETE FROM node_runs WHERE execution_id = ?', (execution_id,))
+            self.conn.executemany(
+                'INSERT INTO node_runs (execution_id, node, run_index, started_at, execution_time, status) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                [(execution_id,) + row for row in _node_runs(execution)]
+            )
+    
+    def _refresh_unfinished(self, client, watermark: int, node_timings: bool) -> int:
+        """Re-fetch executions that were still running when mirrored; returns how many were checked"""
+        unfinished = [row[0] for row in self.conn.execute(
+            "SELECT id FROM executions WHERE outcome = 'running' AND id <= ?", (watermark,)
+        )]
+        for execution_id in unfinished:
+            try:
+                execution = client.get_execution(str(execution_id), include_data=node_timings)
+            except Exception as e:
+                if not str(e).startswith('HTTP 404'):
+                    raise
+                # Deleted on the server (e.g. by execution pruning)
+                self.conn.execute('DELETE FROM executions WHERE id = ?', (execution_id,))
+                self.conn.execute('DELETE FROM node_runs WHERE execution_id = ?', (execution_id,))
+                continue
+            self._store_execution(execution, node_timings)
+        return len(unfinished)
+    
+    def sync(self, client, days: int = 7, node_timings: bool = True, progress=None) -> Dict:
+        """Mirror executions newer than the last sync (the first sync backfills `days` days).
+        
+        Pages are committed as they arrive, but the watermark only moves
+        once the sync completes, so an interrupted sync is simply redone.
+        Executions that were still running when mirrored are re-fetched
+        one by one, so a stuck one never drags the watermark back.
+        """
+        started = time.time()
+        watermark = self._watermark()
+        started_after = None
+        if not watermark and days:
+            started_after = datetime.now(timezone.utc) - timedelta(days=days)
+        
+        synced = 0
+        highest = watermark
+        executions = client.iter_executions(
+            started_after=started_after,
+            include_data=node_timings,
+            page_size=SYNC_PAGE_SIZE if node_timings else PAGE_SIZE
+        )
+        try:
+            for execution in executions:
+                execution_id = int(execution['id'])
+                if execution_id <= watermark:
+                    break
+                self._store_execution(execution, node_timings)
+                
+                synced += 1
+                highest = max(highest, execution_id)
+                if synced % SYNC_PAGE_SIZE == 0:
+                    self.conn.commit()
+                    if progress:
+                        progress(synced)
+        finally:
+            executions.close()
+        
+        refreshed = self._refresh_unfinished(client, watermark, node_timings) if watermark else 0
+        self._set_meta('last_id', highest)
+        self._set_meta('synced_at', time.time())
+        if client.base_url:
+            self._set_meta('base_url', client.base_url.rstrip('/'))
+        self.conn.commit()
+        
+        return {
+            'synced': synced,
+            'rechecked_unfinished': refreshed,
+            'last_id': highest,
+            'total_executions': self.conn.execute('SELECT COUNT(*) FROM executions').fetchone()[0],
+            'elapsed_seconds': round(time.time() - started, 2),
+            'db': str(self.path)
+        }
+    
+    def synced_at(self) -> Optional[float]:
+        value = self._get_meta('synced_at')
+        return float(value) if value else None
+    
+    def workflow_statistics(self, workflow_id: str, days: int = 7) -> Dict:
+        """Same shape as N8nClient.get_workflow_statistics, computed from the mirror"""
+        window_end = time.time()
+        window_start = window_end - days * 86400
+        where = 'workflow_id = ? AND started_at >= ?'
+        params = (str(workflow_id), window_start)
+        
+        stats = {
+            'workflow_id': workflow_id,
+            'days': days,
+            'window_start': _isoformat(window_start),
+            'window_end': _isoformat(window_end),
+            'source': 'mirror',
+            'synced_at': _isoformat(self.synced_at()),
+            'total_executions': 0,
+            'successful': 0,
+            'failed': 0,
+            'running': 0,
+            'error_patterns': {}
+        }
+        
+        for outcome, count in self.conn.execute(
+            f'SELECT outcome, COUNT(*) FROM executions WHERE {where} GROUP BY outcome', params
+        ):
+            stats['total_executions'] += count
+            stats['successful' if outcome == 'success' else outcome] = count
+        
+        for error, count in self.conn.execute(
+            f"SELECT error, COUNT(*) FROM executions WHERE {where} AND outcome = 'failed' GROUP BY error", params
+        ):
+            stats['error_patterns'][error or 'Unknown error'] = count
+        
+        durations = QuantileSketch()
+        for (duration,) in self.conn.execute(
+            f'SELECT duration FROM executions WHERE {where} AND duration IS NOT NULL', params
+        ):
+            durations.add(duration)
+        
+        peak = self.conn.execute(
+            f'SELECT MAX(n) FROM (SELECT COUNT(*) AS n FROM executions WHERE {where} '
+            f'GROUP BY CAST(started_at / 3600 AS INTEGER))', params
+        ).fetchone()[0]
+        
+        finished = stats['successful'] + stats['failed']
+        stats['success_rate'] = (stats['successful'] / finished) * 100 if finished else 0
+        stats['duration_seconds'] = durations.summary()
+        stats['throughput_per_hour'] = round(stats['total_executions'] / (days * 24), 3) if days else 0
+        stats['peak_executions_per_hour'] = peak or 0
+        stats['node_timings'] = self.node_timings(workflow_id, days)
+        
+        return stats
+    
+    def node_timings(self, workflow_id: str, days: int = 7) -> Dict[str, Dict]:
+        """Per-node execution time percentiles (seconds) over the window, slowest p90 first"""
+        window_start = time.time() - days * 86400
+        sketches = {}
+        errors = {}
+        rows = self.conn.execute(
+            'SELECT n.node, n.execution_time, n.status FROM node_runs n '
+            'JOIN executions e ON e.id = n.execution_id '
+            'WHERE e.workflow_id = ? AND e.started_at >= ?',
+            (str(workflow_id), window_start)
+        )
+        for node, execution_time, status in rows:
+            sketches.setdefault(node, QuantileSketch()).add(execution_time or 0.0)
+            if status == 'error':
+                errors[node] = errors.get(node, 0) + 1
+        
+        timings = {}
+        for node, sketch in sketches.items():
+            timings[node] = dict(sketch.summary(), total=round(sketch.sum, 3), errors=errors.get(node, 0))
+        return dict(sorted(timings.items(), key=lambda item: item[1]['p90'] or 0, reverse=True))
+
+
+def _isoformat(timestamp: Optional[float]) -> Optional[str]:
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat(timespec='seconds')